@@ -13,6 +13,26 @@ const generateUniqueId = () => {
   return `${Date.now()}-${Math.floor(Math.random() * 10000)}`;
 };
 
+// Summaries routed by the server's local classifier arrive before their text;
+// the finished summary is fetched until it lands
+const SUMMARY_POLL_INTERVAL_MS = 2000;
+const SUMMARY_POLL_ATTEMPTS = 15;
+
+const fetchFinishedSummary = async (conversationId) => {
+  for (let attempt = 0; attempt < SUMMARY_POLL_ATTEMPTS; attempt++) {
+    await new Promise(resolve => setTimeout(resolve, SUMMARY_POLL_INTERVAL_MS));
+    try {
+      const response = await apiClient.get(`/get-summary/${encodeURIComponent(conversationId)}`);
+      if (!response.data.summary_pending) {
+        return response.data.summary;
+      }
+    } catch (error) {
+      console.error("Error fetching summary:", error);
+    }
+  }
+  return null;
+};
+
 // Function to get current time in EST
 const getCurrentTimeInEST = () => {
   try {
@@ -108,6 +128,17 @@ const Chat = ({ analyticsData, updateAnalytics }) => {
     }
   }, [summary]);
 
+  // Show a summary returned by the server, waiting for its text if it is still pending
+  const handleSummary = async (newSummary) => {
+    if (newSummary && newSummary.summary_pending) {
+      newSummary = await fetchFinishedSummary(newSummary.conversation_id);
+    }
+    if (newSummary) {
+      setSummary(newSummary);
+      setShowSummary(true);
+    }
+  };
+
   const handleSend = async (e) => {
     e.preventDefault();
     if (!inputText.trim()) return;
@@ -150,7 +181,14 @@ const Chat = ({ analyticsData, updateAnalytics }) => {
         conversation_history: formattedHistory
       };
 
-      const response = await apiClient.post('/chat', payload);
+      // One key per send, so retries of this message are answered once by the server
+      const idempotencyKey = window.crypto && window.crypto.randomUUID
+        ? window.crypto.randomUUID()
+        : generateUniqueId();
+
+      const response = await apiClient.post('/chat', payload, {
+        headers: { 'Idempotency-Key': `chat-${idempotencyKey}` }
+      });
       const { chat_response, conversation_history: updatedHistory, tool_call_detected, summary: newSummary, analytics: updatedAnalytics } = response.data;
       
       // Store the updated conversation history
@@ -178,6 +216,8 @@ const Chat = ({ analyticsData, updateAnalytics }) => {
         // Wait for the tool call to complete
         const toolCallResponse = await apiClient.post('/tool-call-result', {
           conversation_history: updatedHistory
+        }, {
+          headers: { 'Idempotency-Key': `tool-${idempotencyKey}` }
         });
         
         // Get the final response after the tool call
@@ -204,10 +244,7 @@ const Chat = ({ analyticsData, updateAnalytics }) => {
         setToolCallInProgress(false);
         
         // Check if a summary was generated
-        if (toolCallSummary) {
-          setSummary(toolCallSummary);
-          setShowSummary(true);
-        }
+        handleSummary(toolCallSummary);
       } else {
         // Add the bot's response as a message
         const botMessage = { 
@@ -219,10 +256,7 @@ const Chat = ({ analyticsData, updateAnalytics }) => {
         setMessages(prev => [...prev, botMessage]);
         
         // Check if a summary was generated
-        if (newSummary) {
-          setSummary(newSummary);
-          setShowSummary(true);
-        }
+        handleSummary(newSummary);
       }
     } catch (error) {
       console.error("Error sending message:", error);
@@ -2,6 +2,17 @@ import React, { useState, useEffect } from 'react';
 import apiClient from '../utils/apiClient';
 import './InventoryDisplay.css';
 
+// Local copy of the inventory, refreshed with only the changes since its cursor
+const INVENTORY_CACHE_KEY = 'inventory_cache';
+
+const loadCachedInventory = () => {
+  try {
+    return JSON.parse(localStorage.getItem(INVENTORY_CACHE_KEY));
+  } catch (error) {
+    return null;
+  }
+};
+
 const InventoryDisplay = () => {
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [inventory, setInventory] = useState([]);
@@ -12,9 +23,23 @@ const InventoryDisplay = () => {
   const fetchInventory = async () => {
     setLoading(true);
     try {
-      const response = await apiClient.get('/inventory');
-      setInventory(response.data);
-      setFilteredInventory(response.data);
+      const cached = loadCachedInventory();
+      const response = await apiClient.get('/inventory/changes', {
+        params: { since: cached ? cached.cursor : 0 }
+      });
+      const { cursor, full_sync, upserts, removed } = response.data;
+
+      // Apply the delta to the cached copy, or start over on a full sync
+      const carsById = new Map(
+        !full_sync && cached ? cached.cars.map(car => [car.id, car]) : []
+      );
+      upserts.forEach(car => carsById.set(car.id, car));
+      removed.forEach(id => carsById.delete(id));
+      const cars = Array.from(carsById.values()).sort((a, b) => a.id - b.id);
+
+      localStorage.setItem(INVENTORY_CACHE_KEY, JSON.stringify({ cursor, cars }));
+      setInventory(cars);
+      setFilteredInventory(cars);
     } catch (error) {
       console.error('Error fetching inventory:', error);
     }
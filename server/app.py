@@ -3,14 +3,20 @@
 # server/app.py
 
 # Importing necessary libraries
-from flask import g
+from flask import request
 from create_app import create_app
-from database.session import ScopedSession
-from datetime import datetime, timezone
+from database.session import ScopedSession, has_pending_writes
 import os
 
 # Import the register_routes function
 from routes.all_routes import register_routes
+from commands.inventory_commands import register_commands
+from commands.intent_commands import register_commands as register_intent_commands
+from commands.summary_commands import register_commands as register_summary_commands
+from commands.routing_commands import register_commands as register_routing_commands
+from commands.profiling_commands import register_commands as register_profiling_commands
+from commands.schema_commands import register_commands as register_schema_commands
+from helpers.warmup_helpers import start_warmup
 # Remove SocketIO imports
 # from services.websocket_service import init_socketio, socketio
 
@@ -20,43 +26,45 @@ app = create_app()
 # Register routes
 register_routes(app)
 
+# Register CLI commands (e.g. flask --app app ingest-inventory feed.csv)
+register_commands(app)
+register_intent_commands(app)
+register_summary_commands(app)
+register_routing_commands(app)
+register_profiling_commands(app)
+register_schema_commands(app)
+
 # Remove SocketIO initialization
 # init_socketio(app)
 
 # Global session handling
-def log_with_timing(prev_time, message):
-    current_time = datetime.now(timezone.utc)
-    elapsed = (current_time - prev_time).total_seconds() if prev_time else 0
-    print(f"[{current_time.isoformat()}] {message} (Elapsed: {elapsed:.4f}s)")
-    return current_time
-
-@app.before_request
-def create_session():
-    """ Runs before every request to create a new session. """
-    t = log_with_timing(None, "[GLOBAL BEFORE_REQUEST] Creating session...")
-    g.session = ScopedSession()
-    t = log_with_timing(t, "[GLOBAL BEFORE_REQUEST] Session created and attached to g.")
+# Requests that only read never need a COMMIT; the session is simply closed
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
 
 @app.teardown_request
 def remove_session(exception=None):
     """
     Runs after every request.
+    - Does nothing if the request never used ScopedSession (sessions are
+      created lazily on first use, so no connection was checked out),
     - Rolls back if there's an exception,
-    - Otherwise commits,
+    - Commits only if the request wrote something it did not commit
+      itself; read-only work just releases its connection,
     - Then removes the session from the registry.
     """
-    t = log_with_timing(None, "[GLOBAL TEARDOWN_REQUEST] Starting teardown...")
-    session = getattr(g, 'session', None)
-    if session:
+    if not ScopedSession.registry.has():
+        return
+    session = ScopedSession()
+    try:
         if exception:
-            t = log_with_timing(t, "[GLOBAL TEARDOWN_REQUEST] Exception detected. Rolling back session.")
             session.rollback()
-        else:
-            t = log_with_timing(t, "[GLOBAL TEARDOWN_REQUEST] Committing session.")
+        elif request.method not in READ_ONLY_METHODS and has_pending_writes(session):
             session.commit()
-        t = log_with_timing(t, "[GLOBAL TEARDOWN_REQUEST] Removing session from registry.")
+    finally:
         ScopedSession.remove()
 
 if __name__ == '__main__':
+    # Gunicorn workers warm up from gunicorn.conf.py; the dev server does it here
+    start_warmup(app)
     # Replace socketio.run with standard Flask run
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,105 @@
+# server/benchmarks/fixtures.py
+
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from database import db
+from models.sql_models import CarInventory, AnalyticsData
+
+# Makes and models used to generate the inventory fixture
+MAKES_AND_MODELS = {
+    "Nissan": ["Rogue", "Altima", "Sentra", "Kicks", "Pathfinder", "Frontier", "Murano", "Versa", "Titan", "Armada"],
+    "Toyota": ["Camry", "Corolla", "RAV4", "Highlander", "Tacoma"],
+    "Ford": ["F-150", "Escape", "Explorer", "Mustang"],
+    "Honda": ["Civic", "Accord", "CR-V", "Pilot"],
+    "Chevrolet": ["Silverado", "Equinox", "Malibu", "Tahoe"],
+}
+COLORS = ["Black", "White", "Silver", "Gray", "Red", "Blue", "Pearl White", "Gun Metallic"]
+DESCRIPTIONS = [
+    "One owner, clean history report, great fuel economy.",
+    "Spacious third row seating, perfect for a growing family.",
+    "Sport package with premium audio and navigation.",
+    "All-wheel drive, heated seats and remote start.",
+    "Low mileage commuter with excellent safety ratings.",
+    "Tow package, bed liner and off-road suspension.",
+]
+MODELS_FOR_ANALYTICS = ["o3-mini-2025-01-31", "gpt-4o-mini-2024-07-18"]
+
+BATCH_SIZE = 5000
+
+
+def generate_car_rows(count: int, seed: int = 42):
+    """
+    Yield deterministic CarInventory rows as dictionaries.
+
+    :param count: Number of cars to generate
+    :param seed: Random seed so every run produces the same inventory
+    """
+    rng = random.Random(seed)
+    makes = list(MAKES_AND_MODELS)
+    created = datetime(2024, 1, 1)
+    for i in range(count):
+        make = rng.choice(makes)
+        yield {
+            "stock_number": f"STK{i:07d}",
+            "vin": f"1N4BL4BV{i:09d}",
+            "make": make,
+            "model": rng.choice(MAKES_AND_MODELS[make]),
+            "year": rng.randint(2012, 2025),
+            "price": round(rng.uniform(8000, 65000), 2),
+            "mileage": rng.randint(0, 150000),
+            "color": rng.choice(COLORS),
+            "description": rng.choice(DESCRIPTIONS),
+            "created_at": created + timedelta(minutes=i),
+        }
+
+
+def generate_analytics_rows(count: int, seed: int = 7):
+    """
+    Yield deterministic AnalyticsData rows as dictionaries.
+
+    :param count: Number of analytics records to generate
+    :param seed: Random seed so every run produces the same data
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        prompt_tokens = rng.randint(800, 6000)
+        completion_tokens = rng.randint(50, 900)
+        prompt_cost = prompt_tokens / 1_000_000 * 1.10
+        completion_cost = completion_tokens / 1_000_000 * 4.40
+        date = start + timedelta(seconds=i * 30)
+        yield {
+            "date": date,
+            "model": rng.choice(MODELS_FOR_ANALYTICS),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_cost": round(prompt_cost, 6),
+            "completion_cost": round(completion_cost, 6),
+            "total_cost": round(prompt_cost + completion_cost, 6),
+            "created_at": date,
+        }
+
+
+def _bulk_insert(model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            db.session.execute(insert(model), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(model), batch)
+
+
+def build_fixture_database(inventory_rows: int, analytics_rows: int):
+    """
+    Create all tables and fill them with the generated fixture data.
+
+    Must be called inside an application context bound to an empty database.
+    """
+    db.create_all()
+    _bulk_insert(CarInventory, generate_car_rows(inventory_rows))
+    _bulk_insert(AnalyticsData, generate_analytics_rows(analytics_rows))
+    db.session.commit()
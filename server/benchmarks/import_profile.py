@@ -0,0 +1,118 @@
+# server/benchmarks/import_profile.py
+#
+# Reports where worker start-up time goes when the app module is imported.
+#
+# Run from the server directory:
+#   python -m benchmarks.import_profile
+#   python -m benchmarks.import_profile --module app --top 30 --json profiles/imports.json
+#
+# The import runs in a fresh interpreter with `python -X importtime`, so
+# nothing already imported by this script skews the numbers.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCHMARK_DIR)
+
+
+def run_importtime(module, extra_modules=()):
+    """Import `module` in a child interpreter and return its -X importtime stderr lines."""
+    env = dict(os.environ)
+    # create_app needs these to import; any value works for a timing run
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env.setdefault("CORS_ORIGINS", "http://localhost:3000")
+    env.setdefault("OPENAI_API_KEY", "import-profile")
+    statements = "; ".join(f"import {name}" for name in (module, *extra_modules))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statements],
+        cwd=SERVER_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return result.stderr.splitlines()
+
+
+def parse_importtime(lines):
+    """
+    Parse `-X importtime` output into (module, self_us, cumulative_us, depth) tuples.
+
+    Depth is the nesting level of the import; top-level imports have depth 0.
+    """
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2 - 1
+        entries.append((name.strip(), int(self_us), int(cumulative_us), max(depth, 0)))
+    return entries
+
+
+def summarize(entries, top):
+    """Aggregate self time per top-level package and list the slowest modules."""
+    by_package = defaultdict(lambda: {"self_ms": 0.0, "modules": 0})
+    for name, self_us, _, _ in entries:
+        package = by_package[name.split(".")[0]]
+        package["self_ms"] += self_us / 1000
+        package["modules"] += 1
+
+    packages = sorted(
+        ({"package": name, "self_ms": round(data["self_ms"], 1), "modules": data["modules"]}
+         for name, data in by_package.items()),
+        key=lambda item: item["self_ms"], reverse=True
+    )
+    slowest = sorted(entries, key=lambda entry: entry[2], reverse=True)[:top]
+    return {
+        "total_ms": round(sum(entry[1] for entry in entries) / 1000, 1),
+        "module_count": len(entries),
+        "packages": packages[:top],
+        "slowest_cumulative": [
+            {"module": name, "cumulative_ms": round(cumulative_us / 1000, 1), "self_ms": round(self_us / 1000, 1)}
+            for name, self_us, cumulative_us, _ in slowest
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile import time of the server app")
+    parser.add_argument("--module", default="app", help="Module to import (default: app)")
+    parser.add_argument("--with-warmup-imports", action="store_true",
+                        help="Also import Config.WARMUP_IMPORTS, as a warmed-up worker would")
+    parser.add_argument("--top", type=int, default=20, help="Rows per table")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    extra = ()
+    if args.with_warmup_imports:
+        sys.path.insert(0, SERVER_DIR)
+        from config import Config
+        extra = tuple(Config.WARMUP_IMPORTS)
+
+    report = summarize(parse_importtime(run_importtime(args.module, extra)), args.top)
+    report["module"] = args.module
+
+    print(f"Imported {report['module']}: {report['module_count']} modules in {report['total_ms']:.1f} ms\n")
+    print(f"{'package':<32} {'self ms':>10} {'modules':>8}")
+    for row in report["packages"]:
+        print(f"{row['package']:<32} {row['self_ms']:>10.1f} {row['modules']:>8}")
+    print(f"\n{'module (cumulative)':<48} {'cum ms':>10} {'self ms':>10}")
+    for row in report["slowest_cumulative"]:
+        print(f"{row['module']:<48} {row['cumulative_ms']:>10.1f} {row['self_ms']:>10.1f}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+# server/benchmarks/prompt_footprint.py
+#
+# Measures the prompt tokens the system prompt, the tool schemas and replayed
+# conversations cost, and fails when the footprint grows past the baseline.
+#
+# Run from the server directory:
+#   python -m benchmarks.prompt_footprint
+#   python -m benchmarks.prompt_footprint --save-baseline
+#   python -m benchmarks.prompt_footprint --conversations loadtest/conversations.json --tolerance 0.02
+#
+# Tokens are counted offline: with tiktoken's o200k_base encoding (the o3-mini
+# tokenizer) when tiktoken and its cached encoding are available, otherwise
+# with an approximate GPT-style pre-tokenizer. Counts are only compared with a
+# baseline made by the same tokenizer.
+#
+# Every turn is sent to the LLM, as if the intent classifier, answer cache and
+# direct lookups all missed and nothing came from the prompt prefix cache, so
+# the numbers are a deterministic worst case. Replies and tool calls come from
+# the load-test stand-in's script; inventory tools run against a small
+# generated inventory.
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import re
+import statistics
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCHMARK_DIR)
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "prompt_footprint_baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results", "prompt_footprint.json")
+DEFAULT_CONVERSATIONS = os.path.join(SERVER_DIR, "loadtest", "conversations.json")
+
+# Fixed so the time context message has the same length on every run
+TIME_CONTEXT = {"role": "system", "content": "Current time: 2025-01-15 14:30:00 EST"}
+
+# find_car_review_videos calls YouTube; its result is replaced by one of typical size
+REVIEW_VIDEOS_RESULT = {
+    "videos": [
+        {
+            "title": f"2024 Nissan Rogue Review {i}",
+            "url": f"https://www.youtube.com/watch?v=standin{i:04d}",
+            "channel": "Car Reviews",
+            "published_at": "2024-06-01T12:00:00Z"
+        }
+        for i in range(3)
+    ]
+}
+
+# OpenAI chat format overhead: tokens around each message, and priming the reply
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+# Compared against the baseline; the first value of each pair is the report key
+TRACKED_METRICS = [
+    ("system_prompt_tokens", "system prompt"),
+    ("tool_schema_tokens", "tool schemas"),
+    ("prompt_tokens", "replayed prompt tokens"),
+]
+
+# Pieces the way GPT tokenizers pre-split text: contractions, words with their
+# leading space, up to three digits, punctuation runs and whitespace
+APPROXIMATE_PRETOKEN = re.compile(r"'(?:s|t|re|ve|m|ll|d)\b| ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\s+")
+
+
+def approximate_token_count(text: str) -> int:
+    """
+    Estimate BPE tokens without a vocabulary.
+
+    Common words are one token; longer words split about every six letters
+    and punctuation runs about every two characters.
+    """
+    count = 0
+    for piece in APPROXIMATE_PRETOKEN.findall(text):
+        stripped = piece.strip()
+        if not stripped:
+            count += 1
+        elif stripped[0].isalpha():
+            count += 1 if len(stripped) <= 8 else math.ceil(len(stripped) / 6)
+        elif stripped[0].isdigit() or stripped[0] == "'":
+            count += 1
+        else:
+            count += math.ceil(len(stripped) / 2)
+    return count
+
+
+def get_tokenizer(name: str):
+    """
+    Return (tokenizer name, count function) for "tiktoken", "approximate" or "auto".
+
+    "auto" uses tiktoken when it can load o200k_base (from TIKTOKEN_CACHE_DIR
+    or its default cache) and falls back to the approximation.
+    """
+    if name in ("tiktoken", "auto"):
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding("o200k_base")
+            return "tiktoken:o200k_base", lambda text: len(encoding.encode(text, disallowed_special=()))
+        except Exception as e:
+            if name == "tiktoken":
+                raise RuntimeError(f"tiktoken o200k_base is not available: {e}")
+    return "approximate", approximate_token_count
+
+
+def message_tokens(messages, count) -> int:
+    """Prompt tokens of a chat message list, following OpenAI's counting recipe."""
+    total = TOKENS_PER_REPLY
+    for msg in messages:
+        total += TOKENS_PER_MESSAGE + count(msg.get("role", ""))
+        if msg.get("content"):
+            total += count(str(msg["content"]))
+        if msg.get("tool_calls"):
+            total += count(json.dumps(msg["tool_calls"], separators=(",", ":")))
+        if msg.get("tool_call_id"):
+            total += count(msg["tool_call_id"])
+    return total
+
+
+def schema_tokens(schemas, count) -> int:
+    """Tokens of tool schemas serialized as compact JSON (the provider renders them its own way)."""
+    return count(json.dumps(schemas, separators=(",", ":"))) if schemas else 0
+
+
+def replay_conversation(user_messages, count, backend):
+    """
+    Replay one conversation the way process_chat and process_tool_call build their requests.
+
+    :return: A list of per-turn dicts with the tools offered, LLM calls and token counts
+    """
+    from services.chat_service import get_system_message
+    from helpers.token_utils import calculate_token_cost
+    from helpers.tool_helpers import run_tool, select_tools, tool_schemas
+
+    # The conversation ID message process_chat adds is not sent to the LLM
+    history = [get_system_message(), TIME_CONTEXT]
+    turns = []
+    for user_message in user_messages:
+        history.append({"role": "user", "content": user_message})
+        offered = select_tools(history, user_message)
+        schemas = tool_schemas(offered)
+        body = {"model": "o3-mini-2025-01-31", "messages": history}
+        if schemas:
+            body["tools"] = schemas
+        _, response = backend.complete(body)
+        reply = response["choices"][0]["message"]
+
+        prompt_tokens = message_tokens(history, count) + schema_tokens(schemas, count)
+        calls = 1
+        if reply.get("tool_calls"):
+            # The stand-in's call IDs are random; fixed ones keep the counts reproducible
+            for index, call in enumerate(reply["tool_calls"]):
+                call["id"] = f"call_{len(turns):02d}{index:02d}{'0' * 20}"
+            completion_tokens = count(json.dumps(reply["tool_calls"], separators=(",", ":")))
+            history.append({"role": "assistant", "content": "Processing your request...", "tool_calls": reply["tool_calls"]})
+            for call in reply["tool_calls"]:
+                name = call["function"]["name"]
+                args = json.loads(call["function"]["arguments"])
+                result = REVIEW_VIDEOS_RESULT if name == "find_car_review_videos" else run_tool(name, args, call["id"])
+                history.append({"role": "tool", "tool_call_id": call["id"], "content": json.dumps(result, default=str)})
+            # The follow-up call in process_tool_call sends no tools
+            _, response = backend.complete({"model": "o3-mini-2025-01-31", "messages": history})
+            reply = response["choices"][0]["message"]
+            prompt_tokens += message_tokens(history, count)
+            calls += 1
+        else:
+            completion_tokens = 0
+        completion_tokens += count(reply.get("content") or "")
+        history.append({"role": "assistant", "content": reply.get("content") or ""})
+
+        cost = calculate_token_cost(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        turns.append({
+            "user_message": user_message,
+            "tools": offered,
+            "llm_calls": calls,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_cost": cost["total_cost"]
+        })
+    return turns
+
+
+def measure_footprint(conversations, count, inventory_rows):
+    """Count the static prompt parts and replay every conversation. Needs an application context."""
+    from benchmarks.fixtures import build_fixture_database
+    from services.chat_service import get_system_message
+    from helpers.token_utils import calculate_token_cost
+    from helpers.tool_helpers import tool_manifest_digest, tool_names, tool_schemas
+    from loadtest.llm_standin import StandinBackend
+
+    build_fixture_database(inventory_rows, 0)
+    backend = StandinBackend(latency="0", seed=0)
+
+    system_message = get_system_message()
+    tools = {name: schema_tokens(tool_schemas([name]), count) for name in tool_names()}
+    replayed = []
+    for user_messages in conversations:
+        turns = replay_conversation(user_messages, count, backend)
+        replayed.append({
+            "opening": user_messages[0] if user_messages else "",
+            "turns": turns,
+            "prompt_tokens": sum(turn["prompt_tokens"] for turn in turns),
+            "completion_tokens": sum(turn["completion_tokens"] for turn in turns)
+        })
+
+    all_turns = [turn for conversation in replayed for turn in conversation["turns"]]
+    prompt_tokens = sum(turn["prompt_tokens"] for turn in all_turns)
+    completion_tokens = sum(turn["completion_tokens"] for turn in all_turns)
+    return {
+        "system_prompt_tokens": message_tokens([system_message], count) - TOKENS_PER_REPLY,
+        "system_prompt_chars": len(system_message["content"]),
+        "tool_schema_tokens": schema_tokens(tool_schemas(), count),
+        "tool_schema_tokens_by_tool": tools,
+        "tool_manifest_digest": tool_manifest_digest(),
+        "conversations": replayed,
+        "turns": len(all_turns),
+        "llm_calls": sum(turn["llm_calls"] for turn in all_turns),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "prompt_tokens_per_turn": {
+            "mean": round(statistics.fmean(turn["prompt_tokens"] for turn in all_turns), 1) if all_turns else 0,
+            "max": max((turn["prompt_tokens"] for turn in all_turns), default=0)
+        },
+        "cost": calculate_token_cost(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    }
+
+
+def print_report(report):
+    results = report["results"]
+    print(f"Tokenizer: {report['tokenizer']}")
+    print(f"System prompt: {results['system_prompt_tokens']} tokens ({results['system_prompt_chars']} chars)")
+    print(f"Tool schemas:  {results['tool_schema_tokens']} tokens (manifest {results['tool_manifest_digest']})")
+    for name, tokens in results["tool_schema_tokens_by_tool"].items():
+        print(f"  {name:<28} {tokens:6d}")
+    for conversation in results["conversations"]:
+        print(f"\nConversation: {conversation['opening']!r}")
+        print(f"  {'turn':<44} {'calls':>5} {'prompt':>7} {'compl.':>7} {'cost $':>10}  tools")
+        for turn in conversation["turns"]:
+            print(f"  {turn['user_message'][:44]:<44} {turn['llm_calls']:5d} {turn['prompt_tokens']:7d} "
+                  f"{turn['completion_tokens']:7d} {turn['total_cost']:10.6f}  {','.join(turn['tools']) or '-'}")
+    print(f"\n{results['turns']} turns, {results['llm_calls']} LLM calls: {results['prompt_tokens']} prompt tokens "
+          f"(mean {results['prompt_tokens_per_turn']['mean']} per turn), {results['completion_tokens']} completion tokens, "
+          f"${results['cost']['total_cost']:.6f}")
+
+
+def compare_to_baseline(current, baseline, tolerance):
+    """
+    Compare the tracked token counts against a baseline report.
+
+    :return: A list of human-readable regression descriptions
+    """
+    regressions = []
+    for key, label in TRACKED_METRICS:
+        base = baseline["results"].get(key)
+        value = current["results"][key]
+        if not base:
+            continue
+        ratio = value / base
+        marker = "REGRESSION" if ratio > 1 + tolerance else "ok"
+        print(f"  {label:<24} {base:8d} -> {value:8d} tokens ({ratio:5.2f}x) {marker}")
+        if marker == "REGRESSION":
+            regressions.append(f"{label}: {base} -> {value} tokens ({ratio - 1:+.1%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the prompt and tool-schema token footprint.")
+    parser.add_argument("--conversations", default=DEFAULT_CONVERSATIONS,
+                        help="JSON list of conversations, each a list of user messages")
+    parser.add_argument("--tokenizer", choices=["auto", "tiktoken", "approximate"], default="auto",
+                        help="auto: the baseline's tokenizer if available, else tiktoken, else approximate")
+    parser.add_argument("--inventory-rows", type=int, default=60, help="Generated cars the inventory tools search")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="Allowed growth before failing (0.05 = 5%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to the baseline file as well")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    tokenizer = args.tokenizer
+    if tokenizer == "auto" and baseline:
+        tokenizer = "tiktoken" if baseline["tokenizer"].startswith("tiktoken") else "approximate"
+        try:
+            tokenizer_name, count = get_tokenizer(tokenizer)
+        except RuntimeError:
+            tokenizer_name, count = get_tokenizer("auto")
+    else:
+        tokenizer_name, count = get_tokenizer(tokenizer)
+
+    with open(args.conversations, encoding="utf-8") as f:
+        conversations = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Never the configured database: the fixture inventory is written to it
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'footprint.db')}"
+        os.environ.setdefault("OPENAI_API_KEY", "benchmark-placeholder")
+        os.environ.setdefault("CORS_ORIGINS", "http://localhost:3000")
+        os.environ["INVENTORY_SNAPSHOT_ENABLED"] = "false"
+        sys.path.insert(0, SERVER_DIR)
+        # The app logs heavily to stdout; keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            from app import app
+
+            with app.app_context():
+                results = measure_footprint(conversations, count, args.inventory_rows)
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "tokenizer": tokenizer_name,
+        "conversations_file": os.path.relpath(args.conversations, SERVER_DIR),
+        "results": results,
+    }
+    print_report(report)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print("No baseline found; run with --save-baseline to create one.")
+        return 0
+    if baseline["tokenizer"] != tokenizer_name:
+        print(f"Baseline was counted with {baseline['tokenizer']}, not {tokenizer_name}; "
+              "re-save it with this tokenizer to compare.")
+        return 0
+
+    print(f"\nComparing against {args.baseline} (tolerance {args.tolerance:.0%})")
+    regressions = compare_to_baseline(report, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+# server/benchmarks/run_benchmarks.py
+#
+# Benchmarks the server hot paths against a generated SQLite database.
+#
+# Run from the server directory:
+#   python -m benchmarks.run_benchmarks --sizes 1000,10000,100000
+#   python -m benchmarks.run_benchmarks --save-baseline
+#
+# Each inventory size runs in its own process because the database engines
+# are created from DATABASE_URL when the app modules are imported.
+#
+# Results are compared with the committed benchmarks/baseline.json. Latencies
+# depend on the machine (the report records its platform), so re-save the
+# baseline when benchmarking somewhere else and commit it with the change it
+# measures.
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCHMARK_DIR)
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results", "latest.json")
+
+# Filters used by the inventory cases
+FETCH_CARS_FILTERS = {
+    "make": "Nissan",
+    "model": "Rogue",
+    "year": 2018,
+    "max_year": -1,
+    "price": -1,
+    "max_price": 30000,
+    "mileage": -1,
+    "color": "",
+    "stock_number": "",
+    "vin": ""
+}
+FETCH_CARS_BY_STOCK = dict(FETCH_CARS_FILTERS, model="", year=-1, max_price=-1, stock_number="STK0000500")
+SEARCH_FILTERS = {"make": "Nissan", "max_price": 30000}
+
+
+def percentile(sorted_values, pct):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def measure(func, iterations, warmup):
+    """
+    Call `func` repeatedly and return latency and throughput statistics.
+
+    Latencies are reported in milliseconds.
+    """
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "min_ms": latencies[0],
+        "max_ms": latencies[-1],
+    }
+
+
+def run_size(size, analytics_rows, iterations, warmup):
+    """Build the fixture database for one size and measure every case. Runs in a child process."""
+    from app import app
+    from benchmarks.fixtures import build_fixture_database
+    from database.session import ScopedSession
+    from flask import g
+    from helpers.llm_utils import fetch_cars
+    from helpers.sql_helpers import search_car_inventory
+
+    with app.app_context():
+        build_fixture_database(size, analytics_rows)
+
+    client = app.test_client()
+
+    def expect_ok(response):
+        if response.status_code != 200:
+            raise RuntimeError(f"Unexpected status {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return response
+
+    def with_app_context(func):
+        def wrapper():
+            with app.app_context():
+                return func()
+        return wrapper
+
+    def with_request_session(func):
+        def wrapper():
+            with app.app_context():
+                g.session = ScopedSession()
+                try:
+                    return func()
+                finally:
+                    ScopedSession.remove()
+        return wrapper
+
+    # (name, callable, iterations divisor) - slow whole-table cases run fewer times
+    cases = [
+        ("fetch_cars:make_model_price", with_app_context(lambda: fetch_cars(FETCH_CARS_FILTERS)), 1),
+        ("fetch_cars:stock_number", with_app_context(lambda: fetch_cars(FETCH_CARS_BY_STOCK)), 1),
+        ("search_car_inventory:text", with_request_session(lambda: search_car_inventory("family", SEARCH_FILTERS, 50)), 1),
+        ("GET /api/inventory", lambda: expect_ok(client.get("/api/inventory")), 4),
+        ("POST /api/search-cars", lambda: expect_ok(client.post("/api/search-cars", json=FETCH_CARS_FILTERS)), 1),
+        ("GET /api/analytics/summary", lambda: expect_ok(client.get("/api/analytics/summary")), 1),
+        ("GET /api/analytics/download", lambda: expect_ok(client.get("/api/analytics/download")), 4),
+    ]
+
+    results = {}
+    for name, func, divisor in cases:
+        # The app logs every request to stdout; keep it out of the measurements
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = measure(func, max(1, iterations // divisor), max(1, warmup // divisor))
+    return results
+
+
+def compare_to_baseline(current, baseline, tolerance):
+    """
+    Compare p50 latency per case against a baseline report.
+
+    :return: A list of human-readable regression descriptions
+    """
+    regressions = []
+    for size, cases in current["results"].items():
+        baseline_cases = baseline.get("results", {}).get(size, {})
+        for name, stats in cases.items():
+            base = baseline_cases.get(name)
+            if not base:
+                continue
+            ratio = stats["p50_ms"] / base["p50_ms"] if base["p50_ms"] else 1.0
+            marker = "REGRESSION" if ratio > 1 + tolerance else "ok"
+            print(f"  [{size:>7}] {name:<32} p50 {base['p50_ms']:9.3f} -> {stats['p50_ms']:9.3f} ms ({ratio:5.2f}x) {marker}")
+            if marker == "REGRESSION":
+                regressions.append(f"{name} @ {size} rows: {ratio:.2f}x slower p50")
+    return regressions
+
+
+def print_report(report):
+    for size, cases in report["results"].items():
+        print(f"\nInventory rows: {size}")
+        print(f"  {'case':<32} {'ops/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+        for name, stats in cases.items():
+            print(f"  {name:<32} {stats['ops_per_sec']:10.1f} {stats['p50_ms']:10.3f} {stats['p95_ms']:10.3f} {stats['p99_ms']:10.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the server hot paths against a generated SQLite database.")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated CarInventory row counts")
+    parser.add_argument("--analytics-rows", type=int, default=100000, help="Rows generated in analytics_data")
+    parser.add_argument("--iterations", type=int, default=40, help="Timed calls per case")
+    parser.add_argument("--warmup", type=int, default=4, help="Untimed calls per case")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to the baseline file as well")
+    parser.add_argument("--child-size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--child-output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child_size is not None:
+        results = run_size(args.child_size, args.analytics_rows, args.iterations, args.warmup)
+        with open(args.child_output, "w") as f:
+            json.dump(results, f)
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "analytics_rows": args.analytics_rows,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+        },
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            print(f"Benchmarking {size} inventory rows...")
+            db_path = os.path.join(tmp, f"bench_{size}.db")
+            child_output = os.path.join(tmp, f"results_{size}.json")
+            env = dict(os.environ)
+            env["DATABASE_URL"] = f"sqlite:///{db_path}"
+            env.setdefault("OPENAI_API_KEY", "benchmark-placeholder")
+            env.setdefault("CORS_ORIGINS", "http://localhost:3000")
+            subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.run_benchmarks",
+                    "--child-size", str(size),
+                    "--child-output", child_output,
+                    "--analytics-rows", str(args.analytics_rows),
+                    "--iterations", str(args.iterations),
+                    "--warmup", str(args.warmup),
+                ],
+                cwd=SERVER_DIR,
+                env=env,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            with open(child_output) as f:
+                report["results"][str(size)] = json.load(f)
+
+    print_report(report)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print(f"\nComparing against {args.baseline} (tolerance {args.tolerance:.0%})")
+    regressions = compare_to_baseline(report, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
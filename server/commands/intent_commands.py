@@ -0,0 +1,85 @@
+# server/commands/intent_commands.py
+
+import json
+import os
+from collections import Counter
+import click
+import joblib
+from sklearn.model_selection import cross_val_score
+from database import db
+from models.sql_models import AutoLeadInteractionDetails
+from helpers.transcript_helpers import decompress_transcript
+from helpers.intent_helpers import (
+    FAQ_TEMPLATES, OTHER, build_intent_pipeline, classify_intent, normalize_message, seed_examples, train_intent_model
+)
+from config import Config
+
+
+@click.command("export-intent-examples")
+@click.argument("output_path", type=click.Path(dir_okay=False, writable=True))
+@click.option("--max-chars", default=200, show_default=True, help="Skip user messages longer than this")
+def export_intent_examples_command(output_path, max_chars):
+    """
+    Write the user messages of logged conversations to OUTPUT_PATH as JSON Lines.
+
+    Each line is pre-labelled by the current classifier; review the `intent`
+    values and pass the file to train-intent-classifier.
+    """
+    seen = set()
+    query = (
+        db.session.query(AutoLeadInteractionDetails.conversation_transcript)
+        .filter(AutoLeadInteractionDetails.conversation_transcript.isnot(None))
+        .yield_per(500)
+    )
+    with open(output_path, "w", encoding="utf-8") as output:
+        for (blob,) in query:
+            for msg in decompress_transcript(blob):
+                text = msg.get("content") if msg.get("role") == "user" else None
+                if not isinstance(text, str) or not text.strip() or len(text) > max_chars:
+                    continue
+                normalized = normalize_message(text)
+                if normalized in seen:
+                    continue
+                seen.add(normalized)
+                intent, confidence = classify_intent(text)
+                output.write(json.dumps({"text": text, "intent": intent, "confidence": round(confidence, 3)}) + "\n")
+    click.echo(f"Wrote {len(seen)} distinct messages to {output_path}")
+
+
+@click.command("train-intent-classifier")
+@click.option("--examples", "examples_path", type=click.Path(exists=True, dir_okay=False),
+              help="Labelled JSON Lines from export-intent-examples")
+@click.option("--output", "output_path", help="Model file (defaults to INTENT_MODEL_PATH)")
+def train_intent_classifier_command(examples_path, output_path):
+    """Train the intent classifier on the seed examples plus labelled logged messages."""
+    examples = seed_examples()
+    if examples_path:
+        with open(examples_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                example = json.loads(line)
+                if example.get("intent") not in FAQ_TEMPLATES and example.get("intent") != OTHER:
+                    raise click.BadParameter(f"Unknown intent {example.get('intent')!r} for {example.get('text')!r}")
+                examples.append((example["text"], example["intent"]))
+
+    counts = Counter(intent for _, intent in examples)
+    folds = min(5, min(counts.values()))
+    if folds >= 2:
+        texts = [normalize_message(text) for text, _ in examples]
+        labels = [intent for _, intent in examples]
+        accuracy = cross_val_score(build_intent_pipeline(), texts, labels, cv=folds)
+        click.echo(f"{folds}-fold accuracy: {accuracy.mean():.3f} (+/- {accuracy.std():.3f})")
+
+    model = train_intent_model(examples)
+    output_path = output_path or Config.INTENT_MODEL_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    joblib.dump(model, output_path)
+    click.echo(json.dumps({"path": output_path, "examples": len(examples), "intents": dict(counts)}, indent=2))
+
+
+def register_commands(app):
+    """Register the intent classifier CLI commands with the Flask app."""
+    app.cli.add_command(export_intent_examples_command)
+    app.cli.add_command(train_intent_classifier_command)
+    return app
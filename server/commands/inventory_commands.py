@@ -0,0 +1,44 @@
+# server/commands/inventory_commands.py
+
+import json
+import click
+from database import db
+from services.inventory_ingest_service import ingest_inventory_feed, detect_feed_format, DEFAULT_BATCH_SIZE
+from helpers.snapshot_helpers import build_inventory_snapshot
+
+
+@click.command("ingest-inventory")
+@click.argument("feed_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "feed_format", type=click.Choice(["csv", "json", "jsonl"]), help="Feed format (guessed from the file name by default)")
+@click.option("--keep-missing", is_flag=True, help="Keep cars that are not in the feed instead of deleting them")
+@click.option("--dry-run", is_flag=True, help="Report the diff without writing anything")
+@click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True, help="Rows per bulk statement")
+def ingest_inventory_command(feed_path, feed_format, keep_missing, dry_run, batch_size):
+    """Load a dealer inventory feed from FEED_PATH."""
+    with open(feed_path, encoding="utf-8-sig", newline="") as feed:
+        result, status_code = ingest_inventory_feed(
+            feed,
+            feed_format or detect_feed_format(feed_path),
+            source=feed_path,
+            delete_missing=not keep_missing,
+            dry_run=dry_run,
+            batch_size=batch_size
+        )
+    click.echo(json.dumps(result, indent=2))
+    if status_code != 200:
+        raise SystemExit(1)
+
+
+@click.command("build-inventory-snapshot")
+@click.option("--path", help="Snapshot file (defaults to INVENTORY_SNAPSHOT_PATH)")
+def build_inventory_snapshot_command(path):
+    """Write the current stock to the memory-mapped inventory snapshot."""
+    result = build_inventory_snapshot(db.session, path)
+    click.echo(json.dumps(result, indent=2))
+
+
+def register_commands(app):
+    """Register the inventory CLI commands with the Flask app."""
+    app.cli.add_command(ingest_inventory_command)
+    app.cli.add_command(build_inventory_snapshot_command)
+    return app
@@ -0,0 +1,22 @@
+# server/commands/profiling_commands.py
+
+import click
+from helpers.profiling_helpers import convert_profile
+
+
+@click.command("profile-to-folded")
+@click.argument("prof_paths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--max-paths", default=20000, show_default=True, help="Stop after this many call paths")
+@click.option("--min-fraction", default=0.001, show_default=True,
+              help="Drop call edges with less than this share of the total time")
+def profile_to_folded_command(prof_paths, max_paths, min_fraction):
+    """Convert cProfile .prof files written by the request profiler to folded stacks."""
+    for prof_path in prof_paths:
+        folded_path = convert_profile(prof_path, max_paths=max_paths, min_fraction=min_fraction)
+        click.echo(f"{prof_path} -> {folded_path}")
+
+
+def register_commands(app):
+    """Register the profiling CLI commands with the Flask app."""
+    app.cli.add_command(profile_to_folded_command)
+    return app
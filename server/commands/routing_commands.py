@@ -0,0 +1,94 @@
+# server/commands/routing_commands.py
+
+import json
+import os
+from collections import Counter
+import click
+import joblib
+from sklearn.model_selection import StratifiedKFold
+from database import db
+from models.sql_models import AutoLeadInteractionDetails, ConversationSummary
+from helpers.transcript_helpers import decompress_transcript
+from helpers.routing_helpers import (
+    ROUTING_FIELDS, ROUTING_LABELS, conversation_text, seed_examples, train_routing_model
+)
+from config import Config
+
+
+def _summarized_examples():
+    """Yield (text, labels) for every stored conversation with an LLM summary and a transcript."""
+    query = (
+        db.session.query(
+            AutoLeadInteractionDetails.conversation_transcript,
+            ConversationSummary.sentiment,
+            ConversationSummary.department,
+            ConversationSummary.insights
+        )
+        .join(ConversationSummary, ConversationSummary.conversation_id == AutoLeadInteractionDetails.conversation_id)
+        .filter(AutoLeadInteractionDetails.conversation_transcript.isnot(None), ConversationSummary.summary != "")
+        .yield_per(500)
+    )
+    for blob, sentiment, department, insights in query:
+        labels = {"sentiment": sentiment, "department": department, "urgency": (insights or {}).get("urgency")}
+        text = conversation_text(decompress_transcript(blob))
+        # Skip summaries with labels outside the prompt's choices (and error summaries' empty text)
+        if text and all(labels[field] in ROUTING_LABELS[field] for field in ROUTING_FIELDS):
+            yield text, labels
+
+
+def _cross_validate(examples, folds: int) -> dict:
+    """Per-field accuracy of the model over `folds` folds, stratified by department."""
+    texts = [text for text, _ in examples]
+    correct = Counter()
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    for train, test in splitter.split(texts, [labels["department"] for _, labels in examples]):
+        train_examples = [examples[i] for i in train]
+        # Every field needs two classes in the training fold to be fitted
+        if any(len({labels[field] for _, labels in train_examples}) < 2 for field in ROUTING_FIELDS):
+            return {}
+        model = train_routing_model(train_examples)
+        for i, prediction in zip(test, model.predict([texts[i] for i in test])):
+            for field in ROUTING_FIELDS:
+                correct[field] += prediction[field] == examples[i][1][field]
+    return {field: round(correct[field] / len(examples), 3) for field in ROUTING_FIELDS}
+
+
+@click.command("train-routing-classifier")
+@click.option("--output", "output_path", help="Model file (defaults to ROUTING_MODEL_PATH)")
+@click.option("--no-seed", is_flag=True, help="Train on stored summaries only")
+def train_routing_classifier_command(output_path, no_seed):
+    """
+    Train the lead routing classifier on the stored LLM summaries.
+
+    Each summarized conversation's customer messages are labelled with the
+    sentiment, urgency and department its summary gave it.
+    """
+    examples = [] if no_seed else seed_examples()
+    stored = list(_summarized_examples())
+    examples.extend(stored)
+    if not examples:
+        raise click.ClickException("No training examples")
+
+    departments = Counter(labels["department"] for _, labels in examples)
+    folds = min(5, min(departments.values()))
+    if folds >= 2:
+        accuracy = _cross_validate(examples, folds)
+        if accuracy:
+            click.echo(f"{folds}-fold accuracy: {json.dumps(accuracy)}")
+
+    model = train_routing_model(examples)
+    output_path = output_path or Config.ROUTING_MODEL_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    joblib.dump(model, output_path)
+    click.echo(json.dumps({
+        "path": output_path,
+        "examples": len(examples),
+        "stored_summaries": len(stored),
+        "departments": dict(departments)
+    }, indent=2))
+
+
+def register_commands(app):
+    """Register the routing classifier CLI commands with the Flask app."""
+    app.cli.add_command(train_routing_classifier_command)
+    return app
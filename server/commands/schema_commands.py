@@ -0,0 +1,193 @@
+# server/commands/schema_commands.py
+
+import json
+import click
+from sqlalchemy import LargeBinary, inspect, text
+from sqlalchemy.exc import IntegrityError
+from database import db
+from models.sql_models import AutoLeadInteractionDetails, CarInventory, ConversationSummary
+from helpers.transcript_helpers import compress_transcript
+
+# Schema changes made to existing tables after they were first created, in the
+# order they were introduced. db.create_all() only creates missing tables, so a
+# database created before a change needs these steps; each step checks the
+# live schema first, so `flask upgrade-schema` can be re-run safely.
+
+
+class SchemaStep:
+    """A schema change: whether the live schema still needs it, and how to apply it."""
+
+    def __init__(self, description: str, needed, apply):
+        self.description = description
+        self.needed = needed  # needed(inspector) -> bool
+        self.apply = apply  # apply(connection)
+
+
+def add_column(model, name: str, extra_ddl: str = "", backfill: str = None) -> SchemaStep:
+    """
+    Add a model's column to its table.
+
+    :param extra_ddl: Clauses after the column type, e.g. "NOT NULL DEFAULT 0"
+    :param backfill: An UPDATE statement run right after the column is added
+    """
+    table = model.__tablename__
+    column = model.__table__.c[name]
+
+    def needed(inspector):
+        return inspector.has_table(table) and name not in {c["name"] for c in inspector.get_columns(table)}
+
+    def apply(connection):
+        column_type = column.type.compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {column_type} {extra_ddl}".rstrip()))
+        if backfill:
+            connection.execute(text(backfill))
+
+    return SchemaStep(f"add column {table}.{name}", needed, apply)
+
+
+def create_index(model, name: str) -> SchemaStep:
+    """
+    Create one of a model's declared indexes.
+
+    An existing index of the same name that differs in uniqueness is dropped
+    and recreated.
+    """
+    table = model.__tablename__
+    index = next(index for index in model.__table__.indexes if index.name == name)
+
+    def _existing(inspector):
+        return next((i for i in inspector.get_indexes(table) if i["name"] == name), None)
+
+    def needed(inspector):
+        if not inspector.has_table(table):
+            return False
+        existing = _existing(inspector)
+        return existing is None or bool(existing["unique"]) != bool(index.unique)
+
+    def apply(connection):
+        if _existing(inspect(connection)) is not None:
+            index.drop(connection)
+        index.create(connection)
+
+    kind = "unique index" if index.unique else "index"
+    return SchemaStep(f"create {kind} {name}", needed, apply)
+
+
+def _compress_legacy_transcript(value: str) -> bytes:
+    """Compress a transcript stored as JSON text; anything else is kept as a single message."""
+    try:
+        messages = json.loads(value)
+    except ValueError:
+        messages = None
+    if not isinstance(messages, list):
+        messages = [{"role": "transcript", "content": value}]
+    return compress_transcript(messages)
+
+
+def convert_transcripts_to_binary(batch_size: int = 500) -> SchemaStep:
+    """
+    Turn the JSON text transcripts into zlib-compressed binary.
+
+    The compressed copies are written to a new column, which then replaces the
+    text column.
+    """
+    table = AutoLeadInteractionDetails.__tablename__
+    column = AutoLeadInteractionDetails.__table__.c.conversation_transcript
+
+    def needed(inspector):
+        if not inspector.has_table(table):
+            return False
+        columns = {c["name"]: c["type"] for c in inspector.get_columns(table)}
+        return "conversation_transcript" in columns and not isinstance(columns["conversation_transcript"], LargeBinary)
+
+    def apply(connection):
+        binary_type = column.type.compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN conversation_transcript_zlib {binary_type}"))
+        after_id = 0
+        while True:
+            rows = connection.execute(text(
+                f"SELECT interaction_id, conversation_transcript FROM {table} "
+                "WHERE interaction_id > :after_id AND conversation_transcript IS NOT NULL "
+                "ORDER BY interaction_id LIMIT :limit"
+            ), {"after_id": after_id, "limit": batch_size}).all()
+            if not rows:
+                break
+            connection.execute(
+                text(f"UPDATE {table} SET conversation_transcript_zlib = :blob WHERE interaction_id = :id"),
+                [{"id": row[0], "blob": _compress_legacy_transcript(row[1])} for row in rows]
+            )
+            after_id = rows[-1][0]
+        connection.execute(text(f"ALTER TABLE {table} DROP COLUMN conversation_transcript"))
+        connection.execute(text(f"ALTER TABLE {table} RENAME COLUMN conversation_transcript_zlib TO conversation_transcript"))
+
+    return SchemaStep(f"compress {table}.conversation_transcript", needed, apply)
+
+
+SCHEMA_STEPS = [
+    # Inventory delta sync
+    add_column(CarInventory, "updated_at",
+               backfill="UPDATE car_inventory SET updated_at = created_at WHERE updated_at IS NULL"),
+    add_column(CarInventory, "deleted_at"),
+    add_column(CarInventory, "change_version", "NOT NULL DEFAULT 0"),
+    create_index(CarInventory, "ix_car_inventory_change_version"),
+    # One lead interaction per conversation; fails if duplicates were already recorded
+    add_column(AutoLeadInteractionDetails, "conversation_id"),
+    create_index(AutoLeadInteractionDetails, "ix_auto_leads_interaction_details_conversation_id"),
+    # Lead facets
+    create_index(AutoLeadInteractionDetails, "ix_lead_interactions_keywords"),
+    create_index(AutoLeadInteractionDetails, "ix_lead_interactions_created_facets"),
+    # Lead listing keyset pagination
+    create_index(AutoLeadInteractionDetails, "ix_lead_interactions_created_id"),
+    create_index(AutoLeadInteractionDetails, "ix_lead_interactions_priority_created_id"),
+    create_index(AutoLeadInteractionDetails, "ix_lead_interactions_sentiment_created_id"),
+    # Compressed transcripts
+    convert_transcripts_to_binary(),
+    # Summaries regenerated after enough new turns
+    add_column(ConversationSummary, "summarized_messages", "NOT NULL DEFAULT 0"),
+]
+
+
+def pending_schema_steps(connection) -> list:
+    """Return the steps the connected database still needs."""
+    inspector = inspect(connection)
+    return [step for step in SCHEMA_STEPS if step.needed(inspector)]
+
+
+@click.command("upgrade-schema")
+@click.option("--dry-run", is_flag=True, help="List the pending changes without applying them")
+def upgrade_schema_command(dry_run):
+    """
+    Bring an existing database up to the models' schema.
+
+    Creates missing tables, then adds the columns and indexes introduced
+    since and converts changed columns, in one transaction. Already applied
+    steps are skipped.
+    """
+    with db.engine.begin() as connection:
+        missing = [table for table in db.metadata.sorted_tables if not inspect(connection).has_table(table.name)]
+        for table in missing:
+            click.echo(f"create table {table.name}")
+        if missing and not dry_run:
+            db.metadata.create_all(connection, tables=missing)
+
+        steps = pending_schema_steps(connection)
+        for step in steps:
+            click.echo(step.description)
+            if not dry_run:
+                try:
+                    step.apply(connection)
+                except IntegrityError as e:
+                    raise click.ClickException(f"{step.description} failed, nothing was applied: {e.orig}")
+
+    if not missing and not steps:
+        click.echo("Schema is up to date")
+    elif dry_run:
+        click.echo(f"{len(missing) + len(steps)} pending changes (dry run, nothing applied)")
+    else:
+        click.echo(f"Applied {len(missing) + len(steps)} changes")
+
+
+def register_commands(app):
+    """Register the schema CLI commands with the Flask app."""
+    app.cli.add_command(upgrade_schema_command)
+    return app
@@ -0,0 +1,54 @@
+# server/commands/summary_commands.py
+
+import json
+import os
+import click
+from services.summary_backfill_service import run_summary_backfill
+from config import Config
+
+
+@click.command("backfill-summaries")
+@click.option("--input", "input_path", type=click.Path(exists=True, dir_okay=False),
+              help="JSON array or JSON Lines export of conversations (default: stored transcripts)")
+@click.option("--all", "resummarize", is_flag=True, help="Also resummarize stored conversations that already have a summary")
+@click.option("--chunk-size", type=int, default=Config.SUMMARY_BACKFILL_CHUNK_SIZE, show_default=True,
+              help="Conversations per bulk write and checkpoint")
+@click.option("--concurrency", type=int, default=Config.SUMMARY_BACKFILL_CONCURRENCY, show_default=True,
+              help="Parallel LLM calls")
+@click.option("--checkpoint", "checkpoint_path", help="Checkpoint file (default: backfill/<source>.checkpoint.json)")
+@click.option("--restart", is_flag=True, help="Ignore an existing checkpoint and start from the beginning")
+@click.option("--limit", type=int, help="Stop after this many conversations")
+def backfill_summaries_command(input_path, resummarize, chunk_size, concurrency, checkpoint_path, restart, limit):
+    """
+    Summarize historical conversations in bulk.
+
+    Re-running the same command resumes after the last completed chunk.
+    """
+    source = f"file:{os.path.abspath(input_path)}" if input_path else ("database:all" if resummarize else "database:missing")
+    if not checkpoint_path:
+        name = os.path.splitext(os.path.basename(input_path))[0] if input_path else source.replace(":", "-")
+        checkpoint_path = os.path.join("backfill", f"{name}.checkpoint.json")
+    if restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    options = dict(
+        source=source,
+        missing_only=not resummarize,
+        chunk_size=chunk_size,
+        concurrency=concurrency,
+        checkpoint_path=checkpoint_path,
+        limit=limit,
+        progress=click.echo
+    )
+    if input_path:
+        with open(input_path, encoding="utf-8-sig") as input_stream:
+            result = run_summary_backfill(input_stream, **options)
+    else:
+        result = run_summary_backfill(**options)
+    click.echo(json.dumps(result, indent=2))
+
+
+def register_commands(app):
+    """Register the summary CLI commands with the Flask app."""
+    app.cli.add_command(backfill_summaries_command)
+    return app
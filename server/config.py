@@ -17,3 +17,120 @@ class Config:
     # CORS settings
     CORS_ORIGINS = os.getenv("CORS_ORIGINS")
     CORS_SUPPORTS_CREDENTIALS = True
+    CORS_ALLOW_HEADERS = ["Content-Type", "Authorization", "userUUID", "Idempotency-Key"]
+    # How long browsers may cache a preflight (Chrome caps this at 2 hours)
+    CORS_PREFLIGHT_MAX_AGE = int(os.getenv("CORS_PREFLIGHT_MAX_AGE", "7200"))
+
+    # Duplicate chat submission settings
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "60"))
+    IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "1000"))
+
+    # Conversation summary read-through cache
+    SUMMARY_CACHE_TTL_SECONDS = int(os.getenv("SUMMARY_CACHE_TTL_SECONDS", "300"))
+    SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "5000"))
+    # A conversation's summary is regenerated only after this many new user/assistant messages
+    SUMMARY_REGENERATE_AFTER_MESSAGES = int(os.getenv("SUMMARY_REGENERATE_AFTER_MESSAGES", "4"))
+    # A summary claimed by a request that never finished may be retaken after this long
+    SUMMARY_CLAIM_TIMEOUT_SECONDS = int(os.getenv("SUMMARY_CLAIM_TIMEOUT_SECONDS", "120"))
+    # `flask backfill-summaries`: conversations per bulk write, parallel LLM calls and retry policy
+    SUMMARY_BACKFILL_CHUNK_SIZE = int(os.getenv("SUMMARY_BACKFILL_CHUNK_SIZE", "200"))
+    SUMMARY_BACKFILL_CONCURRENCY = int(os.getenv("SUMMARY_BACKFILL_CONCURRENCY", "16"))
+    SUMMARY_BACKFILL_MAX_RETRIES = int(os.getenv("SUMMARY_BACKFILL_MAX_RETRIES", "5"))
+    SUMMARY_BACKFILL_MAX_BACKOFF_SECONDS = float(os.getenv("SUMMARY_BACKFILL_MAX_BACKOFF_SECONDS", "30"))
+    SUMMARY_BACKFILL_MAX_FAILURES_KEPT = int(os.getenv("SUMMARY_BACKFILL_MAX_FAILURES_KEPT", "1000"))
+
+    # Lead analytics facet cache
+    LEAD_FACETS_CACHE_TTL_SECONDS = int(os.getenv("LEAD_FACETS_CACHE_TTL_SECONDS", "60"))
+
+    # JSON provider: auto (orjson when installed), orjson or stdlib
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto").lower()
+
+    # Response compression (brotli when installed, otherwise gzip)
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+    COMPRESSION_MIMETYPES = {
+        "application/json",
+        "text/csv",
+        "text/html",
+        "text/plain",
+    }
+
+    # Feeds deleting missing cars are refused when more than this share of their rows is rejected
+    INGEST_MAX_ERROR_RATIO = float(os.getenv("INGEST_MAX_ERROR_RATIO", "0.05"))
+
+    # Memory-mapped inventory snapshot shared by all workers (off by default;
+    # rebuilt after every feed ingest, or with `flask build-inventory-snapshot`)
+    INVENTORY_SNAPSHOT_ENABLED = os.getenv("INVENTORY_SNAPSHOT_ENABLED", "false").lower() == "true"
+    INVENTORY_SNAPSHOT_PATH = os.getenv("INVENTORY_SNAPSHOT_PATH", os.path.join("snapshots", "inventory.snap"))
+    INVENTORY_SNAPSHOT_CHECK_SECONDS = float(os.getenv("INVENTORY_SNAPSHOT_CHECK_SECONDS", "2"))
+
+    # TF-IDF search over inventory descriptions (semantic_search_cars tool and endpoint)
+    SEMANTIC_SEARCH_ENABLED = os.getenv("SEMANTIC_SEARCH_ENABLED", "true").lower() == "true"
+    SEMANTIC_SEARCH_CHECK_SECONDS = float(os.getenv("SEMANTIC_SEARCH_CHECK_SECONDS", "5"))
+    # Refit the vocabulary once this share of the index has changed incrementally
+    SEMANTIC_SEARCH_REFIT_RATIO = float(os.getenv("SEMANTIC_SEARCH_REFIT_RATIO", "0.2"))
+    SEMANTIC_SEARCH_MAX_RESULTS = int(os.getenv("SEMANTIC_SEARCH_MAX_RESULTS", "10"))
+
+    # Local intent classifier that answers greetings and dealership FAQs without the LLM
+    INTENT_CLASSIFIER_ENABLED = os.getenv("INTENT_CLASSIFIER_ENABLED", "true").lower() == "true"
+    # Written by `flask train-intent-classifier`; the built-in seed examples are used until it exists
+    INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", os.path.join("trained_models", "intent_classifier.joblib"))
+    INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.75"))
+    INTENT_MAX_MESSAGE_CHARS = int(os.getenv("INTENT_MAX_MESSAGE_CHARS", "80"))
+
+    # Local classifier that fills an ended conversation's routing fields (sentiment,
+    # urgency, department) immediately; the LLM summary then runs in the background.
+    # Used only once `flask train-routing-classifier` has written ROUTING_MODEL_PATH.
+    ROUTING_CLASSIFIER_ENABLED = os.getenv("ROUTING_CLASSIFIER_ENABLED", "false").lower() == "true"
+    ROUTING_MODEL_PATH = os.getenv("ROUTING_MODEL_PATH", os.path.join("trained_models", "routing_classifier.joblib"))
+    # Below this probability for any field, the conversation is routed by the LLM summary instead
+    ROUTING_MIN_CONFIDENCE = float(os.getenv("ROUTING_MIN_CONFIDENCE", "0.6"))
+    SUMMARY_ASYNC_WORKERS = int(os.getenv("SUMMARY_ASYNC_WORKERS", "4"))
+
+    # First-turn answers reused for near-identical opening questions (per worker,
+    # dropped whenever a feed ingest creates a new inventory version)
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "500"))
+    # Also the longest an inventory edit made outside feed ingestion can go unseen
+    ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "300"))
+    # Minimum cosine similarity of character n-grams for a cached answer to be reused
+    ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.9"))
+    ANSWER_CACHE_MAX_MESSAGE_CHARS = int(os.getenv("ANSWER_CACHE_MAX_MESSAGE_CHARS", "200"))
+
+    # Send fetch_cars plus only the optional tools a conversation has needed so far
+    # (off: every tool on every call)
+    TOOL_SELECTION_ENABLED = os.getenv("TOOL_SELECTION_ENABLED", "true").lower() == "true"
+
+    # Speculative inventory lookups started alongside the first LLM call
+    PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+    PREFETCH_MAX_WORKERS = int(os.getenv("PREFETCH_MAX_WORKERS", "4"))
+    PREFETCH_WAIT_SECONDS = float(os.getenv("PREFETCH_WAIT_SECONDS", "0.5"))
+    PREFETCH_RESULT_TTL_SECONDS = int(os.getenv("PREFETCH_RESULT_TTL_SECONDS", "120"))
+    PREFETCH_VOCABULARY_TTL_SECONDS = int(os.getenv("PREFETCH_VOCABULARY_TTL_SECONDS", "300"))
+    # Answer messages naming a VIN or stock number without the first LLM call
+    PREFETCH_DIRECT_LOOKUPS = os.getenv("PREFETCH_DIRECT_LOOKUPS", "false").lower() == "true"
+
+    # Worker warm-up before /healthz/ready reports ready
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", "2"))
+    WARMUP_LLM = os.getenv("WARMUP_LLM", "true").lower() == "true"
+    WARMUP_HTTP_TIMEOUT = float(os.getenv("WARMUP_HTTP_TIMEOUT", "5"))
+    WARMUP_IMPORTS = [
+        "googleapiclient.discovery",
+    ]
+
+    # Admin token required by the admin endpoints and the profile header
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+    # Per-request profiling (off by default)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILE_HEADER = "X-Profile-Request"
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_MODE = os.getenv("PROFILE_MODE", "cprofile")  # cprofile or sample
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+    PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", "profiles")
+
+    # tracemalloc admin endpoints (off by default)
+    MEMORY_PROFILING_ENABLED = os.getenv("MEMORY_PROFILING_ENABLED", "false").lower() == "true"
@@ -5,7 +5,10 @@ from flask import Flask
 from flask_cors import CORS
 from config import Config
 from database import db, bcrypt
-import os
+from helpers.profiling_helpers import init_profiling
+from helpers.json_helpers import init_json_provider
+from helpers.compression_helpers import init_compression
+from helpers.cors_helpers import allowed_origins, init_cors_preflight
 
 # create_app function to initialize the Flask application
 def create_app():
@@ -19,15 +22,25 @@ def create_app():
     db.init_app(app)
     bcrypt.init_app(app)
 
-    # Setup CORS configurations
-    allowed_origins = os.getenv("CORS_ORIGINS")
-
+    # Setup CORS configurations for regular responses
     CORS(
         app,
         supports_credentials=True,
         resources={
-            r"/*": {"origins": allowed_origins}
+            r"/*": {"origins": allowed_origins()}
         }
     )
 
+    # Answer preflights before routing and session setup
+    init_cors_preflight(app)
+
+    # Use orjson for jsonify and returned dicts when it is available
+    init_json_provider(app)
+
+    # Compress large JSON/text responses
+    init_compression(app)
+
+    # Register per-request profiling hooks (no-op unless PROFILING_ENABLED)
+    init_profiling(app)
+
     return app
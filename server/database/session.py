@@ -1,6 +1,6 @@
 # /server/database/session.py
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, scoped_session
 import os
 
@@ -18,3 +18,24 @@ SessionFactory = sessionmaker(bind=engine)
 
 # Create a scoped session
 ScopedSession = scoped_session(SessionFactory)
+
+
+# Track whether a session has written anything since its last commit or
+# rollback, so request teardown can skip COMMIT for read-only work.
+@event.listens_for(SessionFactory, "do_orm_execute")
+def _mark_write_statement(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+@event.listens_for(SessionFactory, "after_flush")
+def _mark_flush(session, flush_context):
+    session.info["has_writes"] = True
+
+@event.listens_for(SessionFactory, "after_commit")
+@event.listens_for(SessionFactory, "after_rollback")
+def _clear_writes(session):
+    session.info.pop("has_writes", None)
+
+def has_pending_writes(session) -> bool:
+    """True if the session has unflushed changes or executed writes that are not committed yet."""
+    return bool(session.new or session.dirty or session.deleted or session.info.get("has_writes"))
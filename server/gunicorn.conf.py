@@ -0,0 +1,9 @@
+# server/gunicorn.conf.py
+#
+# Loaded automatically by gunicorn from the working directory (see Procfile).
+
+
+def post_worker_init(worker):
+    """Warm each worker up once it has loaded the app; /healthz/ready turns 200 when done."""
+    from helpers.warmup_helpers import start_warmup
+    start_warmup(worker.wsgi)
@@ -0,0 +1,203 @@
+# server/helpers/answer_cache_helpers.py
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sqlalchemy import func, select
+from models.sql_models import InventoryVersion
+from helpers.intent_helpers import normalize_message
+from config import Config
+
+# Cache of first-turn answers shared by every conversation in this worker.
+#
+# An opening question is answered by the system prompt, the question itself
+# and (through fetch_cars) the inventory, so a new conversation asking nearly
+# the same thing can reuse the messages the model produced last time. Entries
+# belong to one inventory version and are all dropped when it changes.
+#
+# Only feed ingestion creates inventory versions. A car edited any other way
+# (SQL, an admin tool) leaves cached answers that mention it stale until they
+# expire, so ANSWER_CACHE_TTL_SECONDS bounds how long such an edit can go
+# unseen; keep it short, or clear the cache after out-of-band edits.
+
+# Character n-grams of the normalized message, hashed so nothing needs fitting;
+# rows are L2-normalized so the dot product is the cosine similarity
+_vectorizer = HashingVectorizer(analyzer="char_wb", ngram_range=(3, 5), n_features=2 ** 18, alternate_sign=False)
+
+# "under 30k" and "under 20k", or "rogue sv" and "rogue sl", are near-identical
+# strings with different answers, so apart from the words below every token
+# (numbers, trims like pro-4x, drivetrains like awd) must match exactly
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['.,-][a-z0-9]+)*")
+STOP_WORDS = frozenset((
+    "a an the any some do does did you your yours have has got is are there i i'm me my we us our "
+    "please can could would will like looking look for in of to on at with about show tell see want need "
+    "get what which whats what's how hi hello hey thanks thank"
+).split())
+# Answers to these depend on the current time, which the cache does not see
+TIME_SENSITIVE_PATTERN = re.compile(
+    r"\b(now|today|tonight|tomorrow|yesterday|this (?:morning|afternoon|evening|week|weekend)|open|closed?|hours?)\b"
+)
+
+
+def content_tokens(text: str) -> frozenset:
+    """The words of a normalized message that must match exactly, with plurals folded ("rogues" -> "rogue")."""
+    tokens = set()
+    for token in TOKEN_PATTERN.findall(text):
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss") and token.isalpha():
+            token = token[:-1]
+        tokens.add(token)
+    return frozenset(tokens)
+
+
+def is_first_turn(conversation_history: list) -> bool:
+    """True while the conversation holds exactly one user message and nothing else but system messages."""
+    roles = [msg.get("role") for msg in conversation_history if msg.get("role") != "system"]
+    return roles == ["user"]
+
+
+def first_turn_tail(conversation_history: list):
+    """
+    Split a finished first turn into its user message and the messages that answered it.
+
+    :return: (user_message, answer_messages), or (None, None) if the conversation is not a single turn
+    """
+    messages = [msg for msg in conversation_history if msg.get("role") != "system"]
+    if not messages or messages[0].get("role") != "user" or any(msg.get("role") == "user" for msg in messages[1:]):
+        return None, None
+    return messages[0].get("content"), messages[1:]
+
+
+def current_inventory_version(session) -> int:
+    """Return the latest inventory version, or 0 before the first feed ingest."""
+    return session.execute(select(func.max(InventoryVersion.version))).scalar() or 0
+
+
+class SemanticAnswerCache:
+    """
+    A thread-safe LRU cache of answers, looked up by message similarity.
+
+    An exact match on the normalized message is a dictionary lookup; otherwise
+    the message is compared with every cached question in one sparse product
+    and the best match above `threshold` is returned.
+    """
+
+    def __init__(self, max_entries=500, ttl_seconds=900, threshold=0.9):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.version = None
+        self._lock = threading.Lock()
+        # normalized message -> (expires_at, vector, content tokens, messages)
+        self._entries = OrderedDict()
+        self._matrix = None
+        self._keys = []
+
+    @staticmethod
+    def _key(message: str):
+        text = normalize_message(message)
+        return text, content_tokens(text)
+
+    def _use_version(self, version):
+        # Caller holds the lock
+        if version != self.version:
+            self._entries.clear()
+            self._matrix = None
+            self.version = version
+
+    def _expire(self, now):
+        expired = [key for key, entry in self._entries.items() if entry[0] < now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def get(self, message: str, version: int):
+        """Return the cached answer messages for a similar question, or None."""
+        text, tokens = self._key(message)
+        now = time.monotonic()
+        with self._lock:
+            self._use_version(version)
+            entry = self._entries.get(text)
+            if entry is not None and entry[0] >= now:
+                self._entries.move_to_end(text)
+                return entry[3]
+            self._expire(now)
+            if not self._entries:
+                return None
+            if self._matrix is None:
+                self._keys = list(self._entries)
+                self._matrix = sparse.vstack([self._entries[key][1] for key in self._keys], format="csr")
+            matrix, keys = self._matrix, self._keys
+
+        scores = (matrix @ _vectorizer.transform([text]).T).toarray().ravel()
+        for index in scores.argsort()[::-1]:
+            if scores[index] < self.threshold:
+                return None
+            with self._lock:
+                entry = self._entries.get(keys[index])
+                if entry is not None and entry[2] == tokens and self.version == version:
+                    self._entries.move_to_end(keys[index])
+                    return entry[3]
+        return None
+
+    def set(self, message: str, version: int, messages: list):
+        """Cache the answer messages for a question asked at `version`."""
+        text, tokens = self._key(message)
+        vector = _vectorizer.transform([text])
+        with self._lock:
+            self._use_version(version)
+            self._entries[text] = (time.monotonic() + self.ttl_seconds, vector, tokens, messages)
+            self._entries.move_to_end(text)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def __len__(self):
+        return len(self._entries)
+
+
+answer_cache = SemanticAnswerCache(
+    max_entries=Config.ANSWER_CACHE_MAX_ENTRIES,
+    ttl_seconds=Config.ANSWER_CACHE_TTL_SECONDS,
+    threshold=Config.ANSWER_CACHE_SIMILARITY
+)
+
+
+def is_cacheable_question(message: str) -> bool:
+    """True for short questions whose answer does not depend on the current time."""
+    return (
+        Config.ANSWER_CACHE_ENABLED
+        and bool(message)
+        and len(message) <= Config.ANSWER_CACHE_MAX_MESSAGE_CHARS
+        and not TIME_SENSITIVE_PATTERN.search(normalize_message(message))
+    )
+
+
+def get_cached_answer(session, user_message: str, conversation_history: list):
+    """Return cached answer messages for a first-turn question, or None."""
+    if not is_cacheable_question(user_message) or not is_first_turn(conversation_history):
+        return None
+    messages = answer_cache.get(user_message, current_inventory_version(session))
+    # Copies, so the conversation can be extended without touching the cache
+    return [dict(msg) for msg in messages] if messages else None
+
+
+def cache_first_turn(session, conversation_history: list):
+    """Store the answer to a completed first turn, if its question is cacheable."""
+    user_message, answer = first_turn_tail(conversation_history)
+    if not answer or not isinstance(user_message, str) or not is_cacheable_question(user_message):
+        return
+    final = answer[-1]
+    if final.get("role") != "assistant" or final.get("tool_calls") or not final.get("content"):
+        return
+    answer_cache.set(user_message, current_inventory_version(session), [dict(msg) for msg in answer])
@@ -0,0 +1,18 @@
+# server/helpers/auth_helpers.py
+
+from flask import jsonify, request
+from functools import wraps
+from config import Config
+
+
+# This decorator protects operational endpoints with the shared admin token.
+def require_admin_token(func):
+    """Reject requests that do not carry `Authorization: Bearer <ADMIN_TOKEN>`."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not Config.ADMIN_TOKEN:
+            return jsonify({"error": "Admin endpoints require ADMIN_TOKEN to be configured"}), 403
+        if request.headers.get("Authorization") != f"Bearer {Config.ADMIN_TOKEN}":
+            return jsonify({"error": "Unauthorized"}), 401
+        return func(*args, **kwargs)
+    return wrapper
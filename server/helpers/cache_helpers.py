@@ -0,0 +1,52 @@
+# server/helpers/cache_helpers.py
+
+import threading
+import time
+from collections import OrderedDict
+
+# Returned by TTLCache.get when a key is missing, so None can be cached
+MISSING = object()
+
+
+class TTLCache:
+    """
+    A small thread-safe LRU cache whose entries expire after `ttl_seconds`.
+
+    Entries live in this worker process only; other workers keep their own copy.
+    """
+
+    def __init__(self, max_entries=1000, ttl_seconds=60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
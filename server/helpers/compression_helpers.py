@@ -0,0 +1,63 @@
+# server/helpers/compression_helpers.py
+
+import gzip
+from flask import request
+from config import Config
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def _compressible(response) -> bool:
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if "Content-Encoding" in response.headers:
+        return False
+    return response.mimetype in Config.COMPRESSION_MIMETYPES
+
+
+def init_compression(app):
+    """
+    Compress large responses with brotli or gzip, as the client accepts.
+
+    Only buffered responses whose content type is in COMPRESSION_MIMETYPES
+    and whose body is at least COMPRESSION_MIN_SIZE bytes are compressed;
+    streamed and already-encoded responses pass through untouched.
+    """
+    if not Config.COMPRESSION_ENABLED:
+        return app
+
+    @app.after_request
+    def compress_response(response):
+        if not _compressible(response):
+            return response
+        response.vary.add("Accept-Encoding")
+
+        encoding = _choose_encoding()
+        body = response.get_data()
+        if encoding is None or len(body) < Config.COMPRESSION_MIN_SIZE:
+            return response
+
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=Config.COMPRESSION_BROTLI_QUALITY)
+        else:
+            compressed = gzip.compress(body, compresslevel=Config.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    return app
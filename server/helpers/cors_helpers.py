@@ -1,74 +1,75 @@
 # server/helpers/cors_helpers.py
 
 # Importing necessary libraries
-from flask import jsonify, request
-from functools import wraps
+from werkzeug.exceptions import MethodNotAllowed, NotFound
 from config import Config
 
-from flask import jsonify, request
-from functools import wraps
-from config import Config
+
+def allowed_origins():
+    """Return the configured CORS origins (comma-separated CORS_ORIGINS) as a list."""
+    return [origin.strip() for origin in (Config.CORS_ORIGINS or "").split(",") if origin.strip()]
 
 
-# This function handles dynamic CORS preflight requests.
-def handle_dynamic_cors_preflight():
+# This middleware answers CORS preflight requests before Flask sees them.
+class CorsPreflightMiddleware:
     """
-    Handles dynamic CORS preflight requests by returning appropriate headers
-    based on the current route's allowed methods. Enforces Authorization header.
+    WSGI middleware that answers CORS preflights without entering Flask.
+
+    A preflight (OPTIONS with Access-Control-Request-Method) never reaches
+    routing, before_request or teardown_request, so it costs no database
+    session. The response carries Access-Control-Max-Age so browsers reuse it
+    for later requests to the same URL. Regular requests, including
+    non-preflight OPTIONS, pass straight through; their CORS headers are
+    still added by flask_cors.
     """
-    # Check for Authorization header
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        response = jsonify({"error": "Authorization header required for preflight"})
-        response.headers["Access-Control-Allow-Origin"] = Config.CORS_ORIGINS
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        return response, 401  # Unauthorized
 
-    # Get allowed methods for the current route
-    allowed_methods = ', '.join(request.url_rule.methods)
-    
-    # Create preflight response with appropriate CORS headers
-    response = jsonify({"message": "CORS preflight handled"})
-    response.headers["Access-Control-Allow-Origin"] = Config.CORS_ORIGINS
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, userUUID"
-    response.headers["Access-Control-Allow-Methods"] = allowed_methods
-    response.headers["Access-Control-Allow-Credentials"] = "true"
-    return response, 200
+    def __init__(self, wsgi_app, url_map):
+        self.wsgi_app = wsgi_app
+        self.url_map = url_map
+        self.origins = allowed_origins()
+        self.allow_headers = ", ".join(Config.CORS_ALLOW_HEADERS)
+        self.max_age = str(Config.CORS_PREFLIGHT_MAX_AGE)
 
-# This decorator is used to handle CORS preflight requests for all routes.
-def cors_preflight(func):
-    """
-    A decorator to handle generic CORS preflight requests before invoking the main route logic.
-    """
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        if request.method == 'OPTIONS':
-            return handle_dynamic_cors_preflight()
-        return func(*args, **kwargs)
-    return wrapper
+    def _route_methods(self, environ):
+        """Return the methods the requested URL accepts, or None if no route matches."""
+        adapter = self.url_map.bind_to_environ(environ)
+        try:
+            return adapter.allowed_methods()
+        except (NotFound, MethodNotAllowed):
+            return None
 
-# This decorator is used to handle CORS preflight requests for public routes.
-def pre_authorized_cors_preflight(func):
-    """
-    A decorator to handle CORS preflight requests for public routes.
-    Does not enforce Authorization.
-    """
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        if request.method == 'OPTIONS':
-            # Get allowed methods for the current route
-            allowed_methods = ', '.join(request.url_rule.methods)
+    def _allow_origin(self, origin):
+        if "*" in self.origins:
+            # Credentials are allowed, so the wildcard must be echoed as the actual origin
+            return origin
+        return origin if origin in self.origins else None
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") != "OPTIONS" or "HTTP_ACCESS_CONTROL_REQUEST_METHOD" not in environ:
+            return self.wsgi_app(environ, start_response)
+
+        methods = self._route_methods(environ)
+        if not methods:
+            # Unknown URL: let Flask produce its usual 404
+            return self.wsgi_app(environ, start_response)
+
+        headers = [("Vary", "Origin"), ("Content-Length", "0")]
+        origin = self._allow_origin(environ.get("HTTP_ORIGIN", ""))
+        requested_method = environ["HTTP_ACCESS_CONTROL_REQUEST_METHOD"].upper()
+        if origin and requested_method in methods:
+            headers += [
+                ("Access-Control-Allow-Origin", origin),
+                ("Access-Control-Allow-Methods", ", ".join(sorted(methods))),
+                ("Access-Control-Allow-Headers", self.allow_headers),
+                ("Access-Control-Allow-Credentials", "true"),
+                ("Access-Control-Max-Age", self.max_age),
+            ]
+        # Without the allow headers the browser rejects the preflight itself
+        start_response("204 No Content", headers)
+        return [b""]
 
-            # Create response with appropriate CORS headers
-            response = jsonify({"message": "CORS preflight handled"})
-            response.headers["Access-Control-Allow-Origin"] = Config.CORS_ORIGINS
-            # IMPORTANT: Now includes Authorization header
-            response.headers["Access-Control-Allow-Headers"] = "Content-Type, userUUID, Authorization"
-            response.headers["Access-Control-Allow-Methods"] = allowed_methods
-            response.headers["Access-Control-Allow-Credentials"] = "true"
-            return response, 200
-        
-        # Proceed with the actual request logic for non-OPTIONS methods
-        return func(*args, **kwargs)
-    return wrapper
 
+def init_cors_preflight(app):
+    """Wrap the app so CORS preflights are answered before routing."""
+    app.wsgi_app = CorsPreflightMiddleware(app.wsgi_app, app.url_map)
+    return app
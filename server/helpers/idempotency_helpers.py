@@ -0,0 +1,164 @@
+# server/helpers/idempotency_helpers.py
+
+import hashlib
+import json
+import threading
+from config import Config
+from helpers.cache_helpers import TTLCache
+
+
+class IdempotencyKeyReused(ValueError):
+    """Raised when an idempotency key comes back with a different request body."""
+
+
+class _InFlight:
+    """Holds the outcome of a call that other identical requests are waiting on."""
+
+    def __init__(self, fingerprint=None):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class IdempotencyCache:
+    """
+    Coalesces identical requests and replays their results for a short time.
+
+    While a call for a key is running, any other request with the same key waits
+    for it and shares its result instead of starting a second upstream call.
+    Completed results are kept for `ttl_seconds` so retries and double submits
+    are answered from memory. The cache is per worker process.
+    """
+
+    def __init__(self, ttl_seconds=60, max_entries=1000):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._completed = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def run(self, key, func, *args, fingerprint: str = None, **kwargs):
+        """
+        Run `func` once per key and return `(value, replayed)`.
+
+        :param key: The idempotency key for the call
+        :param func: A callable returning a `(result, status_code)` tuple
+        :param fingerprint: A hash of the request body; a key is only shared by requests with the same one
+        :return: The tuple returned by `func` and whether it was shared or replayed
+        :raises IdempotencyKeyReused: If the key was used for a different body
+        """
+        with self._lock:
+            cached = self._completed.get(key, None)
+            if cached is not None:
+                if cached[0] != fingerprint:
+                    raise IdempotencyKeyReused(key)
+                return cached[1], True
+            in_flight = self._in_flight.get(key)
+            owner = in_flight is None
+            if owner:
+                in_flight = _InFlight(fingerprint)
+                self._in_flight[key] = in_flight
+            elif in_flight.fingerprint != fingerprint:
+                raise IdempotencyKeyReused(key)
+
+        if not owner:
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.result, True
+
+        try:
+            value = func(*args, **kwargs)
+        except Exception as e:
+            in_flight.error = e
+            raise
+        else:
+            in_flight.result = value
+            # Only replay outcomes the client would not want retried
+            if value[1] < 500:
+                self._completed.set(key, (fingerprint, value))
+            return value, False
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            in_flight.done.set()
+
+
+# Shared cache for the chat endpoints
+idempotency_cache = IdempotencyCache(
+    ttl_seconds=Config.IDEMPOTENCY_TTL_SECONDS,
+    max_entries=Config.IDEMPOTENCY_MAX_ENTRIES
+)
+
+
+def find_conversation_id(data: dict) -> str:
+    """
+    Get the conversation ID from a request body.
+
+    Uses the top-level `conversation_id` if present, otherwise the JSON system
+    message carrying a `conversation_id` in the conversation history.
+    """
+    if data.get("conversation_id"):
+        return str(data["conversation_id"])
+    for msg in data.get("conversation_history") or []:
+        if isinstance(msg, dict) and msg.get("role") == "system" and "conversation_id" in (msg.get("content") or ""):
+            try:
+                return str(json.loads(msg["content"]).get("conversation_id"))
+            except Exception:
+                pass
+    return ""
+
+
+def _client_id(request) -> str:
+    return request.headers.get("userUUID") or request.remote_addr or ""
+
+
+def _hash(parts) -> str:
+    raw = json.dumps(parts, separators=(",", ":"), sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def request_fingerprint(data: dict) -> str:
+    """
+    Hash a chat request body, ignoring time context messages.
+
+    Passed to IdempotencyCache.run, so a key reused with a different body is
+    refused instead of answered with another request's result.
+    """
+    history = data.get("conversation_history")
+    if isinstance(history, list):
+        data = dict(data, conversation_history=[
+            msg for msg in history
+            if not (isinstance(msg, dict) and msg.get("role") == "system"
+                    and str(msg.get("content") or "").startswith("Current time:"))
+        ])
+    return _hash(data)
+
+
+def build_idempotency_key(scope: str, request, data: dict) -> str:
+    """
+    Build the key identifying duplicate submissions of a chat request.
+
+    An explicit `Idempotency-Key` header wins, namespaced by the client so one
+    client's key can never match another's. Otherwise the key is a hash of the
+    client, the conversation ID and the turn being submitted: the user message
+    plus the non-system history before it. Time context messages are left out
+    so a resubmit a few seconds later still matches.
+
+    :param scope: The endpoint the key belongs to, e.g. "chat" or "tool-call-result"
+    :param request: The incoming Flask request
+    :param data: The parsed JSON body
+    :return: A string key, namespaced by scope
+    """
+    header_key = request.headers.get("Idempotency-Key")
+    if header_key:
+        return f"{scope}:key:{_hash([_client_id(request), header_key])}"
+
+    history = data.get("conversation_history") or []
+    if not isinstance(history, list):
+        history = []
+    turn = [
+        msg for msg in history
+        if isinstance(msg, dict) and msg.get("role") != "system"
+    ]
+
+    return f"{scope}:hash:{_hash([_client_id(request), find_conversation_id(data), data.get('message', ''), turn])}"
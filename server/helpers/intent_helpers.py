@@ -0,0 +1,228 @@
+# server/helpers/intent_helpers.py
+
+import os
+import re
+import threading
+from functools import lru_cache
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from config import Config
+
+# A small text classifier in front of process_chat: messages it is confident
+# are greetings, thanks or dealership FAQ questions get a templated answer
+# without calling the LLM. Everything else, including anything it is unsure
+# about, is labelled "other" and goes to the model as before.
+
+OTHER = "other"
+
+# An assistant message ending in a question, allowing trailing punctuation and emoji
+QUESTION_END_PATTERN = re.compile(r"\?[^\w]*$")
+
+# Answers use the same facts as the system prompt (see get_system_message)
+FAQ_TEMPLATES = {
+    "greeting": "Hi there! I'm Patricia from Nissan of Hendersonville. How can I help you today?",
+    "thanks": "You're very welcome! Is there anything else I can help you with?",
+    "hours": "Our business hours are Monday through Saturday, 9 AM to 7 PM. We're closed on Sundays.",
+    "address": "We're located at 1340 Spartanburg Hwy, Hendersonville, NC 28792.",
+    "phone": "You can reach us at +1 (828) 697-2222.",
+    "website": "You can visit us online at https://www.nissanofhendersonville.com.",
+}
+
+# Seed training set; `flask train-intent-classifier` adds labelled messages from logged conversations
+SEED_EXAMPLES = {
+    "greeting": [
+        "hi", "hello", "hey", "hey there", "hi there", "hello!", "good morning", "good afternoon",
+        "good evening", "howdy", "hiya", "yo", "hello patricia", "hi patricia", "greetings", "hey, how are you?",
+    ],
+    "thanks": [
+        "thanks", "thank you", "thank you so much", "thanks a lot", "thx", "ty", "much appreciated",
+        "thanks for your help", "thank you for the help", "great, thanks", "ok thanks", "perfect, thank you",
+        "appreciate it", "awesome thanks",
+    ],
+    "hours": [
+        "what are your hours", "what time do you open", "what time do you close", "when are you open",
+        "are you open on sunday", "are you open today", "what are your business hours", "hours of operation",
+        "when do you close today", "are you open saturday", "what time does the dealership open",
+        "how late are you open", "store hours", "your hours?",
+    ],
+    "address": [
+        "where are you located", "what is your address", "what's the address", "where is the dealership",
+        "address please", "how do i find you", "where's your location", "what is the dealership address",
+        "where are you guys", "location?",
+    ],
+    "phone": [
+        "what is your phone number", "what's your number", "can i call you", "phone number please",
+        "how can i call the dealership", "what number do i call", "dealership phone number", "phone?",
+        "can i get your phone number", "what's the phone number for the dealership",
+    ],
+    "website": [
+        "what is your website", "do you have a website", "what's your url", "website?",
+        "where can i see you online", "what's the dealership website", "link to your website",
+    ],
+    OTHER: [
+        "do you have any rogues in stock", "i'm looking for a used suv under 30k", "show me trucks",
+        "what's the price of the altima", "can i schedule a test drive tomorrow at 3",
+        "i want to book an appointment for saturday", "do you offer financing", "what is my trade in worth",
+        "is the 2022 sentra still available", "can you find me a red pathfinder", "how many miles on the frontier",
+        "what are the lease specials", "my name is john smith and my phone is 555-1234",
+        "my email is jane@example.com", "can i come in at 5 today", "what's the mpg on the kicks",
+        "do you have a service department", "i had a bad experience last time", "can someone call me back",
+        "do you have electric cars", "show me cars with low mileage", "compare the rogue and the murano",
+        "can i get a quote", "what's the out the door price", "hello, do you have any used trucks under 20k",
+        "thanks, can you also show me the ariya", "what time is my appointment", "where is my car",
+        "hours for the service department on sunday for an oil change appointment",
+        "i want to buy a car", "tell me about the leaf", "do you have a stock number for that one",
+        "show me review videos", "how much is the down payment", "can you text me the details",
+        "i need a family car", "what colors does the altima come in", "any deals this weekend",
+        "can you hold the car for me", "is the price negotiable", "i'd like to sell my car",
+    ],
+}
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+class IntentScorer:
+    """
+    Scores one message against a fitted pipeline without going through sklearn.
+
+    Equivalent to `predict_proba` for the TF-IDF + multinomial logistic
+    regression pipeline, but sklearn's per-call validation and sparse matrix
+    construction cost far more than the arithmetic for a single short message.
+    """
+
+    def __init__(self, model):
+        vectorizer, classifier = model.steps[0][1], model.steps[-1][1]
+        self.analyze = vectorizer.build_analyzer()
+        self.vocabulary = vectorizer.vocabulary_
+        self.sublinear_tf = vectorizer.sublinear_tf
+        self.idf = vectorizer.idf_
+        # One weight vector per feature, so scoring is a sum over the message's n-grams
+        self.weights = np.ascontiguousarray(classifier.coef_.T)
+        self.intercept = classifier.intercept_
+        self.classes = [str(label) for label in classifier.classes_]
+
+    def __call__(self, text: str):
+        counts = {}
+        for term in self.analyze(text):
+            index = self.vocabulary.get(term)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+        scores = self.intercept.copy()
+        if counts:
+            indexes = np.fromiter(counts, dtype=np.intp, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            if self.sublinear_tf:
+                tf = np.log(tf) + 1
+            values = tf * self.idf[indexes]
+            values /= np.sqrt(values @ values)
+            scores += values @ self.weights[indexes]
+        scores = np.exp(scores - scores.max())
+        probabilities = scores / scores.sum()
+        best = int(probabilities.argmax())
+        return self.classes[best], float(probabilities[best])
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase and collapse whitespace so the classifier sees the same text it was trained on."""
+    return re.sub(r"\s+", " ", (message or "").strip().lower())
+
+
+def seed_examples():
+    """Return the built-in training examples as (text, intent) pairs."""
+    return [(text, intent) for intent, texts in SEED_EXAMPLES.items() for text in texts]
+
+
+def build_intent_pipeline():
+    """
+    Return an unfitted classifier pipeline.
+
+    Character n-grams keep it robust to typos ("thnaks", "helo") and to the
+    short, punctuation-heavy messages it is meant to catch.
+    """
+    return make_pipeline(
+        TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), sublinear_tf=True),
+        LogisticRegression(C=10, max_iter=1000, class_weight="balanced")
+    )
+
+
+def train_intent_model(examples):
+    """Fit the classifier on (text, intent) pairs."""
+    texts = [normalize_message(text) for text, _ in examples]
+    labels = [intent for _, intent in examples]
+    return build_intent_pipeline().fit(texts, labels)
+
+
+def load_intent_model():
+    """Load the trained model from INTENT_MODEL_PATH, or fit one on the seed examples."""
+    if os.path.exists(Config.INTENT_MODEL_PATH):
+        print(f"DEBUG: Loading intent model from {Config.INTENT_MODEL_PATH}")
+        return joblib.load(Config.INTENT_MODEL_PATH)
+    return train_intent_model(seed_examples())
+
+
+def _get_scorer():
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                _scorer = IntentScorer(load_intent_model())
+    return _scorer
+
+
+@lru_cache(maxsize=4096)
+def _classify_normalized(text: str):
+    return _get_scorer()(text)
+
+
+def classify_intent(message: str):
+    """Return the most likely intent of a message and its probability."""
+    # Greetings and thanks repeat constantly, so identical messages are memoized
+    return _classify_normalized(normalize_message(message))
+
+
+def awaiting_reply(conversation_history: list) -> bool:
+    """
+    True when the current user message may be replying to the assistant.
+
+    That is the case after an assistant question ("Want to book a test
+    drive?") or an unfinished tool call, but not on the first turn or after a
+    completed answer. The canned answers count as completed even though they
+    end by offering more help.
+    """
+    messages = [msg for msg in conversation_history or [] if msg.get("role") != "system"]
+    if messages and messages[-1].get("role") == "user":
+        messages = messages[:-1]
+    if not messages:
+        return False
+    previous = messages[-1]
+    if previous.get("role") != "assistant" or previous.get("tool_calls"):
+        return True
+    content = previous.get("content")
+    if not isinstance(content, str) or content in FAQ_TEMPLATES.values():
+        return False
+    return QUESTION_END_PATTERN.search(content) is not None
+
+
+def templated_answer(message: str, conversation_history: list = None):
+    """
+    Return a canned answer for a message, or None if it should go to the LLM.
+
+    Only short messages are considered, only when the classifier's
+    confidence in an FAQ intent reaches INTENT_CONFIDENCE_THRESHOLD, and only
+    when the message is not a reply to the assistant (see awaiting_reply):
+    "no thanks" after "Want to book a test drive?" is not a thank-you.
+
+    :return: (intent, confidence, answer) or None
+    """
+    if not Config.INTENT_CLASSIFIER_ENABLED or not message or len(message) > Config.INTENT_MAX_MESSAGE_CHARS:
+        return None
+    if awaiting_reply(conversation_history):
+        return None
+    intent, confidence = classify_intent(message)
+    if intent == OTHER or intent not in FAQ_TEMPLATES or confidence < Config.INTENT_CONFIDENCE_THRESHOLD:
+        return None
+    return intent, confidence, FAQ_TEMPLATES[intent]
@@ -0,0 +1,143 @@
+# server/helpers/inventory_helpers.py
+
+import threading
+from sqlalchemy import Numeric, bindparam, or_, select, type_coerce
+from models.sql_models import CarInventory
+
+# Read-only inventory queries built on the Core table rather than the ORM
+# entity: rows come back as plain tuples, nothing is added to the identity
+# map, and one statement object is reused per combination of active
+# filters, so SQLAlchemy's compiled cache is hit without rebuilding the query.
+
+cars = CarInventory.__table__
+
+# Numeric prices come back as floats straight from the result processor
+_price = type_coerce(cars.c.price, Numeric(10, 2, asdecimal=False)).label("price")
+
+# Columns returned by fetch_cars (the LLM tool) and by the inventory endpoints
+FETCH_CARS_COLUMNS = (
+    cars.c.stock_number, cars.c.vin, cars.c.make, cars.c.model, cars.c.year, _price,
+    cars.c.mileage, cars.c.color, cars.c.description, cars.c.created_at,
+)
+INVENTORY_COLUMNS = (
+    cars.c.id, cars.c.stock_number, cars.c.vin, cars.c.make, cars.c.model, cars.c.year, _price,
+    cars.c.mileage, cars.c.color, cars.c.description,
+)
+
+# fetch_cars filters in a fixed order: (name, condition, how the value is bound)
+FETCH_CARS_FILTERS = (
+    ("make", lambda: cars.c.make.ilike(bindparam("make")), "like"),
+    ("model", lambda: cars.c.model.ilike(bindparam("model")), "like"),
+    ("color", lambda: cars.c.color.ilike(bindparam("color")), "like"),
+    ("stock_number", lambda: cars.c.stock_number == bindparam("stock_number"), "text"),
+    ("vin", lambda: cars.c.vin == bindparam("vin"), "text"),
+    ("year", lambda: cars.c.year >= bindparam("year"), "number"),
+    ("max_year", lambda: cars.c.year <= bindparam("max_year"), "number"),
+    ("price", lambda: cars.c.price >= bindparam("price"), "number"),
+    ("max_price", lambda: cars.c.price <= bindparam("max_price"), "number"),
+    ("mileage", lambda: cars.c.mileage <= bindparam("mileage"), "number"),
+)
+
+# search_car_inventory filters: (name, condition)
+SEARCH_FILTERS = (
+    ("make", lambda: cars.c.make == bindparam("make")),
+    ("model", lambda: cars.c.model == bindparam("model")),
+    ("min_price", lambda: cars.c.price >= bindparam("min_price")),
+    ("max_price", lambda: cars.c.price <= bindparam("max_price")),
+    ("year", lambda: cars.c.year == bindparam("year")),
+)
+
+_statements = {}
+_statements_lock = threading.Lock()
+
+
+def cached_statement(key, build):
+    """Return the statement cached under `key`, building it once with `build()`."""
+    statement = _statements.get(key)
+    if statement is None:
+        with _statements_lock:
+            statement = _statements.get(key)
+            if statement is None:
+                statement = _statements[key] = build()
+    return statement
+
+
+def _in_stock():
+    return select(*FETCH_CARS_COLUMNS).where(cars.c.deleted_at.is_(None))
+
+
+def select_cars(session, filter_params: dict) -> list:
+    """
+    Run the fetch_cars query and return one dict per car.
+
+    Filters follow fetch_cars: text filters apply when non-empty, numeric
+    filters when present and not -1.
+    """
+    active, params = [], {}
+    for name, _, kind in FETCH_CARS_FILTERS:
+        if name not in filter_params:
+            continue
+        value = filter_params[name]
+        if kind == "number":
+            if value == -1:
+                continue
+        elif not value:
+            continue
+        active.append(name)
+        params[name] = f"%{value}%" if kind == "like" else value
+
+    active = tuple(active)
+    statement = cached_statement(("fetch_cars", active), lambda: _in_stock().where(
+        *[condition() for name, condition, _ in FETCH_CARS_FILTERS if name in active]
+    ))
+
+    result = session.execute(statement, params)
+    keys = tuple(result.keys())
+    rows = []
+    for row in result:
+        car = dict(zip(keys, row))
+        created_at = car["created_at"]
+        car["created_at"] = created_at.isoformat() if created_at else None
+        rows.append(car)
+    return rows
+
+
+def select_inventory(session) -> list:
+    """Return every car in stock as the dicts served by /api/inventory."""
+    statement = cached_statement("inventory", lambda: select(*INVENTORY_COLUMNS).where(cars.c.deleted_at.is_(None)))
+    result = session.execute(statement)
+    keys = tuple(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def search_cars_text(session, search_query: str, filters: dict, limit: int) -> list:
+    """
+    Run the search_car_inventory query and return lightweight rows.
+
+    Rows support attribute access (row.make, row.price) like the ORM objects
+    they replace, but are plain named tuples.
+    """
+    active, params = [], {"limit": limit}
+    for name, _ in SEARCH_FILTERS:
+        value = filters.get(name)
+        # Prices filter on any value but None; the others only when truthy
+        if (value is not None) if name.endswith("_price") else bool(value):
+            active.append(name)
+            params[name] = value
+    if search_query:
+        active.append("search_query")
+        params["search_query"] = f"%{search_query}%"
+
+    active = tuple(active)
+
+    def build():
+        statement = select(*INVENTORY_COLUMNS).where(cars.c.deleted_at.is_(None))
+        statement = statement.where(*[condition() for name, condition in SEARCH_FILTERS if name in active])
+        if "search_query" in active:
+            pattern = bindparam("search_query")
+            statement = statement.where(or_(
+                cars.c.make.ilike(pattern), cars.c.model.ilike(pattern), cars.c.description.ilike(pattern)
+            ))
+        return statement.limit(bindparam("limit"))
+
+    return session.execute(cached_statement(("search", active), build), params).all()
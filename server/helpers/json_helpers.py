@@ -0,0 +1,69 @@
+# server/helpers/json_helpers.py
+
+from flask.json.provider import DefaultJSONProvider
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; Flask's stdlib provider is used without it
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Output parses the same as DefaultJSONProvider's: keys are sorted and
+    datetimes are passed through to Flask's default handler (HTTP dates).
+    Non-ASCII text is written as UTF-8 rather than escaped. Anything orjson rejects,
+    such as custom json.dumps arguments or integers wider than 64 bits,
+    falls back to the stdlib implementation.
+    """
+
+    options = orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+    def _dumps_bytes(self, obj, indent=None) -> bytes:
+        option = self.options | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs) -> str:
+        indent = kwargs.pop("indent", None)
+        kwargs.pop("separators", None)
+        if kwargs or indent not in (None, 2):
+            return super().dumps(obj, indent=indent, **kwargs)
+        try:
+            return self._dumps_bytes(obj, indent).decode("utf-8")
+        except (orjson.JSONEncodeError, TypeError):
+            return super().dumps(obj, indent=indent)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            # orjson already returns UTF-8 bytes, so skip the str round trip
+            body = self._dumps_bytes(obj, indent) + b"\n"
+        except (orjson.JSONEncodeError, TypeError):
+            return super().response(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """
+    Install the JSON provider selected by JSON_PROVIDER.
+
+    "auto" uses orjson when it is installed, "orjson" requires it, and
+    "stdlib" keeps Flask's default provider.
+    """
+    choice = Config.JSON_PROVIDER
+    if choice == "orjson" and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson but the orjson package is not installed")
+    if choice in ("auto", "orjson") and orjson is not None:
+        app.json_provider_class = OrjsonProvider
+        app.json = OrjsonProvider(app)
+    print(f"DEBUG: Using {type(app.json).__name__} for JSON")
+    return app
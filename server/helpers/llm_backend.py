@@ -0,0 +1,131 @@
+# server/helpers/llm_backend.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+import httpx
+from openai import OpenAI
+
+# LLM_BACKEND selects where chat completions go:
+#   openai  - the real OpenAI API (default)
+#   record  - the real OpenAI API, saving every request/response pair to a cassette
+#   standin - the local stand-in server in loadtest/llm_standin.py
+DEFAULT_STANDIN_URL = "http://127.0.0.1:8089/v1"
+DEFAULT_CASSETTE_PATH = os.path.join("loadtest", "cassettes", "recorded.jsonl")
+
+# Shared by every recording client in the process so lines never interleave
+_cassette_lock = threading.Lock()
+
+
+def is_conversation_id_message(msg: dict) -> bool:
+    """Return whether a message is the JSON system message carrying the conversation ID."""
+    content = msg.get("content")
+    if msg.get("role") != "system" or not isinstance(content, str) or "conversation_id" not in content:
+        return False
+    try:
+        return "conversation_id" in json.loads(content)
+    except (ValueError, TypeError):
+        return False
+
+
+def normalize_request_body(body: dict) -> dict:
+    """
+    Strip the parts of a chat completion request that change between runs.
+
+    The time context system message carries the current time, so its content is
+    blanked before the request is hashed for cassette matching. The random
+    conversation ID message is dropped; it is no longer sent to the LLM, but
+    cassettes recorded before that still contain it.
+    """
+    messages = []
+    for msg in body.get("messages", []):
+        if is_conversation_id_message(msg):
+            continue
+        if msg.get("role") == "system" and str(msg.get("content", "")).startswith("Current time:"):
+            msg = dict(msg, content="Current time:")
+        messages.append(msg)
+    return dict(body, messages=messages)
+
+
+def cassette_key(body: dict) -> str:
+    """Return the stable hash used to match a request against recorded interactions."""
+    canonical = json.dumps(normalize_request_body(body), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """
+    An httpx transport that forwards requests and appends chat completion
+    request/response pairs to a JSON Lines cassette file.
+    """
+
+    def __init__(self, cassette_path: str, wrapped: httpx.BaseTransport = None):
+        self.cassette_path = cassette_path
+        self._wrapped = wrapped or httpx.HTTPTransport()
+        os.makedirs(os.path.dirname(os.path.abspath(cassette_path)), exist_ok=True)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = self._wrapped.handle_request(request)
+        content = response.read()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if request.url.path.endswith("/chat/completions"):
+            try:
+                request_body = json.loads(request.content or b"{}")
+                entry = {
+                    "key": cassette_key(request_body),
+                    "request": request_body,
+                    "status_code": response.status_code,
+                    "response": json.loads(content or b"{}"),
+                    "elapsed_ms": round(elapsed_ms, 2),
+                    "recorded_at": time.time()
+                }
+                with _cassette_lock, open(self.cassette_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except Exception as e:
+                print(f"DEBUG: Failed to record LLM interaction: {e}")
+
+        # The body has already been decoded, so drop the encoding headers
+        headers = [
+            (name, value) for name, value in response.headers.items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=headers,
+            content=content,
+            request=request
+        )
+
+    def close(self):
+        self._wrapped.close()
+
+
+def get_llm_client() -> OpenAI:
+    """
+    Create the OpenAI client for the backend selected by LLM_BACKEND.
+
+    :return: An OpenAI client talking to the real API, the recorder, or the local stand-in
+    """
+    backend = os.getenv("LLM_BACKEND", "openai").lower()
+    api_key = os.getenv("OPENAI_API_KEY")
+
+    if backend == "standin":
+        return OpenAI(
+            api_key=api_key or "standin",
+            base_url=os.getenv("LLM_STANDIN_URL", DEFAULT_STANDIN_URL),
+            max_retries=0
+        )
+
+    if backend == "record":
+        cassette_path = os.getenv("LLM_CASSETTE_PATH", DEFAULT_CASSETTE_PATH)
+        print(f"DEBUG: Recording LLM interactions to {cassette_path}")
+        return OpenAI(
+            api_key=api_key,
+            http_client=httpx.Client(transport=RecordingTransport(cassette_path), timeout=600)
+        )
+
+    return OpenAI(api_key=api_key)
@@ -1,16 +1,34 @@
 # server/helpers/llm_utils.py
 
 from database import db
-from models.sql_models import CarInventory, ConversationSummary, AutoLeadInteractionDetails
+from models.sql_models import ConversationSummary, AutoLeadInteractionDetails
 import json
 import uuid
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from helpers.llm_backend import get_llm_client, is_conversation_id_message
 from helpers.token_utils import calculate_token_cost
+from helpers.sql_helpers import insert_if_absent, upsert
+from helpers.inventory_helpers import select_cars
+from helpers.snapshot_helpers import get_inventory_snapshot
+from helpers.semantic_search_helpers import get_semantic_index
+from helpers.cache_helpers import TTLCache, MISSING
+from helpers.transcript_helpers import compress_transcript
+from helpers.routing_helpers import confident_routing
 from services.analytics_service import store_request_analytics
+from config import Config
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
 import os
 
-# Initialize the OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Initialize the OpenAI client for the configured backend (see helpers/llm_backend.py)
+client = get_llm_client()
+
+# Read-through cache for summaries looked up by conversation ID
+summary_cache = TTLCache(
+    max_entries=Config.SUMMARY_CACHE_MAX_ENTRIES,
+    ttl_seconds=Config.SUMMARY_CACHE_TTL_SECONDS
+)
 
 def fetch_cars(filter_params: dict) -> list:
     """
@@ -34,49 +52,124 @@ def fetch_cars(filter_params: dict) -> list:
         }
     :return: A list of dictionaries, each representing a car in the inventory.
     """
-    query = db.session.query(CarInventory)
-    
-    # Check string filters only if they are non-empty
-    if "make" in filter_params and filter_params["make"]:
-        query = query.filter(CarInventory.make.ilike(f"%{filter_params['make']}%"))
-    if "model" in filter_params and filter_params["model"]:
-        query = query.filter(CarInventory.model.ilike(f"%{filter_params['model']}%"))
-    if "color" in filter_params and filter_params["color"]:
-        query = query.filter(CarInventory.color.ilike(f"%{filter_params['color']}%"))
-    if "stock_number" in filter_params and filter_params["stock_number"]:
-        query = query.filter(CarInventory.stock_number == filter_params["stock_number"])
-    if "vin" in filter_params and filter_params["vin"]:
-        query = query.filter(CarInventory.vin == filter_params["vin"])
-    
-    # Check numeric filters only if they are provided and not equal to -1
-    if "year" in filter_params and filter_params["year"] != -1:
-        query = query.filter(CarInventory.year >= filter_params["year"])
-    if "max_year" in filter_params and filter_params["max_year"] != -1:
-        query = query.filter(CarInventory.year <= filter_params["max_year"])
-    if "price" in filter_params and filter_params["price"] != -1:
-        query = query.filter(CarInventory.price >= filter_params["price"])
-    if "max_price" in filter_params and filter_params["max_price"] != -1:
-        query = query.filter(CarInventory.price <= filter_params["max_price"])
-    if "mileage" in filter_params and filter_params["mileage"] != -1:
-        query = query.filter(CarInventory.mileage <= filter_params["mileage"])
-    
-    results = query.all()
-    
-    def to_dict(car: CarInventory) -> dict:
-        return {
-            "stock_number": car.stock_number,
-            "vin": car.vin,
-            "make": car.make,
-            "model": car.model,
-            "year": car.year,
-            "price": float(car.price),
-            "mileage": car.mileage,
-            "color": car.color,
-            "description": car.description,
-            "created_at": car.created_at.isoformat() if car.created_at else None
+    # Answer from the shared memory-mapped snapshot when one is published
+    snapshot = get_inventory_snapshot()
+    if snapshot is not None:
+        result = snapshot.fetch_cars(filter_params)
+        if result is not None:
+            return result
+    
+    # Core query with cached statements and plain rows (see helpers/inventory_helpers.py)
+    return select_cars(db.session, filter_params)
+
+def semantic_search_cars(search_args: dict) -> list:
+    """
+    Rank the cars in stock by how well their description matches a free-text request.
+
+    :param search_args: A dictionary with keys such as:
+        {
+            "query": <str>,        # What the shopper is looking for, in their words
+            "limit": <int>,        # Number of cars to return (capped by SEMANTIC_SEARCH_MAX_RESULTS)
+            "max_price": <float>,  # Maximum price (-1 means no filtering)
+            "year": <int>,         # Minimum car model year (-1 means no filtering)
+            "mileage": <int>,      # Maximum mileage (-1 means no filtering)
+            "make": <str>          # Car manufacturer (non-empty string to filter)
         }
+    :return: A list of dictionaries, best match first, each with its similarity score.
+    """
+    def bound(key):
+        value = search_args.get(key)
+        if value is None or value == -1 or isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return value
+
+    limit = search_args.get("limit")
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit <= 0:
+        limit = 5
+    index = get_semantic_index(db.session)
+    return index.search(
+        str(search_args.get("query") or ""),
+        limit=min(limit, Config.SEMANTIC_SEARCH_MAX_RESULTS),
+        max_price=bound("max_price"),
+        min_year=bound("year"),
+        max_mileage=bound("mileage"),
+        make=search_args.get("make") if isinstance(search_args.get("make"), str) else None
+    )
+
+# Runs LLM summaries whose routing fields were already predicted locally
+_summary_executor = ThreadPoolExecutor(max_workers=Config.SUMMARY_ASYNC_WORKERS, thread_name_prefix="summary")
+
+# Namespace for conversation IDs derived from a conversation's opening messages
+CONVERSATION_ID_NAMESPACE = uuid.UUID("6f1c9a7e-3b0d-4c55-9d9e-5a4f1e2b8c31")
+
+def summarizable_messages(conversation_history: list) -> list:
+    """
+    Return the messages a summary is generated from.
+
+    System messages and tool messages are left out to focus on the actual
+    conversation, as are assistant messages that only carry tool calls.
+    """
+    return [
+        msg for msg in conversation_history 
+        if msg.get("role") in ["user", "assistant"] and 
+        not (msg.get("role") == "assistant" and "tool_calls" in msg)
+    ]
+
+def _stored_conversation_id(conversation_history: list):
+    """Return the ID carried by the conversation's JSON system message, or None."""
+    for msg in conversation_history:
+        if is_conversation_id_message(msg):
+            return str(json.loads(msg["content"])["conversation_id"])
+    return None
+
+def ensure_conversation_id(conversation_history: list) -> str:
+    """
+    Return the conversation's ID, adding a system message with a new random one on the first turn.
+
+    The client sends the whole history back every turn, so the message, and
+    with it the ID, stays with the conversation.
+    """
+    conversation_id = _stored_conversation_id(conversation_history)
+    if conversation_id is None:
+        conversation_id = str(uuid.uuid4())
+        conversation_history.append({"role": "system", "content": json.dumps({"conversation_id": conversation_id})})
+    return conversation_id
+
+def llm_messages(conversation_history: list) -> list:
+    """
+    Return the conversation as sent to the LLM.
+
+    The conversation ID message is bookkeeping for the server; leaving it out
+    saves its tokens on every call and keeps the prompt the same across
+    conversations.
+    """
+    return [msg for msg in conversation_history if not is_conversation_id_message(msg)]
+
+def resolve_conversation_id(conversation_history: list) -> str:
+    """
+    Return the ID of a conversation.
+
+    Uses the JSON system message carrying a `conversation_id` (see
+    ensure_conversation_id). Conversations recorded before that message
+    existed, such as imported exports, get an ID derived from the time context
+    message added on the first turn and the first user message, so every turn
+    of the same conversation resolves to the same ID.
+    """
+    conversation_id = _stored_conversation_id(conversation_history)
+    if conversation_id is not None:
+        return conversation_id
+
+    time_context, first_user_message = None, None
+    for msg in conversation_history:
+        content = msg.get("content") or ""
+        if msg.get("role") == "system" and time_context is None and content.startswith("Current time:"):
+            time_context = content
+        elif msg.get("role") == "user" and first_user_message is None:
+            first_user_message = content
     
-    return [to_dict(c) for c in results]
+    if first_user_message is None:
+        return str(uuid.uuid4())
+    return str(uuid.uuid5(CONVERSATION_ID_NAMESPACE, json.dumps([time_context, first_user_message])))
 
 def generate_conversation_summary(conversation_history: list, conversation_id: str = None) -> dict:
     """
@@ -89,18 +182,46 @@ def generate_conversation_summary(conversation_history: list, conversation_id: s
     Returns:
         dict: Summary of the conversation
     """
-    # Generate a conversation ID if not provided
+    # Use the conversation's own ID, or the one derived from its opening messages
     if not conversation_id:
-        conversation_id = str(uuid.uuid4())
+        conversation_id = resolve_conversation_id(conversation_history)
     
-    # Prepare the conversation for analysis
-    # Filter out system messages and tool messages to focus on the actual conversation
-    filtered_history = [
-        msg for msg in conversation_history 
-        if msg.get("role") in ["user", "assistant"] and 
-        not (msg.get("role") == "assistant" and "tool_calls" in msg)
-    ]
+    try:
+        return _create_summary(conversation_history, conversation_id)
+    except Exception as e:
+        print(f"Error generating conversation summary: {e}")
+        return _error_summary(conversation_id, e)
+
+def _create_summary(conversation_history: list, conversation_id: str) -> dict:
+    """Run the summary LLM call and save the result; raises if either fails."""
+    summary_json, token_usage = request_summary(conversation_history)
     
+    # Add the conversation ID to the summary
+    summary_json["conversation_id"] = conversation_id
+    
+    # Calculate token usage and cost
+    cost_info = calculate_token_cost(
+        prompt_tokens=token_usage.prompt_tokens,
+        completion_tokens=token_usage.completion_tokens
+    )
+    
+    # Store analytics data for summary generation
+    store_request_analytics(token_usage, cost_info, model="o3-mini-2025-01-31")
+    
+    # Save the summary and the full transcript to the database
+    if not save_summary_to_db(summary_json, conversation_history):
+        raise RuntimeError("Summary could not be saved")
+    
+    return summary_json
+
+def request_summary(conversation_history: list, llm_client=None):
+    """
+    Ask the LLM to summarize a conversation, without saving anything.
+
+    :return: (summary dict, token usage of the call); raises if the call or its JSON fails
+    """
+    # Prepare the conversation for analysis
+    filtered_history = summarizable_messages(conversation_history)
     # Create a prompt for the summary generation
     summary_prompt = {
         "role": "system",
@@ -137,77 +258,261 @@ def generate_conversation_summary(conversation_history: list, conversation_id: s
     messages_for_analysis = [summary_prompt] + filtered_history
     
     # Call the OpenAI API to generate the summary
+    response = (llm_client or client).chat.completions.create(
+        model="o3-mini-2025-01-31",
+        messages=messages_for_analysis,
+        response_format={"type": "json_object"},
+        max_completion_tokens=1000,
+        reasoning_effort="low"
+    )
+    
+    # Extract the summary from the response
+    return json.loads(response.choices[0].message.content), response.usage
+
+def _error_summary(conversation_id: str, error: Exception) -> dict:
+    """The default summary returned when generation fails."""
+    return {
+        "conversation_id": conversation_id,
+        "sentiment": "neutral",
+        "keywords": ["error"],
+        "summary": "Error generating summary. Please try again.",
+        "department": "Sales",
+        "insights": {
+            "urgency": "low",
+            "upsell_opportunity": False,
+            "customer_interest": "unknown",
+            "additional_notes": f"Error: {str(error)}"
+        }
+    }
+
+def _claim_summary(conversation_id: str, message_count: int, routing: dict = None) -> bool:
+    """
+    Atomically take the right to (re)generate a conversation's summary.
+
+    The first claim inserts a pending row (empty summary) covering
+    `message_count` messages; later claims move `summarized_messages` forward,
+    and only succeed once enough new messages have arrived. A pending claim
+    left behind by a request that never finished can be retaken after
+    SUMMARY_CLAIM_TIMEOUT_SECONDS. Across threads and workers, exactly one
+    request wins each claim.
+
+    When `routing` (from confident_routing) is given, the claim also writes its
+    sentiment, department and urgency, so the lead is routed before the
+    summary text exists.
+    """
+    now = datetime.utcnow()
+    routing_fields = {}
+    if routing:
+        routing_fields = {"sentiment": routing["sentiment"], "department": routing["department"]}
+    claimed = insert_if_absent(db.session, ConversationSummary, {
+        "conversation_id": conversation_id,
+        "sentiment": "neutral",
+        "keywords": [],
+        "summary": "",
+        "department": "Sales",
+        "insights": {"urgency": routing["urgency"]} if routing else {},
+        "summarized_messages": message_count,
+        "created_at": now,
+        "updated_at": now,
+        **routing_fields
+    }, "conversation_id")
+    if not claimed:
+        stale = now - timedelta(seconds=Config.SUMMARY_CLAIM_TIMEOUT_SECONDS)
+        claimed = db.session.query(ConversationSummary).filter(
+            ConversationSummary.conversation_id == conversation_id,
+            or_(
+                ConversationSummary.summarized_messages <= message_count - Config.SUMMARY_REGENERATE_AFTER_MESSAGES,
+                and_(ConversationSummary.summary == "", ConversationSummary.updated_at < stale)
+            )
+        ).update(
+            {"summarized_messages": message_count, "updated_at": now, **routing_fields}, synchronize_session=False
+        ) == 1
+    db.session.commit()
+    return claimed
+
+def save_routing_to_db(conversation_id: str, routing: dict, conversation_history: list):
+    """
+    Write predicted routing fields to the conversation's lead interaction record.
+
+    Creates the record, with the compressed transcript, if the conversation
+    has none yet; the summary fields are filled in later by save_summary_to_db.
+    """
     try:
-        response = client.chat.completions.create(
-            model="o3-mini-2025-01-31",
-            messages=messages_for_analysis,
-            response_format={"type": "json_object"},
-            max_completion_tokens=1000,
-            reasoning_effort="low"
-        )
-        
-        # Extract the summary from the response
-        summary_json = json.loads(response.choices[0].message.content)
-        
-        # Add the conversation ID to the summary
-        summary_json["conversation_id"] = conversation_id
-        
-        # Calculate token usage and cost
-        token_usage = response.usage
-        cost_info = calculate_token_cost(
-            prompt_tokens=token_usage.prompt_tokens,
-            completion_tokens=token_usage.completion_tokens
+        upsert(db.session, AutoLeadInteractionDetails, {
+            "conversation_id": conversation_id,
+            "sentiment": routing["sentiment"],
+            "priority_flag": routing["urgency"] == "high",
+            "conversation_transcript": compress_transcript(conversation_history)
+        }, "conversation_id")
+        db.session.commit()
+    except Exception as e:
+        print(f"Error saving routing to database: {e}")
+        db.session.rollback()
+
+def _routing_summary(conversation_id: str, routing: dict, previous: dict) -> dict:
+    """The summary returned while the LLM summary is generated in the background."""
+    previous = previous or {}
+    return {
+        "conversation_id": conversation_id,
+        "sentiment": routing["sentiment"],
+        "keywords": previous.get("keywords") or [],
+        "summary": previous.get("summary") or "",
+        "department": routing["department"],
+        "insights": dict(previous.get("insights") or {}, urgency=routing["urgency"]),
+        "routing_confidence": routing["confidence"],
+        "summary_pending": True
+    }
+
+def _release_summary_claim(conversation_id: str, previous: dict, keep_row: bool = False):
+    """
+    Undo a claim whose summary could not be generated, so a later turn retries.
+
+    A first claim's pending row is deleted, unless `keep_row` is set because it
+    holds routing fields; it is then left pending but immediately retakeable.
+    """
+    try:
+        query = db.session.query(ConversationSummary).filter_by(conversation_id=conversation_id)
+        if (previous is None or not previous.get("summary")) and keep_row:
+            stale = datetime.utcnow() - timedelta(seconds=Config.SUMMARY_CLAIM_TIMEOUT_SECONDS + 1)
+            query.filter(ConversationSummary.summary == "").update(
+                {"summarized_messages": 0, "updated_at": stale}, synchronize_session=False
+            )
+        elif previous is None or not previous.get("summary"):
+            query.filter(ConversationSummary.summary == "").delete(synchronize_session=False)
+        else:
+            query.update({"summarized_messages": previous["summarized_messages"]}, synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        print(f"Error releasing summary claim: {e}")
+        db.session.rollback()
+    summary_cache.delete(conversation_id)
+
+def _summarize_in_background(app, conversation_history: list, conversation_id: str, previous: dict):
+    with app.app_context():
+        try:
+            _create_summary(conversation_history, conversation_id)
+        except Exception as e:
+            print(f"Error generating conversation summary in the background: {e}")
+            _release_summary_claim(conversation_id, previous, keep_row=True)
+
+def ensure_conversation_summary(conversation_history: list, conversation_id: str = None):
+    """
+    Return the conversation's summary, generating it at most once per stretch of turns.
+
+    The summary is generated the first time a conversation ends and then only
+    regenerated after SUMMARY_REGENERATE_AFTER_MESSAGES further user/assistant
+    messages. Concurrent requests for the same conversation share one
+    generation: the others return the stored summary, or None while the first
+    one is still pending.
+
+    When the routing classifier is ready and confident (see confident_routing),
+    the routing fields are predicted locally and saved right away, the LLM
+    summary is generated on a background thread, and the returned dict
+    (flagged `summary_pending`) carries the predicted routing with the previous
+    summary text, if any. Clients fetch the finished summary from
+    /api/get-summary/<conversation_id>.
+    
+    :return: The summary dict, or None if it is still being generated elsewhere
+    """
+    if not conversation_id:
+        conversation_id = resolve_conversation_id(conversation_history)
+    message_count = len(summarizable_messages(conversation_history))
+    
+    existing = get_conversation_summary(conversation_id)
+    if existing and existing["summary"] and (
+        message_count - existing.get("summarized_messages", 0) < Config.SUMMARY_REGENERATE_AFTER_MESSAGES
+    ):
+        return existing
+    
+    routing = confident_routing(conversation_history)
+    try:
+        claimed = _claim_summary(conversation_id, message_count, routing)
+    except Exception as e:
+        print(f"Error claiming summary for {conversation_id}: {e}")
+        db.session.rollback()
+        return existing
+    # The cached copy is out of date once the claim changed the row
+    summary_cache.delete(conversation_id)
+    if not claimed:
+        print(f"DEBUG: Summary for {conversation_id} is already up to date or being generated")
+        # A pending row only holds real values when it was claimed with routing fields
+        return existing if existing and (existing["summary"] or routing) else None
+    
+    if routing:
+        save_routing_to_db(conversation_id, routing, conversation_history)
+        _summary_executor.submit(
+            _summarize_in_background, current_app._get_current_object(),
+            [dict(msg) for msg in conversation_history], conversation_id, existing
         )
-        
-        # Store analytics data for summary generation
-        store_request_analytics(token_usage, cost_info, model="o3-mini-2025-01-31")
-        
-        # Save the summary to the database
-        save_summary_to_db(summary_json)
-        
-        return summary_json
+        return _routing_summary(conversation_id, routing, existing)
     
+    try:
+        return _create_summary(conversation_history, conversation_id)
     except Exception as e:
         print(f"Error generating conversation summary: {e}")
-        # Return a default summary in case of error
-        return {
-            "conversation_id": conversation_id,
-            "sentiment": "neutral",
-            "keywords": ["error"],
-            "summary": "Error generating summary. Please try again.",
-            "department": "Sales",
-            "insights": {
-                "urgency": "low",
-                "upsell_opportunity": False,
-                "customer_interest": "unknown",
-                "additional_notes": f"Error: {str(e)}"
-            }
-        }
+        _release_summary_claim(conversation_id, existing)
+        return _error_summary(conversation_id, e)
+
+def _summary_to_dict(summary: ConversationSummary) -> dict:
+    return {
+        "conversation_id": summary.conversation_id,
+        "sentiment": summary.sentiment,
+        "keywords": summary.keywords or [],
+        "summary": summary.summary,
+        "department": summary.department,
+        "insights": summary.insights or {},
+        "summarized_messages": summary.summarized_messages,
+        "created_at": summary.created_at.isoformat() if summary.created_at else None,
+        "updated_at": summary.updated_at.isoformat() if summary.updated_at else None
+    }
 
-def save_summary_to_db(summary_data: dict) -> bool:
+def save_summary_to_db(summary_data: dict, conversation_history: list = None) -> bool:
     """
     Save the conversation summary to the database.
     
+    The summary is upserted into conversation_summaries by its conversation ID,
+    and the matching lead interaction record is upserted the same way. When the
+    conversation history is given, it is stored compressed as the transcript.
+    
     :param summary_data: Dictionary containing the summary information
+    :param conversation_history: The full conversation, if available
     :return: True if successful, False otherwise
     """
+    conversation_id = summary_data["conversation_id"]
+    insights = summary_data.get("insights") or {}
     try:
-        # Create a new interaction record
-        new_interaction = AutoLeadInteractionDetails(
-            # We don't have a lead_id yet, so it's set to None
-            conversation_summary=summary_data["summary"],
-            sentiment=summary_data["sentiment"],
-            product_keywords=summary_data["keywords"],
-            # Set priority_flag based on urgency in insights
-            priority_flag=summary_data["insights"].get("urgency") == "high",
-            next_steps_recommendation=summary_data["insights"].get("additional_notes", "")
-        )
+        now = datetime.utcnow()
+        upsert(db.session, ConversationSummary, {
+            "conversation_id": conversation_id,
+            "sentiment": summary_data.get("sentiment") or "neutral",
+            "keywords": summary_data.get("keywords") or [],
+            "summary": summary_data.get("summary") or "",
+            "department": summary_data.get("department") or "Sales",
+            "insights": insights,
+            "summarized_messages": len(summarizable_messages(conversation_history)) if conversation_history else 0,
+            "updated_at": now
+        }, "conversation_id")
         
-        # Add the new interaction to the session
-        db.session.add(new_interaction)
+        # Keep one interaction record per conversation for the lead pipeline.
+        # We don't have a lead_id yet, so a new record leaves it as None.
+        interaction = {
+            "conversation_id": conversation_id,
+            "conversation_summary": summary_data["summary"],
+            "sentiment": summary_data["sentiment"],
+            "product_keywords": summary_data["keywords"],
+            # Set priority_flag based on urgency in insights
+            "priority_flag": insights.get("urgency") == "high",
+            "next_steps_recommendation": insights.get("additional_notes", "")
+        }
+        if conversation_history:
+            interaction["conversation_transcript"] = compress_transcript(conversation_history)
+        upsert(db.session, AutoLeadInteractionDetails, interaction, "conversation_id")
         
         # Commit the changes
         db.session.commit()
+        
+        # Drop the cached copy so the next read sees the new summary
+        summary_cache.delete(conversation_id)
         return True
     
     except Exception as e:
@@ -219,30 +524,27 @@ def get_conversation_summary(conversation_id: str) -> dict:
     """
     Retrieve a conversation summary from the database.
     
+    Reads go through a short-lived in-process cache, then a lookup on the
+    unique conversation_id index. Pending rows (no summary text yet) are not
+    cached, since another worker may finish them at any moment.
+    
     :param conversation_id: The ID of the conversation
     :return: Dictionary containing the summary information or None if not found
     """
+    cached = summary_cache.get(conversation_id)
+    if cached is not MISSING:
+        return cached
+    
     try:
-        # Since we're now using AutoLeadInteractionDetails, we need to find the most recent interaction
-        # We don't have a direct conversation_id field, so we'll get the most recent interaction
-        summary = db.session.query(AutoLeadInteractionDetails).order_by(
-            AutoLeadInteractionDetails.created_at.desc()
-        ).first()
+        summary = db.session.query(ConversationSummary).filter_by(
+            conversation_id=conversation_id
+        ).one_or_none()
         
         if summary:
-            # Convert the summary to the expected format
-            return {
-                "conversation_id": conversation_id,  # Use the provided conversation_id
-                "sentiment": summary.sentiment,
-                "keywords": summary.product_keywords,
-                "summary": summary.conversation_summary,
-                "department": "Sales",  # Default to Sales since we don't have this field
-                "insights": {
-                    "urgency": "high" if summary.priority_flag else "medium",
-                    "additional_notes": summary.next_steps_recommendation
-                },
-                "created_at": summary.created_at.isoformat() if summary.created_at else None
-            }
+            result = _summary_to_dict(summary)
+            if result["summary"]:
+                summary_cache.set(conversation_id, result)
+            return result
         else:
             return None
     
@@ -0,0 +1,269 @@
+# server/helpers/prefetch_helpers.py
+
+import json
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app
+from sqlalchemy import select
+from database import db
+from models.sql_models import CarInventory
+from helpers.cache_helpers import TTLCache, MISSING
+from helpers.llm_utils import fetch_cars
+from config import Config
+
+# 17 characters, no I, O or Q; must contain both a digit and a letter (checked below)
+VIN_PATTERN = re.compile(r"\b([A-HJ-NPR-Z0-9]{17})\b", re.IGNORECASE)
+# "stock #A1234", "stock number: STK0000500"; the token must contain a digit
+STOCK_PATTERN = re.compile(
+    r"\bstock\s*(?:number|num|no\.?|#)?\s*[:#]?\s*(?:is\s+)?([A-Z0-9][A-Z0-9-]{2,})\b", re.IGNORECASE
+)
+# "under $30k", "less than 25,000", "budget of $32000"
+PRICE_CAP_PATTERN = re.compile(
+    r"\b(?:under|below|less than|at most|no more than|up to|max(?:imum)?|budget(?: of| is)?)\s*"
+    r"\$?\s*(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(k)?\b",
+    re.IGNORECASE
+)
+
+TEXT_FILTERS = ("make", "model", "color")
+EXACT_FILTERS = ("stock_number", "vin")
+
+# Defaults the fetch_cars tool uses for "no filter"
+FETCH_CARS_DEFAULTS = {
+    "make": "", "model": "", "year": -1, "max_year": -1, "price": -1, "max_price": -1,
+    "mileage": -1, "color": "", "stock_number": "", "vin": ""
+}
+
+_executor = ThreadPoolExecutor(max_workers=Config.PREFETCH_MAX_WORKERS, thread_name_prefix="prefetch")
+
+# Known makes and models, reloaded every few minutes
+_vocabulary_cache = TTLCache(max_entries=1, ttl_seconds=Config.PREFETCH_VOCABULARY_TTL_SECONDS)
+
+# fetch_cars results computed during /chat, keyed by the tool call ID they answer
+prefetched_results = TTLCache(max_entries=1000, ttl_seconds=Config.PREFETCH_RESULT_TTL_SECONDS)
+
+
+def _alternation(words):
+    # Longest first so "Rogue Sport" wins over "Rogue"
+    escaped = [re.escape(w) for w in sorted(words, key=len, reverse=True)]
+    return re.compile(r"\b(" + "|".join(escaped) + r")\b", re.IGNORECASE) if escaped else None
+
+
+def _load_vocabulary():
+    """Return regexes for the makes and models in stock, and the make of each model."""
+    vocabulary = _vocabulary_cache.get("vocabulary")
+    if vocabulary is not MISSING:
+        return vocabulary
+
+    rows = db.session.execute(
+        select(CarInventory.make, CarInventory.model).where(CarInventory.deleted_at.is_(None)).distinct()
+    ).all()
+    model_makes = {}
+    for make, model in rows:
+        model_makes.setdefault(model.lower(), set()).add(make)
+    vocabulary = {
+        "makes": _alternation({make for make, _ in rows}),
+        "models": _alternation({model for _, model in rows}),
+        "model_makes": model_makes,
+    }
+    _vocabulary_cache.set("vocabulary", vocabulary)
+    return vocabulary
+
+
+def extract_direct_lookup(message: str) -> dict:
+    """Return a VIN or stock number filter named in the message, or an empty dict."""
+    for match in VIN_PATTERN.finditer(message or ""):
+        vin = match.group(1)
+        if re.search(r"\d", vin) and re.search(r"[A-Za-z]", vin):
+            return {"vin": vin.upper()}
+    for match in STOCK_PATTERN.finditer(message or ""):
+        if re.search(r"\d", match.group(1)):
+            return {"stock_number": match.group(1).upper()}
+    return {}
+
+
+def extract_inventory_filters(message: str) -> dict:
+    """
+    Guess the fetch_cars filters a message is asking for.
+
+    Looks for a VIN or stock number, makes and models currently in stock, and
+    a price cap. Only filters that were found are returned.
+    """
+    filters = extract_direct_lookup(message)
+    if filters:
+        return filters
+
+    vocabulary = _load_vocabulary()
+    if vocabulary["models"]:
+        match = vocabulary["models"].search(message)
+        if match:
+            filters["model"] = match.group(1)
+            makes = vocabulary["model_makes"].get(match.group(1).lower(), set())
+            if len(makes) == 1:
+                filters["make"] = next(iter(makes))
+    if vocabulary["makes"] and "make" not in filters:
+        match = vocabulary["makes"].search(message)
+        if match:
+            filters["make"] = match.group(1)
+
+    match = PRICE_CAP_PATTERN.search(message)
+    if match:
+        amount = float(match.group(1).replace(",", ""))
+        filters["max_price"] = amount * 1000 if match.group(2) else amount
+    return filters
+
+
+def _number(args, key):
+    """Return a numeric filter from tool arguments, None for "no filter", or raise if unusable."""
+    if key not in args or args[key] == -1:
+        return None
+    value = args[key]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(key)
+    return value
+
+
+def _row_matches(row: dict, args: dict) -> bool:
+    """Apply fetch_cars filter semantics to one already fetched row."""
+    for key in TEXT_FILTERS:
+        if args.get(key) and args[key].lower() not in (row[key] or "").lower():
+            return False
+    for key in EXACT_FILTERS:
+        if args.get(key) and args[key] != row[key]:
+            return False
+    bounds = (
+        ("year", "year", 1), ("max_year", "year", -1), ("price", "price", 1),
+        ("max_price", "price", -1), ("mileage", "mileage", -1)
+    )
+    for key, column, direction in bounds:
+        limit = _number(args, key)
+        if limit is None:
+            continue
+        if row[column] is None or (row[column] - limit) * direction < 0:
+            return False
+    return True
+
+
+def narrow_prefetched(filters: dict, rows: list, tool_args: dict):
+    """
+    Answer a fetch_cars call from rows prefetched with `filters`.
+
+    The prefetched rows can only be reused when every prefetch filter is
+    implied by the tool arguments, i.e. the model asked for the same or a
+    narrower set of cars. The extra filters are then applied in Python.
+
+    :return: The rows fetch_cars(tool_args) would return, or None if they cannot be derived
+    """
+    try:
+        for key in TEXT_FILTERS + EXACT_FILTERS:
+            value = tool_args.get(key) or ""
+            if not isinstance(value, str) or "%" in value or "_" in value:
+                return None
+            if key in filters:
+                if key in TEXT_FILTERS and filters[key].lower() not in value.lower():
+                    return None
+                if key in EXACT_FILTERS and filters[key] != value:
+                    return None
+        if "max_price" in filters:
+            max_price = _number(tool_args, "max_price")
+            if max_price is None or max_price > filters["max_price"]:
+                return None
+        return [row for row in rows if _row_matches(row, tool_args)]
+    except (KeyError, ValueError, TypeError):
+        return None
+
+
+def to_fetch_args(filters: dict) -> dict:
+    """Fill in "no filter" defaults for every fetch_cars argument."""
+    return dict(FETCH_CARS_DEFAULTS, **filters)
+
+
+def _prefetch(app, message):
+    with app.app_context():
+        filters = extract_inventory_filters(message)
+        # A make alone is most of a single-brand inventory; not worth fetching speculatively
+        if not filters or set(filters) <= {"make", "max_price"}:
+            return None, None
+        return filters, fetch_cars(to_fetch_args(filters))
+
+
+class InventoryPrefetch:
+    """A speculative fetch_cars query started before the LLM has asked for it."""
+
+    def __init__(self, message: str):
+        self._future = _executor.submit(_prefetch, current_app._get_current_object(), message)
+
+    def resolve(self, tool_call_id: str, tool_args: dict) -> bool:
+        """
+        Store the result for a fetch_cars tool call if the prefetch can answer it.
+
+        :return: True if the tool call will be answered from the prefetch
+        """
+        try:
+            filters, rows = self._future.result(timeout=Config.PREFETCH_WAIT_SECONDS)
+        except FutureTimeoutError:
+            print("DEBUG: Inventory prefetch not finished in time; tool call will query")
+            return False
+        except Exception as e:
+            print(f"DEBUG: Inventory prefetch failed: {e}")
+            return False
+        if filters is None:
+            return False
+
+        result = narrow_prefetched(filters, rows, tool_args)
+        print(f"DEBUG: Inventory prefetch {'hit' if result is not None else 'miss'}: {filters} vs {tool_args}")
+        if result is None:
+            return False
+        prefetched_results.set(tool_call_id, result)
+        return True
+
+
+def start_inventory_prefetch(message: str):
+    """Start the speculative inventory query for a user message, if enabled."""
+    if not Config.PREFETCH_ENABLED or not message:
+        return None
+    return InventoryPrefetch(message)
+
+
+def take_prefetched_result(tool_call_id: str):
+    """Pop the prefetched result for a tool call, or return MISSING."""
+    result = prefetched_results.get(tool_call_id)
+    if result is not MISSING:
+        prefetched_results.delete(tool_call_id)
+    return result
+
+
+def direct_lookup_tool_call(message: str):
+    """
+    Answer a message that names a VIN or stock number without asking the LLM first.
+
+    Runs the lookup now and, if a car is found, returns an assistant message
+    with a synthesized fetch_cars tool call whose result is already stored,
+    so the tool-call round trip is the only LLM call for this turn.
+
+    :return: The assistant message, or None if the message is not a direct lookup
+    """
+    if not Config.PREFETCH_DIRECT_LOOKUPS:
+        return None
+    filters = extract_direct_lookup(message)
+    if not filters:
+        return None
+    args = to_fetch_args(filters)
+    result = fetch_cars(args)
+    if not result:
+        # Let the model handle "not found" conversationally
+        return None
+
+    tool_call_id = f"call_prefetch_{uuid.uuid4().hex[:24]}"
+    prefetched_results.set(tool_call_id, result)
+    print(f"DEBUG: Direct inventory lookup for {filters}; skipping the first LLM call")
+    return {
+        "role": "assistant",
+        "content": "Processing your request...",
+        "tool_calls": [{
+            "id": tool_call_id,
+            "type": "function",
+            "function": {"name": "fetch_cars", "arguments": json.dumps(args)}
+        }]
+    }
+
@@ -0,0 +1,188 @@
+# server/helpers/profiling_helpers.py
+
+import cProfile
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from flask import g, request
+from config import Config
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples the call stack of one thread at a fixed interval.
+
+    Needs real OS threads (sync or gthread workers); under eventlet the
+    sampling thread only runs when the request yields.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded_lines(self):
+        """Return the samples as folded stacks, one "a;b;c count" line each."""
+        return [f"{stack} {count}" for stack, count in self.samples.most_common()]
+
+
+def pstats_to_folded(stats: pstats.Stats, max_paths: int = 20000, min_fraction: float = 0.001):
+    """
+    Convert cProfile statistics to folded stacks weighted in microseconds.
+
+    cProfile only records caller/callee pairs, not full stacks, so time is
+    spread over paths in proportion to each edge's cumulative time. The number
+    of paths through the call graph grows exponentially with its size, so
+    edges carrying less than `min_fraction` of the total time are dropped and
+    the walk stops after `max_paths` paths.
+    """
+    raw = stats.stats
+    children = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge))
+
+    def label(func):
+        filename, line, name = func
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    lines = []
+    roots = [(func, tottime, cumtime) for func, (_, _, tottime, cumtime, callers) in raw.items() if not callers]
+    min_time = sum(cumtime for _, _, cumtime in roots) * min_fraction
+    visited = 0
+
+    def walk(func, path, self_time, cum_time, depth):
+        nonlocal visited
+        visited += 1
+        scale = cum_time / raw[func][3] if raw[func][3] else 0
+        if self_time > 0:
+            lines.append(f"{';'.join(path)} {max(1, int(self_time * 1_000_000))}")
+        if depth > 64:
+            return
+        for child, edge in children.get(func, []):
+            if visited >= max_paths:
+                return
+            if edge[3] * scale < min_time or label(child) in path:
+                continue
+            walk(child, path + [label(child)], edge[2] * scale, edge[3] * scale, depth + 1)
+
+    for func, tottime, cumtime in roots:
+        if visited >= max_paths:
+            break
+        walk(func, [label(func)], tottime, cumtime, 0)
+    return lines
+
+
+def convert_profile(prof_path: str, folded_path: str = None, **options) -> str:
+    """Write the folded stacks of a saved cProfile file next to it (or to `folded_path`)."""
+    folded_path = folded_path or f"{os.path.splitext(prof_path)[0]}.folded"
+    folded = pstats_to_folded(pstats.Stats(prof_path), **options)
+    with open(folded_path, "w") as f:
+        f.write("\n".join(folded) + "\n")
+    return folded_path
+
+
+def _output_base() -> str:
+    os.makedirs(Config.PROFILE_OUTPUT_DIR, exist_ok=True)
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    route = re.sub(r"[^A-Za-z0-9]+", "_", request.path).strip("_") or "root"
+    return os.path.join(Config.PROFILE_OUTPUT_DIR, f"{timestamp}_{request.method}_{route}")
+
+
+def _should_profile() -> bool:
+    # Forcing a profile (and its disk writes) takes the admin token, like the admin endpoints
+    header_value = request.headers.get(Config.PROFILE_HEADER)
+    if header_value and Config.ADMIN_TOKEN and header_value == Config.ADMIN_TOKEN:
+        return True
+    return Config.PROFILE_SAMPLE_RATE > 0 and random.random() < Config.PROFILE_SAMPLE_RATE
+
+
+def init_profiling(app):
+    """
+    Register the per-request profiling hooks when PROFILING_ENABLED is set.
+
+    A request is profiled when it carries the profile header set to
+    ADMIN_TOKEN (ignored while no token is configured) or is picked by
+    PROFILE_SAMPLE_RATE. When profiling is disabled nothing is registered.
+
+    Sampled profiles are written as folded stacks. cProfile profiles are only
+    dumped as .prof files, since converting them is too slow for a request;
+    run `flask profile-to-folded` on them afterwards.
+    """
+    if not Config.PROFILING_ENABLED:
+        return app
+
+    @app.before_request
+    def start_request_profile():
+        if not _should_profile():
+            return
+        g.profile_started = time.perf_counter()
+        if Config.PROFILE_MODE == "sample":
+            g.profiler = StackSampler(threading.get_ident(), Config.PROFILE_SAMPLE_INTERVAL)
+            g.profiler.start()
+        else:
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_request_profile(response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+        elapsed_ms = (time.perf_counter() - g.pop("profile_started")) * 1000
+        output_base = _output_base()
+
+        if isinstance(profiler, StackSampler):
+            profiler.stop()
+            # Folded stacks load directly into flamegraph.pl and speedscope
+            output_path = f"{output_base}.folded"
+            with open(output_path, "w") as f:
+                f.write("\n".join(profiler.folded_lines()) + "\n")
+        else:
+            profiler.disable()
+            output_path = f"{output_base}.prof"
+            profiler.dump_stats(output_path)
+
+        print(f"DEBUG: Profiled {request.method} {request.path} in {elapsed_ms:.1f}ms -> {output_path}")
+        response.headers["X-Profile-Output"] = os.path.basename(output_path)
+        return response
+
+    @app.teardown_request
+    def discard_request_profile(exception=None):
+        # after_request is skipped when the view raises; never leave a profiler running
+        profiler = g.pop("profiler", None)
+        if isinstance(profiler, StackSampler):
+            profiler.stop()
+        elif profiler is not None:
+            profiler.disable()
+
+    return app
@@ -0,0 +1,152 @@
+# server/helpers/routing_helpers.py
+
+import os
+import threading
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from config import Config
+
+# Predicts the fields a lead is routed on (sentiment, urgency, department)
+# from a conversation, in-process, so routing does not wait for the LLM
+# summary. One TF-IDF vectorizer is shared by a logistic regression per field,
+# so a batch of conversations is vectorized once and scored with three matrix
+# products. `flask train-routing-classifier` fits it on the seed examples
+# below plus the LLM summaries already stored; until that model exists, and
+# whenever it is unsure, conversations are routed by the LLM summary as before.
+
+ROUTING_FIELDS = ("sentiment", "urgency", "department")
+
+# The values the summary prompt asks the LLM for (see request_summary)
+ROUTING_LABELS = {
+    "sentiment": ("positive", "neutral", "negative"),
+    "urgency": ("high", "medium", "low"),
+    "department": ("Sales", "Service", "Management", "HR", "Finance", "Parts"),
+}
+
+# (customer text, sentiment, urgency, department)
+SEED_EXAMPLES = [
+    ("do you have any rogues in stock under 30k", "positive", "medium", "Sales"),
+    ("i'm looking for a family suv, can i schedule a test drive", "positive", "high", "Sales"),
+    ("what pathfinders do you have available", "neutral", "medium", "Sales"),
+    ("i want to buy a new altima this week", "positive", "high", "Sales"),
+    ("can you send me the price of the kicks", "neutral", "low", "Sales"),
+    ("just browsing, thanks", "neutral", "low", "Sales"),
+    ("what is my trade in worth, i have a 2015 sentra", "neutral", "medium", "Sales"),
+    ("i need an oil change appointment", "neutral", "medium", "Service"),
+    ("my check engine light is on and the car is making a noise", "negative", "high", "Service"),
+    ("can i book a tire rotation for saturday", "neutral", "low", "Service"),
+    ("my brakes are squeaking, when can you look at them", "negative", "high", "Service"),
+    ("is my car ready from the service department", "neutral", "medium", "Service"),
+    ("do you offer financing for bad credit", "neutral", "medium", "Finance"),
+    ("what are the lease specials and monthly payments", "neutral", "medium", "Finance"),
+    ("i want to refinance my loan", "neutral", "low", "Finance"),
+    ("what apr can i get with a down payment", "neutral", "medium", "Finance"),
+    ("do you have floor mats for a 2020 rogue in stock", "neutral", "low", "Parts"),
+    ("i need a replacement key fob", "neutral", "medium", "Parts"),
+    ("how much is an oem windshield wiper", "neutral", "low", "Parts"),
+    ("your salesman was rude and i want to speak to a manager", "negative", "high", "Management"),
+    ("i had a terrible experience, this is unacceptable", "negative", "high", "Management"),
+    ("i want to file a complaint about my last visit", "negative", "high", "Management"),
+    ("great service last time, thank you", "positive", "low", "Management"),
+    ("are you hiring salespeople", "neutral", "low", "HR"),
+    ("i'd like to apply for a technician job", "positive", "low", "HR"),
+    ("who do i talk to about employment", "neutral", "low", "HR"),
+]
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def conversation_text(conversation_history: list) -> str:
+    """The text a conversation is classified on: what the customer said."""
+    return "\n".join(
+        str(msg.get("content") or "") for msg in conversation_history if msg.get("role") == "user"
+    ).lower()
+
+
+class RoutingModel:
+    """A shared vectorizer and one classifier per routing field."""
+
+    def __init__(self, vectorizer, classifiers: dict):
+        self.vectorizer = vectorizer
+        self.classifiers = classifiers
+
+    @classmethod
+    def train(cls, texts: list, labels: dict):
+        """Fit on customer texts and, per routing field, one label per text."""
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, min_df=1)
+        features = vectorizer.fit_transform(texts)
+        classifiers = {
+            field: LogisticRegression(C=5, max_iter=1000, class_weight="balanced").fit(features, labels[field])
+            for field in ROUTING_FIELDS
+        }
+        return cls(vectorizer, classifiers)
+
+    def predict(self, texts: list) -> list:
+        """
+        Predict every routing field for a batch of texts.
+
+        :return: One dict per text with each field's label and its probability under "confidence"
+        """
+        if not texts:
+            return []
+        features = self.vectorizer.transform(texts)
+        predictions = [{"confidence": {}} for _ in texts]
+        for field, classifier in self.classifiers.items():
+            probabilities = classifier.predict_proba(features)
+            best = probabilities.argmax(axis=1)
+            for prediction, index, row in zip(predictions, best, probabilities):
+                prediction[field] = str(classifier.classes_[index])
+                prediction["confidence"][field] = round(float(row[index]), 3)
+        return predictions
+
+
+def seed_examples():
+    """Return the built-in training examples as (text, {field: label}) pairs."""
+    return [(text, dict(zip(ROUTING_FIELDS, labels))) for text, *labels in SEED_EXAMPLES]
+
+
+def train_routing_model(examples) -> RoutingModel:
+    """Fit the model on (text, {field: label}) pairs."""
+    return RoutingModel.train(
+        [text for text, _ in examples],
+        {field: [labels[field] for _, labels in examples] for field in ROUTING_FIELDS}
+    )
+
+
+def routing_classifier_ready() -> bool:
+    """True when ROUTING_CLASSIFIER_ENABLED is on and a trained model exists at ROUTING_MODEL_PATH."""
+    return Config.ROUTING_CLASSIFIER_ENABLED and os.path.exists(Config.ROUTING_MODEL_PATH)
+
+
+def get_routing_model() -> RoutingModel:
+    """Load the trained model from ROUTING_MODEL_PATH."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                print(f"DEBUG: Loading routing model from {Config.ROUTING_MODEL_PATH}")
+                _model = joblib.load(Config.ROUTING_MODEL_PATH)
+    return _model
+
+
+def predict_routing(conversation_histories: list) -> list:
+    """Predict sentiment, urgency and department for a batch of conversations."""
+    return get_routing_model().predict([conversation_text(history) for history in conversation_histories])
+
+
+def confident_routing(conversation_history: list):
+    """
+    Predict a conversation's routing, if the classifier is ready and sure of it.
+
+    :return: The prediction, or None when the classifier is not ready or any
+             field's probability is below ROUTING_MIN_CONFIDENCE
+    """
+    if not routing_classifier_ready():
+        return None
+    routing = predict_routing([conversation_history])[0]
+    if min(routing["confidence"].values()) < Config.ROUTING_MIN_CONFIDENCE:
+        print(f"DEBUG: Routing classifier unsure ({routing['confidence']}); routing by the LLM summary")
+        return None
+    return routing
@@ -0,0 +1,163 @@
+# server/helpers/semantic_search_helpers.py
+
+import threading
+import time
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sqlalchemy import func, select
+from models.sql_models import InventoryVersion
+from helpers.inventory_helpers import cars, INVENTORY_COLUMNS
+from config import Config
+
+# In-process TF-IDF index over the cars in stock. Rows are L2-normalized, so
+# cosine similarity against a query is one sparse matrix-vector product.
+#
+# The index follows the inventory version: when a feed ingest bumps it, only
+# the cars whose change_version is newer are re-read and re-vectorized with
+# the existing vocabulary. Once enough of the index has changed since the last
+# fit, the vocabulary and IDF weights are refit from scratch.
+
+RESULT_FIELDS = ("stock_number", "vin", "make", "model", "year", "price", "mileage", "color", "description")
+
+
+def _document(car) -> str:
+    """The text a car is indexed under: its attributes followed by the description."""
+    parts = (car["year"], car["make"], car["model"], car["color"], car["description"])
+    return " ".join(str(part) for part in parts if part)
+
+
+def _new_vectorizer():
+    return TfidfVectorizer(stop_words="english", ngram_range=(1, 2), sublinear_tf=True, dtype=np.float32)
+
+
+class SemanticIndex:
+    """An immutable TF-IDF index; refreshing it returns a new instance."""
+
+    def __init__(self, vectorizer, matrix, car_ids, rows, version, changes_since_fit=0):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.car_ids = car_ids
+        self.rows = rows
+        self.version = version
+        self.changes_since_fit = changes_since_fit
+        self.prices = np.array([row["price"] for row in rows], dtype=np.float64)
+        self.years = np.array([row["year"] for row in rows], dtype=np.int64)
+        self.mileages = np.array([np.inf if row["mileage"] is None else row["mileage"] for row in rows], dtype=np.float64)
+
+    @classmethod
+    def build(cls, session, version: int):
+        """Fit the vocabulary on every car in stock."""
+        result = session.execute(select(*INVENTORY_COLUMNS).where(cars.c.deleted_at.is_(None)).order_by(cars.c.id))
+        keys = tuple(result.keys())
+        cars_in_stock = [dict(zip(keys, row)) for row in result]
+
+        vectorizer = _new_vectorizer()
+        if cars_in_stock:
+            matrix = vectorizer.fit_transform([_document(car) for car in cars_in_stock]).tocsr()
+        else:
+            vectorizer, matrix = None, sparse.csr_matrix((0, 0), dtype=np.float32)
+        car_ids = np.array([car["id"] for car in cars_in_stock], dtype=np.int64)
+        rows = [{field: car[field] for field in RESULT_FIELDS} for car in cars_in_stock]
+        return cls(vectorizer, matrix, car_ids, rows, version)
+
+    def refresh(self, session, version: int):
+        """
+        Return an index for `version`, re-vectorizing only the cars changed since this one.
+
+        Falls back to a full build when the index is empty or when the changes
+        since the last fit exceed SEMANTIC_SEARCH_REFIT_RATIO of the index.
+        """
+        if version == self.version:
+            return self
+
+        changed = session.execute(
+            select(*INVENTORY_COLUMNS, cars.c.deleted_at)
+            .where(cars.c.change_version > self.version, cars.c.change_version <= version)
+            .order_by(cars.c.id)
+        )
+        keys = tuple(changed.keys())
+        changed = [dict(zip(keys, row)) for row in changed]
+
+        changes = self.changes_since_fit + len(changed)
+        if self.vectorizer is None or changes > Config.SEMANTIC_SEARCH_REFIT_RATIO * max(len(self.rows), 1):
+            return SemanticIndex.build(session, version)
+
+        changed_ids = np.array([car["id"] for car in changed], dtype=np.int64)
+        keep = ~np.isin(self.car_ids, changed_ids)
+        upserts = [car for car in changed if car["deleted_at"] is None]
+
+        matrix = self.matrix[np.flatnonzero(keep)]
+        if upserts:
+            matrix = sparse.vstack([matrix, self.vectorizer.transform([_document(car) for car in upserts])], format="csr")
+        car_ids = np.concatenate([self.car_ids[keep], np.array([car["id"] for car in upserts], dtype=np.int64)])
+        rows = [row for row, kept in zip(self.rows, keep) if kept]
+        rows += [{field: car[field] for field in RESULT_FIELDS} for car in upserts]
+        return SemanticIndex(self.vectorizer, matrix, car_ids, rows, version, changes)
+
+    def search(self, query: str, limit: int = 5, max_price=None, min_year=None, max_mileage=None, make=None) -> list:
+        """
+        Return the cars most similar to `query`, best first, with their cosine score.
+
+        Optional filters narrow the candidates before ranking; cars that share
+        no terms with the query are never returned.
+        """
+        if self.vectorizer is None or not query:
+            return []
+        query_vector = self.vectorizer.transform([query])
+        if query_vector.nnz == 0:
+            return []
+
+        scores = (self.matrix @ query_vector.T).toarray().ravel()
+        mask = scores > 0
+        if max_price is not None:
+            mask &= self.prices <= max_price
+        if min_year is not None:
+            mask &= self.years >= min_year
+        if max_mileage is not None:
+            mask &= self.mileages <= max_mileage
+        if make:
+            needle = make.lower()
+            mask &= np.array([needle in (row["make"] or "").lower() for row in self.rows], dtype=bool)
+
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        # Ties broken by position so results are stable between calls
+        candidates = sorted(candidates, key=lambda i: (-scores[i], i))
+        return [dict(self.rows[i], score=round(float(scores[i]), 4)) for i in candidates]
+
+
+_index = None
+_checked_at = None
+_lock = threading.Lock()
+
+
+def get_semantic_index(session):
+    """
+    Return the index for the current inventory version, refreshing it if needed.
+
+    The inventory version is read at most every SEMANTIC_SEARCH_CHECK_SECONDS.
+    """
+    global _index, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < Config.SEMANTIC_SEARCH_CHECK_SECONDS:
+        return _index
+
+    # Only the first build is waited for; later refreshes run in one request
+    # while the others keep searching the previous index
+    if not _lock.acquire(blocking=_index is None):
+        return _index
+    try:
+        if _index is not None and now - _checked_at < Config.SEMANTIC_SEARCH_CHECK_SECONDS:
+            return _index
+        version = session.execute(select(func.max(InventoryVersion.version))).scalar() or 0
+        if _index is None or version != _index.version:
+            started = time.perf_counter()
+            _index = SemanticIndex.build(session, version) if _index is None else _index.refresh(session, version)
+            print(f"DEBUG: Semantic index at inventory v{version} ({len(_index.rows)} cars) "
+                  f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+        _checked_at = now
+        return _index
+    finally:
+        _lock.release()
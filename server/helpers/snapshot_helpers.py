@@ -0,0 +1,296 @@
+# server/helpers/snapshot_helpers.py
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import func, select
+from models.sql_models import InventoryVersion
+from helpers.inventory_helpers import cars, INVENTORY_COLUMNS
+from helpers.cache_helpers import MISSING
+from config import Config
+
+# File layout (little endian, every section 8-byte aligned):
+#   b"INVSNAP1" | uint32 header length | JSON header | numeric columns |
+#   string id columns (uint32) | string offsets (uint64) | UTF-8 string blob
+# The string table is sorted, so exact lookups are a binary search and every
+# distinct make, model or color is stored once.
+MAGIC = b"INVSNAP1"
+FORMAT_VERSION = 1
+
+NUMERIC_COLUMNS = {"id": "<i8", "year": "<i4", "price": "<f8", "mileage": "<i8", "created_at": "<i8"}
+STRING_COLUMNS = ("stock_number", "vin", "make", "model", "color", "description")
+# NULL in a numeric column and in a string id column
+INT_NULL = np.iinfo(np.int64).min
+STRING_NULL = np.iinfo(np.uint32).max
+
+# created_at is stored as microseconds since this (naive UTC) epoch
+EPOCH = datetime(1970, 1, 1)
+
+INVENTORY_FIELDS = ("id", "stock_number", "vin", "make", "model", "year", "price", "mileage", "color", "description")
+FETCH_CARS_FIELDS = ("stock_number", "vin", "make", "model", "year", "price", "mileage", "color", "description", "created_at")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def build_inventory_snapshot(session, path: str = None) -> dict:
+    """
+    Write the cars in stock to a columnar snapshot file and publish it atomically.
+
+    The file is written next to `path` and moved into place with os.replace,
+    so workers reading the old snapshot keep their mapping until they swap.
+
+    :return: Summary with the path, inventory version, row count and size
+    """
+    path = path or Config.INVENTORY_SNAPSHOT_PATH
+    version = session.execute(select(func.max(InventoryVersion.version))).scalar() or 0
+    rows = session.execute(
+        select(*INVENTORY_COLUMNS, cars.c.created_at).where(cars.c.deleted_at.is_(None)).order_by(cars.c.id)
+    ).all()
+
+    columns = list(zip(*rows)) if rows else [()] * (len(INVENTORY_FIELDS) + 1)
+    by_name = dict(zip(INVENTORY_FIELDS + ("created_at",), columns))
+
+    numeric = {
+        "id": np.array(by_name["id"], dtype="<i8"),
+        "year": np.array(by_name["year"], dtype="<i4"),
+        "price": np.array(by_name["price"], dtype="<f8"),
+        "mileage": np.array([INT_NULL if v is None else v for v in by_name["mileage"]], dtype="<i8"),
+        "created_at": np.array(
+            [INT_NULL if v is None else (v - EPOCH) // timedelta(microseconds=1) for v in by_name["created_at"]],
+            dtype="<i8"
+        ),
+    }
+
+    strings = sorted({v for name in STRING_COLUMNS for v in by_name[name] if v is not None})
+    string_ids = {value: index for index, value in enumerate(strings)}
+    id_columns = {
+        name: np.array([STRING_NULL if v is None else string_ids[v] for v in by_name[name]], dtype="<u4")
+        for name in STRING_COLUMNS
+    }
+    encoded = [s.encode("utf-8") for s in strings]
+    string_offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+    if encoded:
+        string_offsets[1:] = np.cumsum([len(b) for b in encoded])
+    blob = b"".join(encoded)
+
+    # Lay the sections out after a header whose size is only known once it is
+    # serialized, so reserve a generous fixed size for it
+    sections = list(numeric.items()) + list(id_columns.items()) + [("_string_offsets", string_offsets)]
+    header = {
+        "format": FORMAT_VERSION,
+        "inventory_version": version,
+        "rows": len(rows),
+        "built_at": datetime.utcnow().isoformat(),
+        "columns": {},
+        "strings": {"count": len(encoded)},
+    }
+    header_space = 4096
+    offset = len(MAGIC) + 4 + header_space
+    for name, array in sections:
+        offset = _align(offset)
+        header["columns"][name] = {"dtype": array.dtype.str, "offset": offset}
+        offset += array.nbytes
+    offset = _align(offset)
+    header["strings"].update(blob_offset=offset, blob_size=len(blob))
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    if len(header_bytes) > header_space:
+        raise ValueError("Snapshot header does not fit in its reserved space")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".inventory-", suffix=".snap", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+            for name, array in sections:
+                f.seek(header["columns"][name]["offset"])
+                f.write(array.tobytes())
+            f.seek(header["strings"]["blob_offset"])
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return {"path": path, "inventory_version": version, "rows": len(rows), "bytes": os.path.getsize(path)}
+
+
+class InventorySnapshot:
+    """
+    A read-only, memory-mapped view of a snapshot file.
+
+    Column arrays are numpy views straight over the mapping, so every worker
+    shares the same page-cache pages and nothing is copied until rows are
+    turned into dicts.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an inventory snapshot")
+        (header_length,) = struct.unpack_from("<I", self._map, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(self._map[start:start + header_length])
+        if self.header["format"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {self.header['format']}")
+
+        self.rows = self.header["rows"]
+        self.inventory_version = self.header["inventory_version"]
+        self.columns = {}
+        for name, spec in self.header["columns"].items():
+            count = self.header["strings"]["count"] + 1 if name == "_string_offsets" else self.rows
+            self.columns[name] = np.frombuffer(self._map, dtype=spec["dtype"], count=count, offset=spec["offset"])
+        self._string_offsets = self.columns.pop("_string_offsets")
+        self._blob_offset = self.header["strings"]["blob_offset"]
+        self._distinct = {}
+        self._strings = {}
+
+    def string(self, string_id):
+        if string_id == STRING_NULL:
+            return None
+        start = self._blob_offset + int(self._string_offsets[string_id])
+        end = self._blob_offset + int(self._string_offsets[string_id + 1])
+        return self._map[start:end].decode("utf-8")
+
+    def string_id(self, value: str):
+        """Return the id of an exact string, or None if it is not in the snapshot."""
+        count = self.header["strings"]["count"]
+        encoded = value.encode("utf-8")
+        index = bisect_left(range(count), encoded, key=lambda i: self.string(i).encode("utf-8"))
+        return index if index < count and self.string(index) == value else None
+
+    def _matching_ids(self, column: str, value: str):
+        """Ids of the distinct values in `column` containing `value`, case-insensitively (ILIKE %value%)."""
+        distinct = self._distinct.get(column)
+        if distinct is None:
+            ids = np.unique(self.columns[column])
+            distinct = self._distinct[column] = [(i, self.string(i).lower()) for i in ids if i != STRING_NULL]
+        needle = value.lower()
+        return np.array([i for i, text in distinct if needle in text], dtype="<u4")
+
+    def _rows(self, indexes, fields) -> list:
+        """Materialize rows column by column: one numpy gather and one pass of decoding per field."""
+        values = []
+        for field in fields:
+            column = self.columns[field][indexes].tolist()
+            if field == "created_at":
+                column = [None if v == INT_NULL else (EPOCH + timedelta(microseconds=v)).isoformat() for v in column]
+            elif field == "mileage":
+                column = [None if v == INT_NULL else v for v in column]
+            elif field in STRING_COLUMNS:
+                column = [self._decoded(v) for v in column]
+            values.append(column)
+        return [dict(zip(fields, row)) for row in zip(*values)]
+
+    def _decoded(self, string_id):
+        # Decoded strings are kept per worker; the repeated makes, models and
+        # colors are decoded once instead of once per row
+        value = self._strings.get(string_id, MISSING)
+        if value is MISSING:
+            value = self._strings[string_id] = self.string(string_id)
+        return value
+
+    def inventory(self) -> list:
+        """Every car in the snapshot, as served by /api/inventory."""
+        return self._rows(np.arange(self.rows), INVENTORY_FIELDS)
+
+    def fetch_cars(self, filter_params: dict):
+        """
+        Apply fetch_cars filters to the snapshot.
+
+        :return: The matching cars, or None if a filter value cannot be
+            evaluated exactly like the SQL query would (the caller then queries)
+        """
+        mask = np.ones(self.rows, dtype=bool)
+        for field in ("make", "model", "color"):
+            value = filter_params.get(field)
+            if value:
+                if not isinstance(value, str) or "%" in value or "_" in value:
+                    return None
+                mask &= np.isin(self.columns[field], self._matching_ids(field, value))
+        for field in ("stock_number", "vin"):
+            value = filter_params.get(field)
+            if value:
+                if not isinstance(value, str):
+                    return None
+                string_id = self.string_id(value)
+                if string_id is None:
+                    return []
+                mask &= self.columns[field] == string_id
+
+        bounds = (
+            ("year", "year", np.greater_equal), ("max_year", "year", np.less_equal),
+            ("price", "price", np.greater_equal), ("max_price", "price", np.less_equal),
+            ("mileage", "mileage", np.less_equal),
+        )
+        for key, column, compare in bounds:
+            if key not in filter_params or filter_params[key] == -1:
+                continue
+            limit = filter_params[key]
+            if isinstance(limit, bool) or not isinstance(limit, (int, float)):
+                return None
+            values = self.columns[column]
+            mask &= compare(values, limit)
+            if column == "mileage":
+                mask &= values != INT_NULL
+
+        return self._rows(np.flatnonzero(mask), FETCH_CARS_FIELDS)
+
+
+_current = None
+_checked_at = None
+_lock = threading.Lock()
+
+
+def get_inventory_snapshot():
+    """
+    Return the current snapshot for this worker, or None if none is published.
+
+    The file is stat'ed at most every INVENTORY_SNAPSHOT_CHECK_SECONDS; when a
+    new file has been moved into place it is mapped and swapped in, and the
+    old mapping is released once no request is using it.
+    """
+    global _current, _checked_at
+    if not Config.INVENTORY_SNAPSHOT_ENABLED:
+        return None
+    now = time.monotonic()
+    if _checked_at is not None and now - _checked_at < Config.INVENTORY_SNAPSHOT_CHECK_SECONDS:
+        return _current
+
+    with _lock:
+        if _checked_at is not None and now - _checked_at < Config.INVENTORY_SNAPSHOT_CHECK_SECONDS:
+            return _current
+        _checked_at = now
+        try:
+            stat = os.stat(Config.INVENTORY_SNAPSHOT_PATH)
+        except FileNotFoundError:
+            _current = None
+            return None
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if _current is None or _current.identity != identity:
+            try:
+                _current = InventorySnapshot(Config.INVENTORY_SNAPSHOT_PATH)
+                print(f"DEBUG: Mapped inventory snapshot v{_current.inventory_version} ({_current.rows} cars)")
+            except (OSError, ValueError) as e:
+                print(f"DEBUG: Could not map inventory snapshot: {e}")
+                _current = None
+        return _current
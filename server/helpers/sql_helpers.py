@@ -1,9 +1,11 @@
 # server/helpers/sql_helpers.py
 
 import json
-from sqlalchemy import or_
-from flask import g
-from models.sql_models import CarInventory
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from database.session import ScopedSession
+from helpers.inventory_helpers import search_cars_text
 
 def search_car_inventory(search_query: str, filters: dict, limit: int):
     """
@@ -15,37 +17,108 @@ def search_car_inventory(search_query: str, filters: dict, limit: int):
       limit (int): Maximum number of results to return.
       
     Returns:
-      A list of matching CarInventory records.
-    """
-    # Use the session attached to Flask's global context.
-    session = g.session
-
-    # Start with a base query.
-    query = session.query(CarInventory)
-
-    # Apply each filter if provided.
-    if filters.get("make"):
-        query = query.filter(CarInventory.make == filters["make"])
-    if filters.get("model"):
-        query = query.filter(CarInventory.model == filters["model"])
-    if filters.get("min_price") is not None:
-        query = query.filter(CarInventory.price >= filters["min_price"])
-    if filters.get("max_price") is not None:
-        query = query.filter(CarInventory.price <= filters["max_price"])
-    if filters.get("year"):
-        query = query.filter(CarInventory.year == filters["year"])
-
-    # If a search_query is provided, search key textual columns.
-    if search_query:
-        like_pattern = f"%{search_query}%"
-        query = query.filter(
-            or_(
-                CarInventory.make.ilike(like_pattern),
-                CarInventory.model.ilike(like_pattern),
-                CarInventory.description.ilike(like_pattern)
-            )
-        )
-
-    # Limit the number of results.
-    results = query.limit(limit).all()
-    return results
+      A list of matching rows (named tuples with CarInventory column names).
+    """
+    # Use the request's scoped session (created on first use).
+    session = ScopedSession()
+
+    # Core query with cached statements and plain rows (see helpers/inventory_helpers.py)
+    return search_cars_text(session, search_query, filters, limit)
+
+# INSERT constructs supporting ON CONFLICT; other databases use _insert_or_update
+_ON_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def _dialect_insert(session, model):
+    """Return an INSERT with ON CONFLICT support for the session's database, or None if it has none."""
+    dialect_insert = _ON_CONFLICT_INSERTS.get(session.get_bind().dialect.name)
+    return dialect_insert(model) if dialect_insert else None
+
+def _insert_or_update(session, model, values: dict, conflict_column: str, update_values: dict = None) -> bool:
+    """
+    Select-then-insert/update, for databases without ON CONFLICT.
+
+    The existing row is locked (SELECT ... FOR UPDATE) for the rest of the
+    transaction, and the insert runs in a savepoint so a writer that inserts
+    the same key first turns it into an update instead of an error.
+
+    Returns:
+      True if this call inserted the row.
+    """
+    column = getattr(model, conflict_column)
+    key = values[conflict_column]
+    if session.execute(select(column).where(column == key).with_for_update()).first() is None:
+        try:
+            with session.begin_nested():
+                session.execute(insert(model).values(**values))
+            return True
+        except IntegrityError:
+            pass
+    if update_values:
+        session.execute(update(model).where(column == key).values(**update_values))
+    return False
+
+def insert_if_absent(session, model, values: dict, conflict_column: str) -> bool:
+    """
+    Insert a row unless `conflict_column` already exists (INSERT ... ON CONFLICT DO NOTHING).
+
+    Returns:
+      True if this call inserted the row, False if another writer got there first.
+    """
+    statement = _dialect_insert(session, model)
+    if statement is None:
+        return _insert_or_update(session, model, values, conflict_column)
+    statement = statement.values(**values).on_conflict_do_nothing(index_elements=[conflict_column])
+    return session.execute(statement).rowcount == 1
+
+def upsert(session, model, values: dict, conflict_column: str):
+    """
+    Insert a row, or update it in place if `conflict_column` already exists.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE on Postgres and SQLite, so concurrent
+    writers for the same key never create duplicates; other databases fall
+    back to a locked select-then-insert/update.
+
+    Parameters:
+      session: The SQLAlchemy session to execute on.
+      model: The model class to write to.
+      values (dict): Column values for the row.
+      conflict_column (str): Name of the unique column identifying the row.
+    """
+    update_values = {key: value for key, value in values.items() if key != conflict_column}
+    statement = _dialect_insert(session, model)
+    if statement is None:
+        _insert_or_update(session, model, values, conflict_column, update_values)
+        return
+    statement = statement.values(**values).on_conflict_do_update(
+        index_elements=[conflict_column],
+        set_=update_values
+    )
+    session.execute(statement)
+
+def bulk_upsert(session, model, rows: list, conflict_column: str, update_columns=None):
+    """
+    Insert or update many rows in one INSERT ... ON CONFLICT DO UPDATE statement.
+
+    On databases without ON CONFLICT the rows are written one at a time.
+
+    Parameters:
+      session: The SQLAlchemy session to execute on.
+      model: The model class to write to.
+      rows (list): Dicts of column values, all with the same keys.
+      conflict_column (str): Name of the unique column identifying a row.
+      update_columns (list, optional): Columns to overwrite on conflict; defaults to every given column.
+    """
+    if not rows:
+        return
+    columns = update_columns or [key for key in rows[0] if key != conflict_column]
+    statement = _dialect_insert(session, model)
+    if statement is None:
+        for row in rows:
+            _insert_or_update(session, model, row, conflict_column, {column: row[column] for column in columns})
+        return
+    statement = statement.values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[conflict_column],
+        set_={column: statement.excluded[column] for column in columns}
+    )
+    session.execute(statement)
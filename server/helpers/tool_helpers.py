@@ -0,0 +1,140 @@
+# server/helpers/tool_helpers.py
+
+import hashlib
+import json
+import threading
+from config import Config
+
+# Registry of the tools the chat model may call.
+#
+# Each tool is declared once with its schema, the handler that runs it and a
+# trigger that decides whether a turn is about it. Only the tools a
+# conversation has touched are sent with a request, and a given set of tools
+# always serializes to the same bytes, so the provider's prompt prefix cache
+# keeps hitting while the set is unchanged.
+
+
+class UnknownToolError(KeyError):
+    """Raised when the model calls a tool that is not registered."""
+
+
+class Tool:
+    """A registered tool: its schema, handler and trigger."""
+
+    def __init__(self, name: str, schema: dict, handler=None, trigger=None):
+        self.name = name
+        self.schema = schema
+        self.handler = handler
+        # trigger(message) -> bool; None means the tool is offered on every turn
+        self.trigger = trigger
+
+
+_tools = {}
+_schema_lists = {}
+_lock = threading.Lock()
+
+
+def register_tool(name: str, description: str, properties: dict, required=(), handler=None, trigger=None) -> Tool:
+    """
+    Declare a tool.
+
+    Tools are sent in registration order. Registering a name again replaces
+    the tool.
+
+    :param handler: Called as handler(args, tool_call_id) and returns the JSON-serializable result
+    :param trigger: Called with a user message; True when the message calls for this tool
+    """
+    schema = {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {"type": "object", "properties": properties, "required": list(required)}
+        }
+    }
+    tool = Tool(name, schema, handler, trigger)
+    with _lock:
+        _tools[name] = tool
+        _schema_lists.clear()
+    return tool
+
+
+def tool_handler(name: str):
+    """Decorator registering the function as the handler of an already declared tool."""
+    def decorator(func):
+        if name not in _tools:
+            raise UnknownToolError(name)
+        _tools[name].handler = func
+        return func
+    return decorator
+
+
+def tool_names() -> list:
+    return list(_tools)
+
+
+def run_tool(name: str, args: dict, tool_call_id: str = None):
+    """Run a tool call through its registered handler."""
+    tool = _tools.get(name)
+    if tool is None or tool.handler is None:
+        raise UnknownToolError(name)
+    return tool.handler(args, tool_call_id)
+
+
+def tool_schemas(names=None) -> list:
+    """
+    Return the schemas of the named tools (all of them by default), in registration order.
+
+    The same selection always returns the same list, so requests built from it
+    are byte-identical.
+    """
+    key = tuple(name for name in _tools if names is None or name in names)
+    schemas = _schema_lists.get(key)
+    if schemas is None:
+        schemas = [_tools[name].schema for name in key]
+        with _lock:
+            _schema_lists[key] = schemas
+    return schemas
+
+
+def tool_manifest_digest(names=None) -> str:
+    """A short hash of the serialized schemas; it changes whenever a tool's schema does."""
+    payload = json.dumps(tool_schemas(names), separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def select_tools(conversation_history: list, user_message: str = None) -> list:
+    """
+    Return the names of the tools to offer on this turn.
+
+    A tool is offered once any user message in the conversation has triggered
+    it, or once the model has called it, so the set only grows during a
+    conversation and the cached prompt prefix survives from turn to turn.
+    With TOOL_SELECTION_ENABLED off every tool is offered.
+    """
+    if not Config.TOOL_SELECTION_ENABLED:
+        return tool_names()
+    selected = {name for name, tool in _tools.items() if tool.trigger is None}
+    pending = {name: tool for name, tool in _tools.items() if name not in selected}
+
+    for msg in conversation_history:
+        if not pending:
+            break
+        for call in msg.get("tool_calls") or []:
+            name = (call.get("function") or {}).get("name")
+            if pending.pop(name, None):
+                selected.add(name)
+
+    messages = [msg.get("content") for msg in conversation_history if msg.get("role") == "user"]
+    if user_message is not None and user_message not in messages[-1:]:
+        messages.append(user_message)
+    for message in messages:
+        if not pending:
+            break
+        if not isinstance(message, str):
+            continue
+        for name, tool in list(pending.items()):
+            if tool.trigger(message):
+                selected.add(name)
+                del pending[name]
+    return [name for name in _tools if name in selected]
@@ -0,0 +1,39 @@
+# server/helpers/transcript_helpers.py
+
+import json
+import zlib
+
+# Level 6 is zlib's default; higher levels barely shrink chat JSON further
+COMPRESSION_LEVEL = 6
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def compress_transcript(conversation_history: list) -> bytes:
+    """
+    Serialize a conversation as compact JSON and zlib-compress it.
+
+    System messages are dropped: they are the shared prompt and the current
+    time, not part of what the customer and assistant said.
+    """
+    messages = [msg for msg in conversation_history if msg.get("role") != "system"]
+    raw = json.dumps(messages, separators=(",", ":"), ensure_ascii=False, default=str)
+    return zlib.compress(raw.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_transcript(blob: bytes) -> list:
+    """Return the messages stored by `compress_transcript`."""
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def iter_decompressed(blob: bytes, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Yield the decompressed JSON in chunks, never inflating the whole transcript at once."""
+    decompressor = zlib.decompressobj()
+    view = memoryview(blob)
+    for start in range(0, len(view), chunk_size):
+        data = decompressor.decompress(view[start:start + chunk_size], chunk_size)
+        while data:
+            yield data
+            data = decompressor.decompress(decompressor.unconsumed_tail, chunk_size)
+    tail = decompressor.flush()
+    if tail:
+        yield tail
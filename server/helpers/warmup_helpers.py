@@ -0,0 +1,148 @@
+# server/helpers/warmup_helpers.py
+
+import importlib
+import threading
+import time
+from datetime import datetime, timezone
+from sqlalchemy import text
+from config import Config
+
+# Set once the warm-up has finished (successfully or not); read by /healthz/ready
+_ready = threading.Event()
+_state = {"started_at": None, "finished_at": None, "steps": {}}
+_lock = threading.Lock()
+
+
+def _warm_database(app):
+    """Open WARMUP_DB_CONNECTIONS connections on both engines so the pools start full."""
+    from database import db
+    from database.session import engine as session_engine
+
+    with app.app_context():
+        engines = [session_engine, db.engine]
+    for engine in engines:
+        connections = []
+        try:
+            for _ in range(Config.WARMUP_DB_CONNECTIONS):
+                connection = engine.connect()
+                connection.execute(text("SELECT 1"))
+                connections.append(connection)
+        finally:
+            # Returned to the pool, not closed
+            for connection in connections:
+                connection.close()
+
+
+def _warm_imports(app):
+    """Import modules that are otherwise imported on first use inside request handlers."""
+    for module in Config.WARMUP_IMPORTS:
+        importlib.import_module(module)
+
+
+def _warm_llm_clients(app):
+    """Open the HTTPS connection of each OpenAI client with a cheap model list call."""
+    from helpers import llm_utils
+    from services import chat_service
+
+    for client in {id(c): c for c in (llm_utils.client, chat_service.client)}.values():
+        try:
+            client.with_options(timeout=Config.WARMUP_HTTP_TIMEOUT, max_retries=0).models.list()
+        except Exception as e:
+            # A 401/404 still leaves a warm connection behind; only log it
+            print(f"DEBUG: LLM warm-up request failed: {e}")
+
+
+def _warm_inventory_snapshot(app):
+    """Map the published inventory snapshot, if any, before the first request needs it."""
+    from helpers.snapshot_helpers import get_inventory_snapshot
+
+    get_inventory_snapshot()
+
+
+def _warm_semantic_index(app):
+    """Fit the TF-IDF inventory index so the first semantic search does not pay for it."""
+    if not Config.SEMANTIC_SEARCH_ENABLED:
+        return
+    from database import db
+    from helpers.semantic_search_helpers import get_semantic_index
+
+    with app.app_context():
+        get_semantic_index(db.session)
+
+
+def _warm_intent_classifier(app):
+    """Load (or fit) the intent classifier before the first chat message."""
+    if not Config.INTENT_CLASSIFIER_ENABLED:
+        return
+    from helpers.intent_helpers import classify_intent
+
+    classify_intent("hello")
+
+
+def _warm_routing_classifier(app):
+    """Load the trained lead routing classifier before the first conversation ends."""
+    from helpers.routing_helpers import predict_routing, routing_classifier_ready
+
+    if not routing_classifier_ready():
+        return
+    predict_routing([[{"role": "user", "content": "hello"}]])
+
+
+WARMUP_STEPS = [
+    ("imports", _warm_imports),
+    ("database", _warm_database),
+    ("inventory_snapshot", _warm_inventory_snapshot),
+    ("semantic_index", _warm_semantic_index),
+    ("intent_classifier", _warm_intent_classifier),
+    ("routing_classifier", _warm_routing_classifier),
+    ("llm_clients", _warm_llm_clients),
+]
+
+
+def run_warmup(app):
+    """Run every warm-up step, recording its duration and any error."""
+    with _lock:
+        _state["started_at"] = datetime.now(timezone.utc).isoformat()
+    for name, step in WARMUP_STEPS:
+        if name == "llm_clients" and not Config.WARMUP_LLM:
+            continue
+        started = time.perf_counter()
+        error = None
+        try:
+            step(app)
+        except Exception as e:
+            error = str(e)
+            print(f"DEBUG: Warm-up step {name} failed: {e}")
+        with _lock:
+            _state["steps"][name] = {
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "error": error
+            }
+    with _lock:
+        _state["finished_at"] = datetime.now(timezone.utc).isoformat()
+    _ready.set()
+    print(f"DEBUG: Warm-up finished: {_state['steps']}")
+
+
+def start_warmup(app):
+    """
+    Warm the worker up in a background thread.
+
+    Called once per worker process (see gunicorn.conf.py). With warm-up
+    disabled the worker is reported ready immediately.
+    """
+    if not Config.WARMUP_ENABLED:
+        _ready.set()
+        return
+    threading.Thread(target=run_warmup, args=(app,), name="warmup", daemon=True).start()
+
+
+def warmup_status():
+    """Return whether the worker is ready, with per-step timings."""
+    with _lock:
+        return {
+            "ready": _ready.is_set(),
+            "started_at": _state["started_at"],
+            "finished_at": _state["finished_at"],
+            "steps": dict(_state["steps"])
+        }
@@ -0,0 +1,280 @@
+# server/loadtest/llm_standin.py
+#
+# A local stand-in for the OpenAI chat completions API, for offline load tests.
+#
+# It answers POST /v1/chat/completions from recorded cassettes and falls back to
+# scripted responses (including tool calls), after sleeping for a latency drawn
+# from a configurable distribution. Point the server at it with:
+#
+#   python -m loadtest.llm_standin --cassette loadtest/cassettes/recorded.jsonl --latency lognormal:0.7,0.35
+#   LLM_BACKEND=standin LLM_STANDIN_URL=http://127.0.0.1:8089/v1 gunicorn ... app:app
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from helpers.llm_backend import cassette_key
+
+# Used when no script file is given. Rules are checked in order against the
+# last message; the first match wins.
+DEFAULT_SCRIPT = [
+    {
+        # Conversation summaries (response_format json_object), e.g. for `flask backfill-summaries`
+        "json_object": True,
+        "content": json.dumps({
+            "sentiment": "positive",
+            "keywords": ["inventory", "test drive"],
+            "summary": "Customer asked about vehicles in stock and was offered a test drive.",
+            "department": "Sales",
+            "insights": {
+                "urgency": "medium",
+                "upsell_opportunity": False,
+                "customer_interest": "high",
+                "additional_notes": "Follow up about a test drive."
+            }
+        })
+    },
+    {
+        "after_tool": True,
+        "content": "Here are the vehicles I found in our inventory that match what you're looking for. Would you like to schedule a test drive?"
+    },
+    {
+        "match": r"\b(review|reviews|video|videos)\b",
+        "tool": "find_car_review_videos",
+        "arguments": {"car_make": "Nissan", "car_model": "Rogue", "year": 2024}
+    },
+    {
+        "match": r"\b(rogue|altima|sentra|kicks|pathfinder|frontier|murano|versa|inventory|in stock|available|under|price|suv|truck)\b",
+        "tool": "fetch_cars",
+        "arguments": {
+            "make": "Nissan", "model": "", "year": -1, "max_year": -1, "price": -1,
+            "max_price": -1, "mileage": -1, "color": "", "stock_number": "", "vin": ""
+        }
+    },
+    {
+        "match": r"\b(thanks|thank you|bye|goodbye)\b",
+        "content": "Thank you for chatting with me today. Have a great day!"
+    },
+    {
+        "content": "I'd be happy to help you find the perfect Nissan. What are you looking for in your next vehicle?"
+    }
+]
+
+
+def parse_distribution(spec: str):
+    """
+    Turn a distribution spec into a sampler returning a non-negative float.
+
+    Supported forms: "0.5" (fixed), "uniform:a,b", "normal:mu,sigma",
+    "lognormal:median,sigma" and "exp:mean".
+    """
+    kind, _, params = spec.partition(":")
+    if not params:
+        value = float(kind)
+        return lambda rng: value
+    values = [float(v) for v in params.split(",")]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1 / values[0])
+    raise ValueError(f"Unknown distribution '{spec}'")
+
+
+def estimate_tokens(value) -> int:
+    """Roughly estimate tokens as one per four characters of serialized JSON."""
+    return max(1, len(json.dumps(value)) // 4)
+
+
+class StandinBackend:
+    """Serves recorded or scripted chat completions with injected latency and token usage."""
+
+    def __init__(self, cassettes=(), script=None, latency="0", completion_tokens="uniform:40,300",
+                 replay_latency=False, strict=False, seed=None):
+        self.recorded = {}
+        for path in cassettes:
+            self.load_cassette(path)
+        self.script = script or DEFAULT_SCRIPT
+        self.latency = parse_distribution(latency)
+        self.completion_tokens = parse_distribution(completion_tokens)
+        self.replay_latency = replay_latency
+        self.strict = strict
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "replayed": 0, "scripted": 0, "misses": 0}
+
+    def load_cassette(self, path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.recorded.setdefault(entry["key"], []).append(entry)
+
+    def _sample(self, sampler):
+        with self._lock:
+            return sampler(self._rng)
+
+    def _next_recorded(self, key):
+        # Cycle through repeated recordings of the same request
+        with self._lock:
+            entries = self.recorded.get(key)
+            if not entries:
+                return None
+            entry = entries.pop(0)
+            entries.append(entry)
+            return entry
+
+    def _scripted_message(self, body):
+        # The time context message can follow the user message, so skip system messages
+        conversation = [msg for msg in body.get("messages", []) if msg.get("role") != "system"]
+        last = conversation[-1] if conversation else {}
+        tool_names = {t["function"]["name"] for t in body.get("tools", [])}
+        text = str(last.get("content") or "").lower()
+
+        json_object = (body.get("response_format") or {}).get("type") == "json_object"
+        for rule in self.script:
+            if rule.get("json_object", False) != json_object:
+                continue
+            if rule.get("after_tool") and last.get("role") != "tool":
+                continue
+            if "match" in rule and (last.get("role") != "user" or not re.search(rule["match"], text)):
+                continue
+            if "tool" in rule:
+                if rule["tool"] not in tool_names:
+                    continue
+                return {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [{
+                        "id": f"call_{uuid.uuid4().hex[:24]}",
+                        "type": "function",
+                        "function": {"name": rule["tool"], "arguments": json.dumps(rule.get("arguments", {}))}
+                    }]
+                }, "tool_calls"
+            return {"role": "assistant", "content": rule.get("content", "")}, "stop"
+        return {"role": "assistant", "content": ""}, "stop"
+
+    def complete(self, body: dict):
+        """
+        Build the response for one chat completion request.
+
+        :return: A `(status_code, response_body)` tuple
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+
+        entry = self._next_recorded(cassette_key(body))
+        if entry is not None:
+            with self._lock:
+                self.stats["replayed"] += 1
+            delay = entry.get("elapsed_ms", 0) / 1000 if self.replay_latency else self._sample(self.latency)
+            time.sleep(delay)
+            return entry.get("status_code", 200), entry["response"]
+
+        if self.strict:
+            with self._lock:
+                self.stats["misses"] += 1
+            return 404, {"error": {"message": "No recorded interaction matches this request", "type": "standin_miss"}}
+
+        with self._lock:
+            self.stats["scripted"] += 1
+        time.sleep(self._sample(self.latency))
+        message, finish_reason = self._scripted_message(body)
+        prompt_tokens = estimate_tokens(body.get("messages", [])) + estimate_tokens(body.get("tools", []))
+        completion_tokens = int(self._sample(self.completion_tokens))
+        return 200, {
+            "id": f"chatcmpl-standin-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "o3-mini-2025-01-31"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+
+def make_handler(backend: StandinBackend):
+    class StandinHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status_code, payload):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                return self._send_json(200, backend.stats)
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                return self._send_json(404, {"error": {"message": "Not found"}})
+            status_code, payload = backend.complete(body)
+            self._send_json(status_code, payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandinHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI chat completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--cassette", action="append", default=[], help="JSON Lines cassette to replay (repeatable)")
+    parser.add_argument("--script", help="JSON file with scripted response rules (defaults to a built-in script)")
+    parser.add_argument("--latency", default="0", help='Latency in seconds, e.g. "0.8", "uniform:0.5,2", "lognormal:0.7,0.35"')
+    parser.add_argument("--completion-tokens", default="uniform:40,300", help="Distribution of completion tokens for scripted responses")
+    parser.add_argument("--replay-latency", action="store_true", help="Sleep for the recorded latency when replaying cassettes")
+    parser.add_argument("--strict", action="store_true", help="Return 404 instead of a scripted response on cassette misses")
+    parser.add_argument("--seed", type=int, help="Random seed for latency and token sampling")
+    args = parser.parse_args(argv)
+
+    script = None
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = json.load(f)
+
+    backend = StandinBackend(
+        cassettes=args.cassette,
+        script=script,
+        latency=args.latency,
+        completion_tokens=args.completion_tokens,
+        replay_latency=args.replay_latency,
+        strict=args.strict,
+        seed=args.seed
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(backend))
+    print(f"LLM stand-in listening on http://{args.host}:{args.port}/v1 "
+          f"({sum(len(v) for v in backend.recorded.values())} recorded interactions)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+# server/loadtest/replay_driver.py
+#
+# Replays multi-turn conversations against a running server, the same way the
+# chat client does (/api/chat, then /api/tool-call-result when a tool call is
+# detected), and reports turn latency percentiles.
+#
+#   python -m loadtest.replay_driver --base-url http://127.0.0.1:5000/api \
+#       --conversations loadtest/conversations.json --concurrency 20 --repeat 5
+
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import httpx
+import pytz
+
+DEFAULT_CONVERSATIONS = "loadtest/conversations.json"
+
+
+def percentile(sorted_values, pct):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies_ms):
+    values = sorted(latencies_ms)
+    return {
+        "count": len(values),
+        "mean_ms": sum(values) / len(values) if values else 0.0,
+        "p50_ms": percentile(values, 50),
+        "p90_ms": percentile(values, 90),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": values[-1] if values else 0.0,
+    }
+
+
+class ReplayStats:
+    """Thread-safe collection of per-turn measurements."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = []
+        self.chat_calls = []
+        self.tool_calls = []
+        self.errors = []
+
+    def add(self, bucket, value):
+        with self._lock:
+            getattr(self, bucket).append(value)
+
+
+def time_context():
+    current_time = datetime.now(pytz.timezone("US/Eastern"))
+    return {"role": "system", "content": f"Current time: {current_time.strftime('%Y-%m-%d %H:%M:%S EST')}"}
+
+
+def replay_conversation(client: httpx.Client, base_url: str, messages: list, stats: ReplayStats):
+    """Send each user message of one conversation in order, carrying the history forward."""
+    history = []
+    for user_message in messages:
+        turn_started = time.perf_counter()
+        key = uuid.uuid4().hex
+        payload = {
+            "message": user_message,
+            "conversation_history": history + [time_context(), {"role": "user", "content": user_message}]
+        }
+        try:
+            started = time.perf_counter()
+            response = client.post(f"{base_url}/chat", json=payload, headers={"Idempotency-Key": f"chat-{key}"})
+            stats.add("chat_calls", (time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+            data = response.json()
+            history = data["conversation_history"]
+
+            if data.get("tool_call_detected"):
+                started = time.perf_counter()
+                response = client.post(
+                    f"{base_url}/tool-call-result",
+                    json={"conversation_history": history},
+                    headers={"Idempotency-Key": f"tool-{key}"}
+                )
+                stats.add("tool_calls", (time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+                history = response.json()["final_conversation_history"]
+        except Exception as e:
+            stats.add("errors", f"{type(e).__name__}: {e}")
+            return
+        stats.add("turns", (time.perf_counter() - turn_started) * 1000)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay conversations concurrently and report turn latency.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000/api")
+    parser.add_argument("--conversations", default=DEFAULT_CONVERSATIONS, help="JSON file with a list of conversations (lists of user messages)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=1, help="How many times to replay the whole conversation set")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Optional path to write the JSON report")
+    args = parser.parse_args(argv)
+
+    with open(args.conversations, encoding="utf-8") as f:
+        conversations = json.load(f) * args.repeat
+
+    stats = ReplayStats()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    started = time.perf_counter()
+    with httpx.Client(timeout=args.timeout, limits=limits) as client:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for messages in conversations:
+                pool.submit(replay_conversation, client, args.base_url.rstrip("/"), messages, stats)
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "conversations": len(conversations),
+        "concurrency": args.concurrency,
+        "elapsed_s": elapsed,
+        "turns_per_sec": len(stats.turns) / elapsed if elapsed else 0.0,
+        "turn_latency": summarize(stats.turns),
+        "chat_latency": summarize(stats.chat_calls),
+        "tool_call_latency": summarize(stats.tool_calls),
+        "errors": len(stats.errors),
+        "error_samples": stats.errors[:10],
+    }
+
+    print(f"Replayed {report['conversations']} conversations at concurrency {args.concurrency} in {elapsed:.1f}s "
+          f"({report['turns_per_sec']:.2f} turns/s, {report['errors']} errors)")
+    for label in ("turn_latency", "chat_latency", "tool_call_latency"):
+        s = report[label]
+        print(f"  {label:<18} n={s['count']:<6} p50={s['p50_ms']:8.1f}ms p90={s['p90_ms']:8.1f}ms "
+              f"p95={s['p95_ms']:8.1f}ms p99={s['p99_ms']:8.1f}ms max={s['max_ms']:8.1f}ms")
+    for error in report["error_samples"]:
+        print(f"  error: {error}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,12 @@
 # This file defines the SQLAlchemy models for the car inventory system.
 # server/models/sql_models.py
 from datetime import datetime
+from sqlalchemy.dialects import postgresql
 from database import db,bcrypt  
 
+# Native string arrays on Postgres, JSON arrays on other databases (e.g. SQLite for benchmarks)
+StringArray = db.JSON().with_variant(postgresql.ARRAY(db.String), "postgresql")
+
 # Define the CarInventory model
 class CarInventory(db.Model):
     __tablename__ = "car_inventory"
@@ -18,10 +22,28 @@ class CarInventory(db.Model):
     color = db.Column(db.String(50), nullable=True)
     description = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    deleted_at = db.Column(db.DateTime, nullable=True)  # Tombstone for delta sync; null while in stock
+    change_version = db.Column(db.Integer, nullable=False, default=0, index=True)  # Inventory version of the last change
 
     def __repr__(self):
         return f"<CarInventory {self.stock_number} - {self.make} {self.model}>"
 
+# Define the InventoryVersion model
+class InventoryVersion(db.Model):
+    __tablename__ = "inventory_versions"
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, unique=True, nullable=False)
+    source = db.Column(db.String(255), nullable=True)  # Feed file or endpoint that produced this version
+    inserted = db.Column(db.Integer, nullable=False, default=0)
+    updated = db.Column(db.Integer, nullable=False, default=0)
+    deleted = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<InventoryVersion {self.version}>"
+
 # Define the AutoLead model
 class AutoLead(db.Model):
     __tablename__ = "auto_leads"
@@ -39,13 +61,25 @@ class AutoLead(db.Model):
 # Define the AutoLeadInteractionDetails model
 class AutoLeadInteractionDetails(db.Model):
     __tablename__ = "auto_leads_interaction_details"
+    __table_args__ = (
+        # Keyword facets and containment filters (GIN on Postgres, a plain index elsewhere)
+        db.Index("ix_lead_interactions_keywords", "product_keywords", postgresql_using="gin"),
+        # Date-bucketed facets filtered by sentiment and priority
+        db.Index("ix_lead_interactions_created_facets", "created_at", "sentiment", "priority_flag"),
+        # Keyset pagination for the lead listing, unfiltered and filtered by priority or sentiment
+        db.Index("ix_lead_interactions_created_id", "created_at", "interaction_id"),
+        db.Index("ix_lead_interactions_priority_created_id", "priority_flag", "created_at", "interaction_id"),
+        db.Index("ix_lead_interactions_sentiment_created_id", "sentiment", "created_at", "interaction_id"),
+    )
 
     interaction_id = db.Column(db.Integer, primary_key=True)
     lead_id = db.Column(db.Integer, db.ForeignKey('auto_leads.id', ondelete='CASCADE'), nullable=True)
-    conversation_transcript = db.Column(db.Text, nullable=True)
+    conversation_id = db.Column(db.String(100), nullable=True, unique=True, index=True)  # One interaction per conversation
+    # zlib-compressed compact JSON (helpers/transcript_helpers.py); deferred so row fetches skip it
+    conversation_transcript = db.deferred(db.Column(db.LargeBinary, nullable=True))
     conversation_summary = db.Column(db.Text, nullable=True)
     sentiment = db.Column(db.String(20), nullable=True)
-    product_keywords = db.Column(db.ARRAY(db.String), nullable=True)
+    product_keywords = db.Column(StringArray, nullable=True)
     priority_flag = db.Column(db.Boolean, default=False)
     next_steps_recommendation = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -64,6 +98,7 @@ class ConversationSummary(db.Model):
     summary = db.Column(db.Text, nullable=False)
     department = db.Column(db.String(50), nullable=False)  # Sales, Service, Management, etc.
     insights = db.Column(db.JSON, nullable=True)  # Store additional insights as JSON
+    summarized_messages = db.Column(db.Integer, nullable=False, default=0)  # User/assistant messages covered by the summary
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -0,0 +1,41 @@
+from flask import Blueprint, request, jsonify
+from helpers.auth_helpers import require_admin_token
+from services.memory_service import start_tracing, stop_tracing, take_snapshot
+
+admin_bp = Blueprint("admin", __name__)
+
+@admin_bp.route("/admin/memory/start", methods=["POST"])
+@require_admin_token
+def memory_start():
+    """Start tracemalloc in this worker."""
+    try:
+        data = request.get_json(silent=True) or {}
+        result, status_code = start_tracing(int(data.get("frames", 10)))
+        return jsonify(result), status_code
+    except Exception as e:
+        print(f"Error in memory_start endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route("/admin/memory/snapshot", methods=["GET"])
+@require_admin_token
+def memory_snapshot():
+    """Take a tracemalloc snapshot and diff it against the previous one."""
+    try:
+        limit = request.args.get("limit", 25, type=int)
+        key_type = request.args.get("key_type", "lineno")
+        result, status_code = take_snapshot(limit, key_type)
+        return jsonify(result), status_code
+    except Exception as e:
+        print(f"Error in memory_snapshot endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route("/admin/memory/stop", methods=["POST"])
+@require_admin_token
+def memory_stop():
+    """Stop tracemalloc in this worker."""
+    try:
+        result, status_code = stop_tracing()
+        return jsonify(result), status_code
+    except Exception as e:
+        print(f"Error in memory_stop endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
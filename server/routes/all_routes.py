@@ -2,6 +2,10 @@ from flask import Blueprint
 from routes.chat_routes import chat_bp
 from routes.inventory_routes import inventory_bp
 from routes.analytics_routes import analytics_bp
+from routes.lead_routes import lead_bp
+from routes.admin_routes import admin_bp
+from routes.health_routes import health_bp
+from config import Config
 
 # Create a blueprint for all routes
 all_routes_bp = Blueprint("all_routes", __name__)
@@ -12,6 +16,14 @@ def register_routes(app):
     app.register_blueprint(chat_bp, url_prefix="/api")
     app.register_blueprint(inventory_bp, url_prefix="/api")
     app.register_blueprint(analytics_bp, url_prefix="/api")
+    app.register_blueprint(lead_bp, url_prefix="/api")
+
+    # Liveness and readiness probes live outside /api
+    app.register_blueprint(health_bp)
+
+    # Memory snapshot endpoints are only exposed when explicitly enabled
+    if Config.MEMORY_PROFILING_ENABLED:
+        app.register_blueprint(admin_bp, url_prefix="/api")
     
     # You can add more blueprints here as needed
     
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify, send_file
-from helpers.cors_helpers import pre_authorized_cors_preflight
 from services.analytics_service import store_request_analytics
 from services.analytics_helpers import get_analytics_summary
+from services.lead_analytics_service import get_lead_facets
 from models.sql_models import AnalyticsData
 from database.session import ScopedSession
 import csv
@@ -10,7 +10,6 @@ from datetime import datetime
 
 analytics_bp = Blueprint("analytics", __name__)
 
-@pre_authorized_cors_preflight
 @analytics_bp.route("/analytics/store", methods=["POST"])
 def store_analytics():
     """Store analytics data for a request."""
@@ -43,7 +42,6 @@ def store_analytics():
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
-@pre_authorized_cors_preflight
 @analytics_bp.route("/analytics/summary", methods=["GET"])
 def get_summary():
     """Get analytics summary."""
@@ -58,7 +56,34 @@ def get_summary():
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
-@pre_authorized_cors_preflight
+@analytics_bp.route("/analytics/leads", methods=["GET"])
+def get_lead_analytics():
+    """Get faceted lead interaction counts (sentiment, priority, keywords, date)."""
+    try:
+        def parse_date(name):
+            value = request.args.get(name)
+            return datetime.fromisoformat(value) if value else None
+
+        try:
+            start, end = parse_date("start"), parse_date("end")
+        except ValueError:
+            return jsonify({"error": "start and end must be ISO 8601 dates"}), 400
+
+        result, status_code = get_lead_facets(
+            start=start,
+            end=end,
+            keyword=request.args.get("keyword") or None,
+            bucket=request.args.get("bucket", "day"),
+            top=request.args.get("top", 20, type=int)
+        )
+        return jsonify(result), status_code
+
+    except Exception as e:
+        print("DEBUG: Exception encountered in get lead analytics:", e)
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
 @analytics_bp.route("/analytics/reset", methods=["POST"])
 def reset_analytics():
     """Reset all analytics data."""
@@ -81,7 +106,6 @@ def reset_analytics():
         ScopedSession.rollback()
         return jsonify({"error": str(e)}), 500
 
-@pre_authorized_cors_preflight
 @analytics_bp.route("/analytics/download", methods=["GET"])
 def download_report():
     """Generate and download analytics report."""
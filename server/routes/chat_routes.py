@@ -1,10 +1,11 @@
 from flask import Blueprint, request, jsonify
-from helpers.cors_helpers import pre_authorized_cors_preflight
 from services.chat_service import process_chat, process_tool_call, generate_summary, get_summary
+from helpers.idempotency_helpers import (
+    IdempotencyKeyReused, idempotency_cache, build_idempotency_key, request_fingerprint
+)
 
 chat_bp = Blueprint("chat", __name__)
 
-@pre_authorized_cors_preflight
 @chat_bp.route("/chat", methods=["POST"])
 def chat():
     """Handle chat messages from users."""
@@ -21,9 +22,17 @@ def chat():
         
         print("DEBUG: Initial conversation history:", conversation_history)
 
-        # Process the chat message
-        result, status_code = process_chat(user_message, conversation_history)
-        return jsonify(result), status_code
+        # Process the chat message once per duplicate submission
+        idempotency_key = build_idempotency_key("chat", request, data)
+        try:
+            (result, status_code), replayed = idempotency_cache.run(
+                idempotency_key, process_chat, user_message, conversation_history, fingerprint=request_fingerprint(data)
+            )
+        except IdempotencyKeyReused:
+            return jsonify({"error": "Idempotency-Key was already used for a different request"}), 422
+        response = jsonify(result)
+        response.headers["Idempotent-Replayed"] = "true" if replayed else "false"
+        return response, status_code
 
     except Exception as e:
         print("DEBUG: Exception encountered:", e)
@@ -31,7 +40,6 @@ def chat():
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
-@pre_authorized_cors_preflight
 @chat_bp.route("/tool-call-result", methods=["POST"])
 def tool_call_result():
     """Handle tool call results."""
@@ -45,9 +53,17 @@ def tool_call_result():
         # Get the conversation history
         conversation_history = data.get("conversation_history", [])
         
-        # Process the tool call
-        result, status_code = process_tool_call(conversation_history)
-        return jsonify(result), status_code
+        # Process the tool call once per duplicate submission
+        idempotency_key = build_idempotency_key("tool-call-result", request, data)
+        try:
+            (result, status_code), replayed = idempotency_cache.run(
+                idempotency_key, process_tool_call, conversation_history, fingerprint=request_fingerprint(data)
+            )
+        except IdempotencyKeyReused:
+            return jsonify({"error": "Idempotency-Key was already used for a different request"}), 422
+        response = jsonify(result)
+        response.headers["Idempotent-Replayed"] = "true" if replayed else "false"
+        return response, status_code
 
     except Exception as e:
         print("DEBUG: Exception encountered in tool call result:", e)
@@ -55,7 +71,6 @@ def tool_call_result():
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
-@pre_authorized_cors_preflight
 @chat_bp.route("/generate-summary", methods=["POST"])
 def generate_summary_endpoint():
     """Generate a summary for a conversation."""
@@ -80,7 +95,6 @@ def generate_summary_endpoint():
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
-@pre_authorized_cors_preflight
 @chat_bp.route("/get-summary/<conversation_id>", methods=["GET"])
 def get_summary_endpoint(conversation_id):
     """Get a summary for a conversation by ID."""
@@ -0,0 +1,15 @@
+from flask import Blueprint, jsonify
+from helpers.warmup_helpers import warmup_status
+
+health_bp = Blueprint("health", __name__)
+
+@health_bp.route("/healthz", methods=["GET"])
+def liveness():
+    """Report that the worker process is up."""
+    return jsonify({"status": "ok"}), 200
+
+@health_bp.route("/healthz/ready", methods=["GET"])
+def readiness():
+    """Report ready (200) only once this worker's warm-up has finished, 503 until then."""
+    status = warmup_status()
+    return jsonify(status), 200 if status["ready"] else 503
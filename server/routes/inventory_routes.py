@@ -1,10 +1,11 @@
 from flask import Blueprint, request, jsonify
-from helpers.cors_helpers import pre_authorized_cors_preflight
-from services.inventory_service import get_all_inventory, search_cars, get_car_review_videos
+import io
+from helpers.auth_helpers import require_admin_token
+from services.inventory_service import get_all_inventory, get_inventory_changes, search_cars, semantic_search, get_car_review_videos
+from services.inventory_ingest_service import ingest_inventory_feed, detect_feed_format
 
 inventory_bp = Blueprint("inventory", __name__)
 
-@pre_authorized_cors_preflight
 @inventory_bp.route("/inventory", methods=["GET"])
 def get_inventory():
     """Get all cars from the inventory."""
@@ -16,7 +17,21 @@ def get_inventory():
         print(f"Error in get_inventory endpoint: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
-@pre_authorized_cors_preflight
+@inventory_bp.route("/inventory/changes", methods=["GET"])
+def get_inventory_changes_endpoint():
+    """
+    Get inventory changes after the `since` cursor.
+
+    Only changes made by feed ingestion are tracked; see get_inventory_changes.
+    """
+    try:
+        since = request.args.get("since", type=int)
+        result, status_code = get_inventory_changes(since)
+        return jsonify(result), status_code
+    except Exception as e:
+        print(f"Error in get_inventory_changes endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @inventory_bp.route("/search-cars", methods=["POST"])
 def search_cars_endpoint():
     """Search for cars based on filter criteria."""
@@ -33,7 +48,28 @@ def search_cars_endpoint():
         print(f"Error in search_cars endpoint: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
-@pre_authorized_cors_preflight
+@inventory_bp.route("/inventory/semantic-search", methods=["GET"])
+def semantic_search_endpoint():
+    """
+    Rank cars by how well their description matches a free-text query.
+
+    Query params: q (required), limit, max_price, year (minimum), mileage (maximum), make.
+    """
+    try:
+        search_args = {
+            "query": request.args.get("q", ""),
+            "limit": request.args.get("limit", 5, type=int),
+            "max_price": request.args.get("max_price", type=float),
+            "year": request.args.get("year", type=int),
+            "mileage": request.args.get("mileage", type=int),
+            "make": request.args.get("make", "")
+        }
+        result, status_code = semantic_search(search_args)
+        return jsonify(result), status_code
+    except Exception as e:
+        print(f"Error in semantic_search endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @inventory_bp.route("/car-review-videos", methods=["POST"])
 def car_review_videos():
     """Search for car review videos on YouTube."""
@@ -52,4 +88,37 @@ def car_review_videos():
         return jsonify(result), status_code
     except Exception as e:
         print(f"Error in car_review_videos endpoint: {str(e)}")
-        return jsonify({"videos": [], "error": str(e)}), 500 
\ No newline at end of file
+        return jsonify({"videos": [], "error": str(e)}), 500 
+
+@inventory_bp.route("/inventory/ingest", methods=["POST"])
+@require_admin_token
+def ingest_inventory():
+    """
+    Load a dealer feed (CSV, JSON array or JSON Lines) into the inventory.
+
+    Accepts a multipart upload in `file` or the raw feed as the request body.
+    Query params: format, delete_missing (default true), dry_run (default false).
+    """
+    try:
+        upload = request.files.get("file")
+        if upload:
+            raw_stream = upload.stream
+            feed_format = request.args.get("format") or detect_feed_format(upload.filename, upload.mimetype)
+            source = upload.filename
+        else:
+            raw_stream = request.stream
+            feed_format = request.args.get("format") or detect_feed_format(content_type=request.content_type)
+            source = "api"
+
+        text_stream = io.TextIOWrapper(raw_stream, encoding="utf-8-sig", newline="")
+        result, status_code = ingest_inventory_feed(
+            text_stream,
+            feed_format,
+            source=source,
+            delete_missing=request.args.get("delete_missing", "true").lower() == "true",
+            dry_run=request.args.get("dry_run", "false").lower() == "true"
+        )
+        return jsonify(result), status_code
+    except Exception as e:
+        print(f"Error in ingest_inventory endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
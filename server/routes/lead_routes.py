@@ -0,0 +1,66 @@
+from flask import Blueprint, Response, request, jsonify
+from helpers.auth_helpers import require_admin_token
+from services.lead_service import list_lead_interactions, parse_fields, get_interaction_transcript
+from helpers.transcript_helpers import iter_decompressed
+
+lead_bp = Blueprint("leads", __name__)
+
+PRIORITY_VALUES = {"true": True, "high": True, "false": False, "normal": False}
+
+@lead_bp.route("/leads/interactions", methods=["GET"])
+@require_admin_token
+def list_interactions():
+    """
+    List lead interactions newest first with keyset pagination.
+
+    Query params: cursor (next_cursor from the previous page), limit,
+    priority (high/normal), sentiment, and fields (comma-separated).
+    Transcripts are not listed; see /leads/interactions/<id>/transcript.
+    """
+    try:
+        priority = request.args.get("priority")
+        if priority is not None and priority.lower() not in PRIORITY_VALUES:
+            return jsonify({"error": "priority must be high or normal"}), 400
+
+        try:
+            fields = parse_fields(request.args.get("fields"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        result, status_code = list_lead_interactions(
+            cursor=request.args.get("cursor") or None,
+            limit=request.args.get("limit", type=int),
+            priority=PRIORITY_VALUES[priority.lower()] if priority is not None else None,
+            sentiment=request.args.get("sentiment") or None,
+            fields=fields
+        )
+        return jsonify(result), status_code
+    except Exception as e:
+        print(f"Error in list_interactions endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@lead_bp.route("/leads/interactions/<int:interaction_id>/transcript", methods=["GET"])
+@require_admin_token
+def get_transcript(interaction_id):
+    """
+    Stream the full transcript of one interaction as a JSON array of messages.
+
+    Transcripts are stored zlib-compressed, which is exactly HTTP's "deflate"
+    coding, so clients that accept it get the stored bytes as-is. Everyone
+    else gets the JSON decompressed chunk by chunk.
+    """
+    try:
+        result, status_code = get_interaction_transcript(interaction_id)
+        if status_code != 200:
+            return jsonify(result), status_code
+
+        if request.accept_encodings["deflate"]:
+            response = Response(result, mimetype="application/json")
+            response.headers["Content-Encoding"] = "deflate"
+        else:
+            response = Response(iter_decompressed(result), mimetype="application/json")
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+    except Exception as e:
+        print(f"Error in get_transcript endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
@@ -1,108 +1,134 @@
 # server/services/chat_service.py
 
 import os
+import re
 import json
-from openai import OpenAI
+from openai import NOT_GIVEN
+from helpers.llm_backend import get_llm_client
 from datetime import datetime
 import pytz
 from helpers.llm_utils import (
     fetch_cars, 
     generate_conversation_summary, 
+    ensure_conversation_summary, 
     get_conversation_summary, 
     detect_end_of_conversation, 
-    find_car_review_videos
+    ensure_conversation_id,
+    llm_messages,
+    find_car_review_videos,
+    semantic_search_cars
 )
 from helpers.token_utils import calculate_token_cost
+from helpers.cache_helpers import MISSING
+from helpers.prefetch_helpers import (
+    start_inventory_prefetch, take_prefetched_result, direct_lookup_tool_call, extract_inventory_filters
+)
+from helpers.tool_helpers import UnknownToolError, register_tool, run_tool, select_tools, tool_handler, tool_schemas
+from helpers.intent_helpers import templated_answer
+from helpers.answer_cache_helpers import get_cached_answer, cache_first_turn
 from services.analytics_service import store_request_analytics
+from config import Config
+from database import db
+
+# Initialize the OpenAI client for the configured backend (see helpers/llm_backend.py)
+client = get_llm_client()
+
+# Model name recorded in analytics for messages answered by the intent classifier
+INTENT_ANALYTICS_MODEL = "local-intent-classifier"
+# ... and for first-turn questions answered from the answer cache
+ANSWER_CACHE_ANALYTICS_MODEL = "semantic-answer-cache"
+
+# Turns that mention cars, prices or anything else fetch_cars filters on
+INVENTORY_PATTERN = re.compile(
+    r"\b(cars?|vehicles?|suvs?|trucks?|sedans?|coupes?|vans?|minivans?|hatchbacks?|crossovers?|evs?|electric|hybrids?|"
+    r"awd|4wd|4x4|stock|inventory|available|availability|prices?|pricing|cost|budget|cheap\w*|afford\w*|miles|mileage|"
+    r"mpg|used|new|certified|cpo|lease|buy|purchase|trade|colou?rs?|vin|seats?|seating|family|commute|towing|"
+    r"do you have|looking for|show me)\b|\$\s*\d|\b\d+\s*k\b",
+    re.IGNORECASE
+)
+REVIEW_PATTERN = re.compile(
+    r"\b(reviews?|reviewed|videos?|youtube|watch|reliab\w*|ratings?|opinions?|pros and cons|worth (?:it|buying)|"
+    r"compar\w*|versus|vs|(?:thoughts|feedback) on|(?:people|owners|reviewers|critics|experts) (?:say|think|like)|"
+    r"what do (?:you|people|owners|reviewers|critics|experts) (?:say|think))\b",
+    re.IGNORECASE
+)
 
-# Initialize the OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+def mentions_inventory(message):
+    """True if a message is about the cars in stock (used to gate semantic_search_cars)."""
+    return bool(INVENTORY_PATTERN.search(message)) or bool(extract_inventory_filters(message))
 
-# Define the tools for the OpenAI API
-tools = [
+def mentions_reviews(message):
+    """True if a message asks for reviews or videos of a car."""
+    return bool(REVIEW_PATTERN.search(message))
+
+# Tools for the OpenAI API; only the ones a conversation needs are sent (see helpers/tool_helpers.py).
+# fetch_cars has no trigger: missing it on an inventory question costs a wrong answer,
+# so it is offered on every turn and only the optional tools are gated.
+register_tool(
+    "fetch_cars",
+    "Search the car inventory. Use -1 for an unused numeric filter and \"\" for an unused text filter.",
     {
-        "type": "function",
-        "function": {
-            "name": "fetch_cars",
-            "description": (
-                "Fetch car inventory details based on filter criteria. Users can provide filters "
-                "such as make, model, model year range, price range, mileage, color, stock number, or VIN for a precise lookup. "
-                "If a parameter is not applicable, please provide -1 for numeric values or an empty string for text values."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "make": {
-                        "type": "string",
-                        "description": "Car manufacturer (e.g., Toyota, Ford)"
-                    },
-                    "model": {
-                        "type": "string",
-                        "description": "Car model (e.g., Camry, Mustang)"
-                    },
-                    "year": {
-                        "type": "integer",
-                        "description": "Minimum car model year. Use -1 to indicate no minimum."
-                    },
-                    "max_year": {
-                        "type": "integer",
-                        "description": "Maximum car model year. Use -1 to indicate no maximum."
-                    },
-                    "price": {
-                        "type": "number",
-                        "description": "Minimum price. Use -1 to indicate no minimum."
-                    },
-                    "max_price": {
-                        "type": "number",
-                        "description": "Maximum price. Use -1 to indicate no maximum."
-                    },
-                    "mileage": {
-                        "type": "integer",
-                        "description": "Maximum mileage. Use -1 to indicate no maximum."
-                    },
-                    "color": {
-                        "type": "string",
-                        "description": "Car color. Use empty string to indicate no color filter."
-                    },
-                    "stock_number": {
-                        "type": "string",
-                        "description": "Exact stock number. Use empty string to indicate no stock number filter."
-                    },
-                    "vin": {
-                        "type": "string",
-                        "description": "Exact VIN. Use empty string to indicate no VIN filter."
-                    }
-                },
-                "required": ["make", "model"]
-            }
-        }
+        "make": {"type": "string", "description": "Manufacturer, e.g. Nissan"},
+        "model": {"type": "string", "description": "Model, e.g. Rogue"},
+        "year": {"type": "integer", "description": "Min model year"},
+        "max_year": {"type": "integer", "description": "Max model year"},
+        "price": {"type": "number", "description": "Min price"},
+        "max_price": {"type": "number", "description": "Max price"},
+        "mileage": {"type": "integer", "description": "Max mileage"},
+        "color": {"type": "string", "description": "Color"},
+        "stock_number": {"type": "string", "description": "Exact stock number"},
+        "vin": {"type": "string", "description": "Exact VIN"}
     },
+    required=["make", "model"]
+)
+
+register_tool(
+    "find_car_review_videos",
+    "Find YouTube review videos for a car.",
     {
-        "type": "function",
-        "function": {
-            "name": "find_car_review_videos",
-            "description": "Search for car review videos on YouTube based on make, model, and optionally year.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "car_make": {
-                        "type": "string",
-                        "description": "The make of the car (e.g., Toyota, Ford)"
-                    },
-                    "car_model": {
-                        "type": "string",
-                        "description": "The model of the car (e.g., Camry, Mustang)"
-                    },
-                    "year": {
-                        "type": "integer",
-                        "description": "Optional year of the car model"
-                    }
-                },
-                "required": ["car_make", "car_model"]
-            }
-        }
-    }
-]
+        "car_make": {"type": "string", "description": "Make, e.g. Nissan"},
+        "car_model": {"type": "string", "description": "Model, e.g. Rogue"},
+        "year": {"type": "integer", "description": "Model year (optional)"}
+    },
+    required=["car_make", "car_model"],
+    trigger=mentions_reviews
+)
+
+# Free-text inventory search; offered only when the TF-IDF index is enabled
+if Config.SEMANTIC_SEARCH_ENABLED:
+    register_tool(
+        "semantic_search_cars",
+        "Search the inventory by meaning when the customer describes a need instead of a make or model, "
+        "e.g. 'roomy family SUV with good mpg'. Use -1 for an unused numeric filter.",
+        {
+            "query": {"type": "string", "description": "The customer's description"},
+            "limit": {"type": "integer", "description": "Cars to return (default 5)"},
+            "max_price": {"type": "number", "description": "Max price"},
+            "year": {"type": "integer", "description": "Min model year"},
+            "mileage": {"type": "integer", "description": "Max mileage"}
+        },
+        required=["query"],
+        trigger=mentions_inventory
+    )
+
+@tool_handler("fetch_cars")
+def run_fetch_cars(args, tool_call_id):
+    # Answered during /chat when the speculative lookup matched the arguments
+    result = take_prefetched_result(tool_call_id)
+    return fetch_cars(args) if result is MISSING else result
+
+@tool_handler("find_car_review_videos")
+def run_find_car_review_videos(args, tool_call_id):
+    result = find_car_review_videos(args.get("car_make"), args.get("car_model"), args.get("year"))
+    # If there's an error in the result, include it in the tool response
+    if "error" in result:
+        print("DEBUG: Error in find_car_review_videos result:", result["error"])
+    return result
+
+if Config.SEMANTIC_SEARCH_ENABLED:
+    @tool_handler("semantic_search_cars")
+    def run_semantic_search_cars(args, tool_call_id):
+        return semantic_search_cars(args)
 
 def get_system_message():
     """Return the system message for the chat."""
@@ -124,6 +150,7 @@ def get_system_message():
             - Help customers find suitable Nissan models within their budget.
             - Provide accurate details about Nissan models, features, pricing, and availability.
             - Use the `fetch_cars` function for up-to-date inventory information. Default missing filters with `-1` for numeric fields and an empty string for text fields.
+            - When a customer describes what they need instead of naming a model, use the `semantic_search_cars` function if it is available.
 
             - **Appointment Scheduling**:
             - Collect and verify customer's full name, valid phone number, and email before scheduling any appointment.
@@ -212,11 +239,74 @@ def process_chat(user_message, conversation_history):
         # Add time context message
         conversation_history.append(get_time_context_message())
     
+    # A random ID on the first turn, so two conversations opening alike are still told apart
+    ensure_conversation_id(conversation_history)
+    
+    # Greetings, thanks and hours/address/phone questions get a templated answer,
+    # unless the message is replying to something the assistant asked
+    faq = templated_answer(user_message, conversation_history)
+    if faq:
+        intent, confidence, answer = faq
+        print(f"DEBUG: Answered '{intent}' intent locally (confidence {confidence:.2f})")
+        conversation_history.append({"role": "assistant", "content": answer})
+        token_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        cost_info = calculate_token_cost(prompt_tokens=0, completion_tokens=0)
+        store_request_analytics(token_usage, cost_info, model=INTENT_ANALYTICS_MODEL)
+        # A templated "thanks" often closes the conversation, so it is summarized like any other turn
+        summary = None
+        if detect_end_of_conversation(conversation_history):
+            summary = ensure_conversation_summary(conversation_history)
+        return {
+            "chat_response": answer,
+            "conversation_history": conversation_history,
+            "tool_call_detected": False,
+            "summary": summary,
+            "token_usage": token_usage,
+            "cost": cost_info
+        }, 200
+    
+    # An opening question close enough to one answered since the inventory last changed
+    cached_answer = get_cached_answer(db.session, user_message, conversation_history)
+    if cached_answer:
+        print(f"DEBUG: Answered first-turn question from the answer cache ({len(cached_answer)} messages)")
+        conversation_history.extend(cached_answer)
+        token_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        cost_info = calculate_token_cost(prompt_tokens=0, completion_tokens=0)
+        store_request_analytics(token_usage, cost_info, model=ANSWER_CACHE_ANALYTICS_MODEL)
+        return {
+            "chat_response": cached_answer[-1]["content"],
+            "conversation_history": conversation_history,
+            "tool_call_detected": False,
+            "summary": None,
+            "token_usage": token_usage,
+            "cost": cost_info
+        }, 200
+    
+    # A message naming a VIN or stock number can go straight to the inventory lookup
+    direct_call = direct_lookup_tool_call(user_message)
+    if direct_call:
+        conversation_history.append(direct_call)
+        return {
+            "chat_response": direct_call["content"],
+            "conversation_history": conversation_history,
+            "tool_call_detected": True,
+            "summary": None,
+            "token_usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            "cost": calculate_token_cost(prompt_tokens=0, completion_tokens=0)
+        }, 200
+    
+    # Only the tools this conversation has needed so far
+    offered_tools = select_tools(conversation_history, user_message)
+    print(f"DEBUG: Offering tools: {offered_tools}")
+    
+    # Start the likely inventory query while the model decides whether it needs one
+    prefetch = start_inventory_prefetch(user_message) if "fetch_cars" in offered_tools else None
+    
     # Call ChatCompletion API using the new tools syntax
     completion = client.chat.completions.create(
         model="o3-mini-2025-01-31",
-        messages=conversation_history,
-        tools=tools,
+        messages=llm_messages(conversation_history),
+        tools=tool_schemas(offered_tools) if offered_tools else NOT_GIVEN,
         reasoning_effort="low"
     )
     
@@ -272,24 +362,27 @@ def process_chat(user_message, conversation_history):
                 }
             })
         assistant_message["tool_calls"] = tool_calls_dict
+        
+        # Keep the prefetched cars for the tool-call-result request if they answer this call
+        if prefetch:
+            for tool_call in message.tool_calls:
+                if tool_call.function.name != "fetch_cars":
+                    continue
+                try:
+                    prefetch.resolve(tool_call.id, json.loads(tool_call.function.arguments))
+                except json.JSONDecodeError:
+                    pass
     
     conversation_history.append(assistant_message)
     
     # Check if the conversation has ended and generate a summary if needed
     summary = None
     if detect_end_of_conversation(conversation_history):
-        # Generate a conversation ID if not already present
-        conversation_id = None
-        for msg in conversation_history:
-            if msg.get("role") == "system" and "conversation_id" in msg.get("content", ""):
-                try:
-                    conversation_id = json.loads(msg.get("content")).get("conversation_id")
-                    break
-                except:
-                    pass
-        
-        # Generate the summary
-        summary = generate_conversation_summary(conversation_history, conversation_id)
+        # Generate the summary once, or again after enough new turns
+        summary = ensure_conversation_summary(conversation_history)
+    elif not tool_call_detected:
+        # Let later conversations opening with the same question skip the LLM
+        cache_first_turn(db.session, conversation_history)
     
     return {
         "chat_response": assistant_response,
@@ -378,7 +471,7 @@ def process_tool_call(conversation_history):
             print("DEBUG: Getting final response from LLM with fallback data")
             completion = client.chat.completions.create(
                 model="o3-mini-2025-01-31",
-                messages=conversation_history,
+                messages=llm_messages(conversation_history),
                 max_completion_tokens=1000,
                 reasoning_effort="low"
             )
@@ -406,18 +499,8 @@ def process_tool_call(conversation_history):
             summary = None
             if detect_end_of_conversation(conversation_history):
                 print("DEBUG: End of conversation detected, generating summary")
-                # Generate a conversation ID if not already present
-                conversation_id = None
-                for msg in conversation_history:
-                    if msg.get("role") == "system" and "conversation_id" in msg.get("content", ""):
-                        try:
-                            conversation_id = json.loads(msg.get("content")).get("conversation_id")
-                            break
-                        except:
-                            pass
-                
-                # Generate the summary
-                summary = generate_conversation_summary(conversation_history, conversation_id)
+                # Generate the summary once, or again after enough new turns
+                summary = ensure_conversation_summary(conversation_history)
             
             return {
                 "final_response": final_response,
@@ -442,15 +525,10 @@ def process_tool_call(conversation_history):
         except Exception as parse_error:
             return {"error": "Error parsing tool arguments"}, 400
 
-        # Execute the appropriate function based on the tool name
-        if func_name == "fetch_cars":
-            result = fetch_cars(func_args)
-        elif func_name == "find_car_review_videos":
-            result = find_car_review_videos(func_args.get("car_make"), func_args.get("car_model"), func_args.get("year"))
-            # If there's an error in the result, include it in the tool response
-            if "error" in result:
-                print("DEBUG: Error in find_car_review_videos result:", result["error"])
-        else:
+        # Execute the handler registered for the tool
+        try:
+            result = run_tool(func_name, func_args, tool_call_id)
+        except UnknownToolError:
             return {"error": f"Unknown tool '{func_name}' called"}, 400
 
         # Add the tool response message with the tool_call_id
@@ -464,7 +542,7 @@ def process_tool_call(conversation_history):
     # Get the final response from the LLM
     completion = client.chat.completions.create(
         model="o3-mini-2025-01-31",
-        messages=conversation_history,
+        messages=llm_messages(conversation_history),
         max_completion_tokens=500,
         reasoning_effort="low"
     )
@@ -490,18 +568,11 @@ def process_tool_call(conversation_history):
     # Check if the conversation has ended and generate a summary if needed
     summary = None
     if detect_end_of_conversation(conversation_history):
-        # Generate a conversation ID if not already present
-        conversation_id = None
-        for msg in conversation_history:
-            if msg.get("role") == "system" and "conversation_id" in msg.get("content", ""):
-                try:
-                    conversation_id = json.loads(msg.get("content")).get("conversation_id")
-                    break
-                except:
-                    pass
-        
-        # Generate the summary
-        summary = generate_conversation_summary(conversation_history, conversation_id)
+        # Generate the summary once, or again after enough new turns
+        summary = ensure_conversation_summary(conversation_history)
+    else:
+        # Keep the tool call, its result and the answer for repeated opening questions
+        cache_first_turn(db.session, conversation_history)
     
     return {
         "final_response": final_response,
@@ -534,7 +605,9 @@ def get_summary(conversation_id):
     
     if summary:
         return {
-            "summary": summary
+            "summary": summary,
+            # Routed locally; the LLM summary is still being written
+            "summary_pending": not summary["summary"]
         }, 200
     else:
         return {"error": "Summary not found"}, 404 
\ No newline at end of file
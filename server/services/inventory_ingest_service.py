@@ -0,0 +1,317 @@
+# server/services/inventory_ingest_service.py
+
+import csv
+import io
+import json
+import re
+import threading
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.exc import IntegrityError
+from database import db
+from models.sql_models import CarInventory, InventoryVersion
+from helpers.snapshot_helpers import build_inventory_snapshot
+from config import Config
+
+# Columns a feed can set, in COPY order
+FEED_COLUMNS = ["stock_number", "vin", "make", "model", "year", "price", "mileage", "color", "description"]
+
+# Common dealer feed headers, normalized to lowercase alphanumerics
+FIELD_ALIASES = {
+    "stocknumber": "stock_number", "stockno": "stock_number", "stock": "stock_number",
+    "vin": "vin", "vinnumber": "vin",
+    "make": "make",
+    "model": "model",
+    "year": "year", "modelyear": "year",
+    "price": "price", "internetprice": "price", "sellingprice": "price", "saleprice": "price",
+    "mileage": "mileage", "miles": "mileage", "odometer": "mileage",
+    "color": "color", "exteriorcolor": "color", "extcolor": "color",
+    "description": "description", "comments": "description", "vehicledescription": "description",
+}
+
+DEFAULT_BATCH_SIZE = 1000
+JSON_READ_SIZE = 64 * 1024
+
+# Serializes ingests: in-process with a lock, across workers with a Postgres advisory lock
+_ingest_lock = threading.Lock()
+INGEST_ADVISORY_LOCK_KEY = 0x1A7E1D05
+
+
+def iter_csv_records(text_stream):
+    """Yield one dict per CSV row without loading the whole file."""
+    yield from csv.DictReader(text_stream)
+
+
+def iter_json_records(text_stream):
+    """
+    Yield objects from a JSON array or JSON Lines stream, reading it in chunks.
+
+    A top-level array is decoded one element at a time with `raw_decode`, so the
+    whole feed never has to be held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+
+    while True:
+        # Skip array brackets and separators between values
+        buffer = buffer.lstrip(" \t\r\n[,]")
+
+        if buffer:
+            try:
+                obj, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                buffer = buffer[end:]
+                yield obj
+                continue
+        elif eof:
+            return
+
+        chunk = text_stream.read(JSON_READ_SIZE)
+        if not chunk:
+            eof = True
+        buffer += chunk
+
+
+def normalize_record(raw: dict) -> dict:
+    """
+    Map a feed row onto CarInventory columns and coerce the value types.
+
+    :raises ValueError: if a required field is missing or a number is invalid
+    """
+    record = {}
+    for key, value in raw.items():
+        column = FIELD_ALIASES.get(re.sub(r"[^a-z0-9]", "", str(key).lower()))
+        if column:
+            record[column] = value.strip() if isinstance(value, str) else value
+
+    for column in ("stock_number", "vin", "make", "model", "year", "price"):
+        if record.get(column) in (None, ""):
+            raise ValueError(f"missing {column}")
+
+    try:
+        record["year"] = int(record["year"])
+        record["price"] = Decimal(str(record["price"]).replace("$", "").replace(",", "")).quantize(Decimal("0.01"))
+        mileage = record.get("mileage")
+        record["mileage"] = int(str(mileage).replace(",", "")) if mileage not in (None, "") else None
+    except (ValueError, InvalidOperation) as e:
+        raise ValueError(f"invalid number: {e}")
+
+    record["stock_number"] = str(record["stock_number"])
+    record["vin"] = str(record["vin"]).upper()
+    record["color"] = record.get("color") or None
+    record["description"] = record.get("description") or None
+    return {column: record.get(column) for column in FEED_COLUMNS}
+
+
+def _load_current_stock(session):
+    """
+    Load the comparable columns of every car, keyed by stock number and VIN.
+
+    Tombstoned cars are included so a vehicle that returns to stock is revived
+    instead of colliding with its old stock number and VIN.
+    """
+    rows = session.execute(
+        select(CarInventory.id, CarInventory.deleted_at, *[getattr(CarInventory, c) for c in FEED_COLUMNS])
+    ).all()
+    by_stock, by_vin = {}, {}
+    for row in rows:
+        current = row._asdict()
+        by_stock[current["stock_number"]] = current
+        by_vin[current["vin"]] = current
+    return by_stock, by_vin
+
+
+def _copy_insert(session, rows, now, version):
+    """Insert rows with COPY ... FROM STDIN on the transaction's own psycopg2 connection."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([("" if row[c] is None else row[c]) for c in FEED_COLUMNS] + [now.isoformat(), now.isoformat(), version])
+    buffer.seek(0)
+    columns = ", ".join(FEED_COLUMNS + ["created_at", "updated_at", "change_version"])
+    cursor = session.connection().connection.cursor()
+    try:
+        # Empty unquoted fields load as NULL
+        cursor.copy_expert(f"COPY {CarInventory.__tablename__} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def ingest_inventory_feed(text_stream, feed_format: str, source: str = None, delete_missing: bool = True,
+                          dry_run: bool = False, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Stream a dealer feed, diff it against current stock and apply the changes.
+
+    Rows are matched by stock number, then VIN; a row whose stock number and
+    VIN belong to different cars, or that matches a car another row already
+    matched, is rejected. Deletes, updates and inserts are applied in batched
+    bulk statements (COPY on Postgres, executemany elsewhere) inside a single
+    transaction that also records a new inventory version. Deleted cars are
+    tombstoned, and every changed row is stamped with the new version so
+    clients can sync deltas from /api/inventory/changes.
+
+    With `delete_missing`, a feed with no valid rows, or with more than
+    INGEST_MAX_ERROR_RATIO of its rows rejected, is refused (422) without
+    writing anything, since it would otherwise delete most of the stock.
+    Ingests run one at a time.
+
+    :param text_stream: A text stream with the feed contents
+    :param feed_format: "csv", "json" (array) or "jsonl"
+    :param source: Description of the feed, stored with the new version
+    :param delete_missing: Remove cars that are not in the feed
+    :param dry_run: Compute the diff without writing anything
+    :param batch_size: Rows per bulk statement
+    :return: A tuple of (summary dict, status code)
+    """
+    if feed_format == "csv":
+        records = iter_csv_records(text_stream)
+    elif feed_format in ("json", "jsonl"):
+        records = iter_json_records(text_stream)
+    else:
+        return {"error": f"Unsupported feed format '{feed_format}'"}, 400
+
+    session = db.session
+    with _ingest_lock:
+        return _ingest_records(session, records, feed_format, source, delete_missing, dry_run, batch_size)
+
+
+def _ingest_records(session, records, feed_format, source, delete_missing, dry_run, batch_size):
+    try:
+        if not dry_run and session.get_bind().dialect.name == "postgresql":
+            # Held until commit, so the diff and the version number see every earlier ingest
+            session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": INGEST_ADVISORY_LOCK_KEY})
+        by_stock, by_vin = _load_current_stock(session)
+
+        inserts, updates, errors = [], [], []
+        seen_ids, seen_keys = set(), set()
+        for line_number, raw in enumerate(records, start=1):
+            try:
+                record = normalize_record(raw)
+            except (ValueError, AttributeError) as e:
+                errors.append({"record": line_number, "error": str(e)})
+                continue
+
+            if record["stock_number"] in seen_keys or record["vin"] in seen_keys:
+                errors.append({"record": line_number, "error": "duplicate stock number or VIN in feed"})
+                continue
+            seen_keys.update((record["stock_number"], record["vin"]))
+
+            stock_match = by_stock.get(record["stock_number"])
+            vin_match = by_vin.get(record["vin"])
+            if stock_match and vin_match and stock_match["id"] != vin_match["id"]:
+                errors.append({"record": line_number, "error": "stock number and VIN belong to different cars"})
+                continue
+            current = stock_match or vin_match
+            if current is None:
+                inserts.append(record)
+                continue
+            if current["id"] in seen_ids:
+                errors.append({"record": line_number, "error": "matches a car another feed row already matched"})
+                continue
+            seen_ids.add(current["id"])
+            if current["deleted_at"] is not None or any(current[c] != record[c] for c in FEED_COLUMNS):
+                updates.append(dict(record, id=current["id"]))
+
+        deletes = []
+        if delete_missing:
+            deletes = [
+                car["id"] for car in by_stock.values()
+                if car["id"] not in seen_ids and car["deleted_at"] is None
+            ]
+
+        summary = {
+            "inserted": len(inserts),
+            "updated": len(updates),
+            "deleted": len(deletes),
+            "unchanged": len(seen_ids) - len(updates),
+            "errors": errors[:100],
+            "error_count": len(errors),
+            "dry_run": dry_run,
+        }
+        valid = len(inserts) + len(seen_ids)
+        if delete_missing and (valid == 0 or len(errors) > Config.INGEST_MAX_ERROR_RATIO * (valid + len(errors))):
+            session.rollback()
+            summary["error"] = (
+                f"Refusing to apply a feed with {valid} valid and {len(errors)} rejected rows while deleting "
+                "missing cars; fix the feed or ingest with delete_missing=false"
+            )
+            return summary, 422
+        if dry_run:
+            session.rollback()
+            return summary, 200
+
+        version = (session.execute(select(func.max(InventoryVersion.version))).scalar() or 0) + 1
+        now = datetime.utcnow()
+
+        for chunk in _chunks(deletes, batch_size):
+            session.execute(
+                update(CarInventory)
+                .where(CarInventory.id.in_(chunk))
+                .values(deleted_at=now, updated_at=now, change_version=version)
+            )
+        for chunk in _chunks(updates, batch_size):
+            session.execute(
+                update(CarInventory),
+                [dict(row, deleted_at=None, updated_at=now, change_version=version) for row in chunk]
+            )
+        if inserts:
+            if session.get_bind().dialect.name == "postgresql":
+                _copy_insert(session, inserts, now, version)
+            else:
+                for chunk in _chunks(inserts, batch_size):
+                    session.execute(
+                        insert(CarInventory),
+                        [dict(row, created_at=now, updated_at=now, change_version=version) for row in chunk]
+                    )
+
+        session.add(InventoryVersion(
+            version=version,
+            source=(source or "")[:255] or None,
+            inserted=len(inserts),
+            updated=len(updates),
+            deleted=len(deletes)
+        ))
+        session.commit()
+
+        summary["version"] = version
+        if Config.INVENTORY_SNAPSHOT_ENABLED:
+            # Publish the new stock to every worker's memory-mapped snapshot
+            try:
+                summary["snapshot"] = build_inventory_snapshot(session)
+            except Exception as e:
+                print(f"Error building inventory snapshot: {str(e)}")
+                summary["snapshot"] = {"error": str(e)}
+        return summary, 200
+    except (json.JSONDecodeError, csv.Error) as e:
+        session.rollback()
+        return {"error": f"Malformed {feed_format} feed: {str(e)}"}, 400
+    except IntegrityError as e:
+        # Another worker's ingest committed the same version number or keys first
+        print(f"Conflict ingesting inventory feed: {str(e)}")
+        session.rollback()
+        return {"error": "Inventory changed during the ingest; retry it"}, 409
+    except Exception as e:
+        print(f"Error ingesting inventory feed: {str(e)}")
+        session.rollback()
+        return {"error": f"Failed to ingest inventory feed: {str(e)}"}, 500
+
+
+def detect_feed_format(filename: str = None, content_type: str = None) -> str:
+    """Guess the feed format from a file name or content type, defaulting to CSV."""
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "jsonl"
+    if name.endswith(".json") or "json" in content_type:
+        return "json"
+    return "csv"
@@ -1,35 +1,93 @@
 # server/services/inventory_service.py
 
-from models.sql_models import CarInventory
-from helpers.llm_utils import fetch_cars, find_car_review_videos
+from sqlalchemy import func
+from models.sql_models import CarInventory, InventoryVersion
+from helpers.llm_utils import fetch_cars, find_car_review_videos, semantic_search_cars
+from helpers.inventory_helpers import select_inventory
+from helpers.snapshot_helpers import get_inventory_snapshot
+from database import db
+
+def car_to_dict(car):
+    """Convert a CarInventory row to the dictionary returned by the inventory endpoints."""
+    return {
+        'id': car.id,
+        'stock_number': car.stock_number,
+        'vin': car.vin,
+        'make': car.make,
+        'model': car.model,
+        'year': car.year,
+        'price': float(car.price),
+        'mileage': car.mileage,
+        'color': car.color,
+        'description': car.description
+    }
 
 def get_all_inventory():
     """Get all cars from the inventory."""
     try:
-        # Query all cars from the inventory
-        cars = CarInventory.query.all()
-        
-        # Convert the cars to a list of dictionaries
-        inventory = []
-        for car in cars:
-            inventory.append({
-                'id': car.id,
-                'stock_number': car.stock_number,
-                'vin': car.vin,
-                'make': car.make,
-                'model': car.model,
-                'year': car.year,
-                'price': float(car.price),
-                'mileage': car.mileage,
-                'color': car.color,
-                'description': car.description
-            })
+        # Read the shared snapshot if one is published, else select the cars
+        # that are still in stock straight into dictionaries
+        snapshot = get_inventory_snapshot()
+        inventory = snapshot.inventory() if snapshot is not None else select_inventory(db.session)
         
         return inventory, 200
     except Exception as e:
         print(f"Error fetching inventory: {str(e)}")
         return {"error": "Failed to fetch inventory"}, 500
 
+def get_inventory_changes(since):
+    """
+    Get the cars added, changed or removed after the `since` cursor.
+
+    The cursor is the inventory version of the last sync. A missing, zero or
+    unknown cursor returns the full inventory so the client can rebuild its copy.
+
+    Only feed ingestion stamps change_version. Cars inserted or edited any
+    other way (SQL, an admin tool) keep their old version and are not
+    reported here until the next feed touches them or the client runs a full
+    sync.
+    """
+    try:
+        cursor = db.session.query(func.max(InventoryVersion.version)).scalar() or 0
+        full_sync = since is None or since <= 0 or since > cursor
+
+        query = CarInventory.query
+        if full_sync:
+            query = query.filter(CarInventory.deleted_at.is_(None))
+        else:
+            # Bounded by the cursor so a feed committing mid-request is picked up next time
+            query = query.filter(
+                CarInventory.change_version > since,
+                CarInventory.change_version <= cursor
+            )
+
+        upserts, removed = [], []
+        for car in query.order_by(CarInventory.id).all():
+            if car.deleted_at is not None:
+                removed.append(car.id)
+            else:
+                upserts.append(car_to_dict(car))
+
+        return {
+            "cursor": cursor,
+            "full_sync": full_sync,
+            "upserts": upserts,
+            "removed": removed
+        }, 200
+    except Exception as e:
+        print(f"Error fetching inventory changes: {str(e)}")
+        return {"error": "Failed to fetch inventory changes"}, 500
+
+def semantic_search(search_args):
+    """Rank cars by how well their description matches a free-text query."""
+    try:
+        if not (search_args.get("query") or "").strip():
+            return {"error": "Missing search query"}, 400
+        return {"query": search_args["query"], "results": semantic_search_cars(search_args)}, 200
+    except Exception as e:
+        print(f"Error in semantic search: {str(e)}")
+        return {"error": "Failed to search inventory"}, 500
+
 def search_cars(filter_params):
     """Search for cars based on filter criteria."""
     try:
@@ -0,0 +1,135 @@
+# server/services/lead_analytics_service.py
+
+from datetime import datetime
+from sqlalchemy import String, func, select, true, type_coerce
+from sqlalchemy.dialects import postgresql
+from models.sql_models import AutoLeadInteractionDetails
+from database.session import ScopedSession
+from helpers.cache_helpers import TTLCache, MISSING
+from config import Config
+
+DATE_BUCKETS = ("day", "week", "month")
+SQLITE_BUCKET_FORMATS = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}
+MAX_TOP_KEYWORDS = 100
+
+# Facet results keyed by their query parameters
+facets_cache = TTLCache(max_entries=256, ttl_seconds=Config.LEAD_FACETS_CACHE_TTL_SECONDS)
+
+Interaction = AutoLeadInteractionDetails
+
+
+def _apply_filters(query, dialect, start, end, keyword):
+    if start:
+        query = query.where(Interaction.created_at >= start)
+    if end:
+        query = query.where(Interaction.created_at < end)
+    if keyword:
+        if dialect == "postgresql":
+            # product_keywords @> ARRAY[keyword] is answered from the GIN index
+            query = query.where(
+                type_coerce(Interaction.product_keywords, postgresql.ARRAY(String)).contains([keyword])
+            )
+        else:
+            keywords = func.json_each(Interaction.product_keywords).table_valued("value")
+            query = query.where(
+                select(keywords.c.value).where(keywords.c.value == keyword).exists()
+            )
+    return query
+
+
+def _keyword_facet(session, dialect, filters, top):
+    if dialect == "postgresql":
+        keywords = _apply_filters(
+            select(func.unnest(Interaction.product_keywords).label("keyword")),
+            dialect, *filters
+        ).subquery()
+        keyword_column = keywords.c.keyword
+        query = select(keyword_column, func.count().label("count")).select_from(keywords)
+    else:
+        each = func.json_each(Interaction.product_keywords).table_valued("value")
+        keyword_column = each.c.value
+        query = _apply_filters(
+            select(keyword_column, func.count().label("count")).select_from(Interaction).join(each, true()),
+            dialect, *filters
+        )
+    rows = session.execute(
+        query.group_by(keyword_column).order_by(func.count().desc(), keyword_column).limit(top)
+    ).all()
+    return [{"keyword": keyword, "count": count} for keyword, count in rows]
+
+
+def _date_facet(session, dialect, filters, bucket):
+    if dialect == "postgresql":
+        bucket_column = func.date_trunc(bucket, Interaction.created_at)
+    else:
+        bucket_column = func.strftime(SQLITE_BUCKET_FORMATS[bucket], Interaction.created_at)
+    bucket_column = bucket_column.label("bucket")
+    rows = session.execute(
+        _apply_filters(select(bucket_column, func.count()), dialect, *filters)
+        .group_by(bucket_column)
+        .order_by(bucket_column)
+    ).all()
+    return [
+        {"bucket": value.date().isoformat() if isinstance(value, datetime) else value, "count": count}
+        for value, count in rows
+    ]
+
+
+def get_lead_facets(start=None, end=None, keyword=None, bucket="day", top=20):
+    """
+    Count lead interactions by sentiment, priority, keyword and date bucket.
+
+    All counting happens in the database; results are cached briefly per
+    parameter set.
+
+    :param start: Only include interactions created at or after this datetime
+    :param end: Only include interactions created before this datetime
+    :param keyword: Only include interactions tagged with this keyword
+    :param bucket: Date bucket size: "day", "week" or "month"
+    :param top: Number of keywords to return, clamped to 1..MAX_TOP_KEYWORDS
+    :return: A tuple of (facets dict, status code)
+    """
+    if bucket not in DATE_BUCKETS:
+        return {"error": f"bucket must be one of {', '.join(DATE_BUCKETS)}"}, 400
+    # A negative LIMIT is an error on Postgres
+    top = max(1, min(top, MAX_TOP_KEYWORDS))
+
+    cache_key = (start, end, keyword, bucket, top)
+    cached = facets_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached, 200
+
+    try:
+        session = ScopedSession()
+        dialect = session.get_bind().dialect.name
+        filters = (start, end, keyword)
+
+        sentiment_rows = session.execute(
+            _apply_filters(select(Interaction.sentiment, func.count()), dialect, *filters)
+            .group_by(Interaction.sentiment)
+        ).all()
+        priority_rows = session.execute(
+            _apply_filters(select(Interaction.priority_flag, func.count()), dialect, *filters)
+            .group_by(Interaction.priority_flag)
+        ).all()
+
+        by_sentiment = {sentiment or "unknown": count for sentiment, count in sentiment_rows}
+        by_priority = {"high": 0, "normal": 0}
+        for flag, count in priority_rows:
+            by_priority["high" if flag else "normal"] += count
+
+        facets = {
+            "total": sum(by_sentiment.values()),
+            "by_sentiment": by_sentiment,
+            "by_priority": by_priority,
+            "top_keywords": _keyword_facet(session, dialect, filters, top),
+            "by_date": _date_facet(session, dialect, filters, bucket),
+            "bucket": bucket,
+            "generated_at": datetime.utcnow().isoformat()
+        }
+        facets_cache.set(cache_key, facets)
+        return facets, 200
+    except Exception as e:
+        print(f"Error getting lead facets: {e}")
+        ScopedSession.rollback()
+        return {"error": "Failed to compute lead analytics"}, 500
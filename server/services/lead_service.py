@@ -0,0 +1,152 @@
+# server/services/lead_service.py
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from sqlalchemy import select, tuple_
+from models.sql_models import AutoLeadInteractionDetails
+from database.session import ScopedSession
+
+Interaction = AutoLeadInteractionDetails
+
+# Fields a client can request with `fields=`. Transcripts are never listed; they
+# are fetched one at a time from /api/leads/interactions/<id>/transcript.
+LISTABLE_FIELDS = (
+    "interaction_id", "lead_id", "conversation_id", "created_at", "sentiment", "priority_flag",
+    "product_keywords", "conversation_summary", "next_steps_recommendation", "has_transcript",
+)
+DEFAULT_FIELDS = LISTABLE_FIELDS
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, interaction_id: int) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    raw = json.dumps([created_at.isoformat(), interaction_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    :raises ValueError: if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, interaction_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(interaction_id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(f"invalid cursor: {e}")
+
+
+def parse_fields(fields: str = None):
+    """
+    Turn a comma-separated `fields` parameter into a tuple of column names.
+
+    :raises ValueError: if an unknown field is requested
+    """
+    if not fields:
+        return DEFAULT_FIELDS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in LISTABLE_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+    # The sort key is always returned so the client can see where a page ends
+    return tuple(dict.fromkeys(["interaction_id", "created_at"] + requested))
+
+
+def _field_column(field: str):
+    if field == "has_transcript":
+        # Tested in SQL so the compressed transcript itself is never read
+        return Interaction.conversation_transcript.isnot(None).label("has_transcript")
+    return getattr(Interaction, field)
+
+
+def _row_to_dict(row) -> dict:
+    item = row._asdict()
+    if item.get("created_at") is not None:
+        item["created_at"] = item["created_at"].isoformat()
+    if "product_keywords" in item:
+        item["product_keywords"] = item["product_keywords"] or []
+    return item
+
+
+def list_lead_interactions(cursor: str = None, limit: int = DEFAULT_PAGE_SIZE, priority: bool = None,
+                           sentiment: str = None, fields=DEFAULT_FIELDS):
+    """
+    List lead interactions newest first, one keyset page at a time.
+
+    Pages are ordered by (created_at, interaction_id) descending and continue
+    strictly after the row encoded in `cursor`, so each page is an index range
+    scan no matter how deep the client pages.
+
+    :param cursor: The `next_cursor` of the previous page, or None for the first page
+    :param limit: Rows per page, capped at MAX_PAGE_SIZE
+    :param priority: Only high priority (True) or normal (False) interactions
+    :param sentiment: Only interactions with this sentiment
+    :param fields: Columns to return; see LISTABLE_FIELDS
+    :return: A tuple of (page dict, status code)
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+    query = select(*[_field_column(f) for f in fields])
+    if priority is not None:
+        # `=` rather than IS, so the (priority_flag, created_at, interaction_id) index applies
+        query = query.where(Interaction.priority_flag == priority)
+    if sentiment:
+        query = query.where(Interaction.sentiment == sentiment)
+    if after:
+        query = query.where(tuple_(Interaction.created_at, Interaction.interaction_id) < after)
+
+    try:
+        # Fetch one extra row to know whether another page exists
+        rows = ScopedSession.execute(
+            query.where(Interaction.created_at.isnot(None))
+            .order_by(Interaction.created_at.desc(), Interaction.interaction_id.desc())
+            .limit(limit + 1)
+        ).all()
+    except Exception as e:
+        print(f"Error listing lead interactions: {e}")
+        ScopedSession.rollback()
+        return {"error": "Failed to list lead interactions"}, 500
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(last["created_at"], last["interaction_id"])
+
+    return {
+        "interactions": [_row_to_dict(row) for row in rows],
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "limit": limit
+    }, 200
+
+
+def get_interaction_transcript(interaction_id: int):
+    """
+    Load the compressed transcript of one interaction.
+
+    :return: A tuple of (compressed bytes, 200), or (error dict, status code)
+    """
+    try:
+        blob = ScopedSession.execute(
+            select(Interaction.conversation_transcript).where(Interaction.interaction_id == interaction_id)
+        ).scalar_one_or_none()
+    except Exception as e:
+        print(f"Error loading transcript for interaction {interaction_id}: {e}")
+        ScopedSession.rollback()
+        return {"error": "Failed to load transcript"}, 500
+
+    if blob is None:
+        return {"error": "Transcript not found"}, 404
+    return bytes(blob), 200
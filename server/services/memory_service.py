@@ -0,0 +1,85 @@
+# server/services/memory_service.py
+
+import threading
+import tracemalloc
+from datetime import datetime, timezone
+
+# The last snapshot taken in this worker, used as the base for the next diff
+_last_snapshot = None
+_last_snapshot_at = None
+_lock = threading.Lock()
+
+# Allocations made by the profiler itself are noise in every report
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _format_stat(stat, key_type):
+    frame = stat.traceback[0]
+    entry = {
+        "location": f"{frame.filename}:{frame.lineno}" if key_type != "filename" else frame.filename,
+        "size_kb": round(stat.size / 1024, 1),
+        "count": stat.count,
+    }
+    if hasattr(stat, "size_diff"):
+        entry["size_diff_kb"] = round(stat.size_diff / 1024, 1)
+        entry["count_diff"] = stat.count_diff
+    return entry
+
+
+def start_tracing(frames=10):
+    """Start tracemalloc in this worker."""
+    if tracemalloc.is_tracing():
+        return {"message": "Memory tracing already running", "frames": tracemalloc.get_traceback_limit()}, 200
+    tracemalloc.start(frames)
+    return {"message": "Memory tracing started", "frames": frames}, 200
+
+
+def stop_tracing():
+    """Stop tracemalloc and drop the stored snapshot."""
+    global _last_snapshot, _last_snapshot_at
+    with _lock:
+        _last_snapshot = None
+        _last_snapshot_at = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return {"message": "Memory tracing stopped"}, 200
+
+
+def take_snapshot(limit=25, key_type="lineno"):
+    """
+    Take a tracemalloc snapshot and diff it against the previous one.
+
+    :param limit: Number of entries to return in each list
+    :param key_type: How to group allocations: "lineno", "filename" or "traceback"
+    :return: Top allocations, top growth since the last snapshot, and totals
+    """
+    global _last_snapshot, _last_snapshot_at
+    if not tracemalloc.is_tracing():
+        return {"error": "Memory tracing is not running. Start it first."}, 409
+    if key_type not in ("lineno", "filename", "traceback"):
+        return {"error": "key_type must be one of lineno, filename, traceback"}, 400
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+    current, peak = tracemalloc.get_traced_memory()
+    taken_at = datetime.now(timezone.utc)
+
+    with _lock:
+        previous, previous_at = _last_snapshot, _last_snapshot_at
+        _last_snapshot, _last_snapshot_at = snapshot, taken_at
+
+    result = {
+        "taken_at": taken_at.isoformat(),
+        "traced_current_kb": round(current / 1024, 1),
+        "traced_peak_kb": round(peak / 1024, 1),
+        "top_allocations": [_format_stat(s, key_type) for s in snapshot.statistics(key_type)[:limit]],
+        "compared_to": previous_at.isoformat() if previous_at else None,
+        "top_growth": [],
+    }
+    if previous is not None:
+        diff = snapshot.compare_to(previous, key_type)
+        result["top_growth"] = [_format_stat(s, key_type) for s in diff[:limit] if s.size_diff > 0]
+    return result, 200
@@ -0,0 +1,304 @@
+# server/services/summary_backfill_service.py
+
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import openai
+from sqlalchemy import insert, select, update
+from database import db
+from models.sql_models import AnalyticsData, AutoLeadInteractionDetails, ConversationSummary
+from helpers.llm_utils import request_summary, resolve_conversation_id, summarizable_messages, summary_cache
+from helpers.sql_helpers import bulk_upsert
+from helpers.token_utils import calculate_token_cost
+from helpers.transcript_helpers import compress_transcript, decompress_transcript
+from services.inventory_ingest_service import iter_json_records
+from config import Config
+
+SUMMARY_MODEL = "o3-mini-2025-01-31"
+
+# Errors worth retrying with backoff; anything else fails the conversation
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError)
+
+# Namespace for IDs given to stored interactions that have no conversation ID
+INTERACTION_ID_NAMESPACE = uuid.UUID("0d6b7f0e-9a1c-4a8e-b7de-2f6f3c5e1d42")
+
+
+def iter_stored_conversations(after_id: int, chunk_size: int, missing_only: bool = True):
+    """
+    Yield chunks of stored transcripts, in interaction ID order, after `after_id`.
+
+    Each item is a dict with the interaction ID, the conversation ID and the
+    decompressed messages. An interaction without a conversation ID gets one
+    derived from its interaction ID, flagged `new_conversation_id` so it is
+    written back with the summary. Only interactions without a summary are
+    read when `missing_only` is set.
+    """
+    while True:
+        query = (
+            select(
+                AutoLeadInteractionDetails.interaction_id,
+                AutoLeadInteractionDetails.conversation_id,
+                AutoLeadInteractionDetails.conversation_transcript
+            )
+            .where(
+                AutoLeadInteractionDetails.interaction_id > after_id,
+                AutoLeadInteractionDetails.conversation_transcript.isnot(None)
+            )
+            .order_by(AutoLeadInteractionDetails.interaction_id)
+            .limit(chunk_size)
+        )
+        if missing_only:
+            query = query.where(AutoLeadInteractionDetails.conversation_summary.is_(None))
+        rows = db.session.execute(query).all()
+        if not rows:
+            return
+        yield [
+            {
+                "position": interaction_id,
+                "interaction_id": interaction_id,
+                "conversation_id": conversation_id or str(uuid.uuid5(INTERACTION_ID_NAMESPACE, str(interaction_id))),
+                "new_conversation_id": conversation_id is None,
+                "conversation_history": decompress_transcript(blob)
+            }
+            for interaction_id, conversation_id, blob in rows
+        ]
+        after_id = rows[-1][0]
+
+
+def iter_file_conversations(text_stream, after_position: int, chunk_size: int):
+    """
+    Yield chunks of conversations from a JSON array or JSON Lines export.
+
+    Each record is a list of messages, or an object with `conversation_history`
+    and an optional `conversation_id`. Positions count records from 1.
+    """
+    chunk = []
+    for position, record in enumerate(iter_json_records(text_stream), start=1):
+        if position <= after_position:
+            continue
+        history = record.get("conversation_history") if isinstance(record, dict) else record
+        if not isinstance(history, list):
+            raise ValueError(f"Record {position} has no conversation_history list")
+        conversation_id = record.get("conversation_id") if isinstance(record, dict) else None
+        chunk.append({
+            "position": position,
+            "interaction_id": None,
+            "conversation_id": str(conversation_id or resolve_conversation_id(history)),
+            "conversation_history": history
+        })
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def summarize_with_retry(conversation_history: list, max_retries: int):
+    """
+    Run one summary call, backing off exponentially (with jitter) on rate limits and transient errors.
+
+    :return: (summary dict, token usage)
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return request_summary(conversation_history)
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            delay = min(Config.SUMMARY_BACKFILL_MAX_BACKOFF_SECONDS, 2 ** attempt) * (0.5 + random.random())
+            print(f"DEBUG: Summary call failed ({type(e).__name__}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _summarize(item: dict, max_retries: int):
+    # Runs in a worker thread: LLM call only, no database access
+    if not summarizable_messages(item["conversation_history"]):
+        return item, None, None, "No user or assistant messages"
+    try:
+        summary, usage = summarize_with_retry(item["conversation_history"], max_retries)
+        return item, summary, usage, None
+    except Exception as e:
+        return item, None, None, f"{type(e).__name__}: {e}"
+
+
+def write_summaries(results: list):
+    """
+    Save one chunk of summaries with bulk statements and a single commit.
+
+    Summaries are upserted by conversation ID. Stored interactions are updated
+    in place by primary key, and given the summary's conversation ID if they
+    had none; conversations from a file update the interaction
+    already recorded for their conversation ID, or get a new one with the
+    compressed transcript.
+    """
+    now = datetime.utcnow()
+    # One row per conversation: a bulk upsert cannot touch the same key twice
+    results = list({result[0]["conversation_id"]: result for result in results}.values())
+    summary_rows, interaction_updates, interaction_inserts, analytics_rows = [], [], [], []
+
+    file_ids = [item["conversation_id"] for item, _, _, _ in results if item["interaction_id"] is None]
+    existing = {}
+    if file_ids:
+        existing = dict(db.session.execute(
+            select(AutoLeadInteractionDetails.conversation_id, AutoLeadInteractionDetails.interaction_id)
+            .where(AutoLeadInteractionDetails.conversation_id.in_(file_ids))
+        ).all())
+
+    for item, summary, usage, _ in results:
+        insights = summary.get("insights") or {}
+        summary_rows.append({
+            "conversation_id": item["conversation_id"],
+            "sentiment": summary.get("sentiment") or "neutral",
+            "keywords": summary.get("keywords") or [],
+            "summary": summary.get("summary") or "",
+            "department": summary.get("department") or "Sales",
+            "insights": insights,
+            "summarized_messages": len(summarizable_messages(item["conversation_history"])),
+            "created_at": now,
+            "updated_at": now
+        })
+        fields = {
+            "conversation_summary": summary.get("summary") or "",
+            "sentiment": summary.get("sentiment") or "neutral",
+            "product_keywords": summary.get("keywords") or [],
+            "priority_flag": insights.get("urgency") == "high",
+            "next_steps_recommendation": insights.get("additional_notes", "")
+        }
+        interaction_id = item["interaction_id"] or existing.get(item["conversation_id"])
+        if interaction_id is not None:
+            update_row = dict(fields, interaction_id=interaction_id)
+            if item.get("new_conversation_id"):
+                update_row["conversation_id"] = item["conversation_id"]
+            interaction_updates.append(update_row)
+        else:
+            interaction_inserts.append(dict(
+                fields,
+                conversation_id=item["conversation_id"],
+                conversation_transcript=compress_transcript(item["conversation_history"]),
+                created_at=now
+            ))
+
+        cost_info = calculate_token_cost(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+        analytics_rows.append({
+            "date": now,
+            "model": SUMMARY_MODEL,
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
+            "prompt_cost": cost_info["prompt_cost"],
+            "completion_cost": cost_info["completion_cost"],
+            "total_cost": cost_info["total_cost"],
+            "created_at": now
+        })
+
+    try:
+        # created_at is only set when the summary row is new
+        bulk_upsert(db.session, ConversationSummary, summary_rows, "conversation_id",
+                    update_columns=[key for key in summary_rows[0] if key not in ("conversation_id", "created_at")])
+        if interaction_updates:
+            db.session.execute(update(AutoLeadInteractionDetails), interaction_updates)
+        if interaction_inserts:
+            # Upserted in case a live conversation recorded its interaction since the lookup above
+            bulk_upsert(db.session, AutoLeadInteractionDetails, interaction_inserts, "conversation_id",
+                        update_columns=[key for key in interaction_inserts[0] if key not in ("conversation_id", "created_at")])
+        db.session.execute(insert(AnalyticsData), analytics_rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    for row in summary_rows:
+        summary_cache.delete(row["conversation_id"])
+
+
+def _load_checkpoint(path: str, source: str) -> dict:
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("source") != source:
+            raise ValueError(f"Checkpoint {path} belongs to {checkpoint.get('source')!r}, not {source!r}")
+        return checkpoint
+    return {"source": source, "position": 0, "summarized": 0, "failed": 0, "failures": []}
+
+
+def _save_checkpoint(path: str, checkpoint: dict):
+    """Write the checkpoint atomically, so an interrupted run never leaves a torn file."""
+    if not path:
+        return
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".checkpoint-", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(dict(checkpoint, updated_at=datetime.utcnow().isoformat()), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def run_summary_backfill(input_stream=None, source: str = "database", missing_only: bool = True,
+                         chunk_size: int = None, concurrency: int = None, checkpoint_path: str = None,
+                         limit: int = None, max_retries: int = None, progress=print) -> dict:
+    """
+    Summarize conversations in chunks with bounded concurrency, resuming from a checkpoint.
+
+    Conversations come from stored transcripts, or from `input_stream` (a JSON
+    array or JSON Lines export) when given. Each chunk's LLM calls run on at
+    most `concurrency` threads. The results are then written with bulk
+    statements in one transaction, and only after that is the checkpoint moved
+    past the chunk, so an interrupted run repeats at most one chunk. Failed
+    conversations are recorded in the checkpoint and skipped.
+
+    :return: The final checkpoint, with totals and the run's throughput
+    """
+    chunk_size = chunk_size or Config.SUMMARY_BACKFILL_CHUNK_SIZE
+    concurrency = concurrency or Config.SUMMARY_BACKFILL_CONCURRENCY
+    max_retries = Config.SUMMARY_BACKFILL_MAX_RETRIES if max_retries is None else max_retries
+    checkpoint = _load_checkpoint(checkpoint_path, source)
+
+    if input_stream is not None:
+        chunks = iter_file_conversations(input_stream, checkpoint["position"], chunk_size)
+    else:
+        chunks = iter_stored_conversations(checkpoint["position"], chunk_size, missing_only)
+
+    started = time.perf_counter()
+    processed = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="summary-backfill") as executor:
+        for chunk in chunks:
+            if limit is not None:
+                chunk = chunk[:limit - processed]
+                if not chunk:
+                    break
+            results = list(executor.map(lambda item: _summarize(item, max_retries), chunk))
+            succeeded = [result for result in results if result[3] is None]
+            if succeeded:
+                write_summaries(succeeded)
+
+            failures = [
+                {"position": item["position"], "conversation_id": item["conversation_id"], "error": error}
+                for item, _, _, error in results if error is not None
+            ]
+            processed += len(chunk)
+            checkpoint["position"] = chunk[-1]["position"]
+            checkpoint["summarized"] += len(succeeded)
+            checkpoint["failed"] += len(failures)
+            # Keep the most recent failures for inspection
+            checkpoint["failures"] = (checkpoint["failures"] + failures)[-Config.SUMMARY_BACKFILL_MAX_FAILURES_KEPT:]
+            _save_checkpoint(checkpoint_path, checkpoint)
+
+            elapsed = time.perf_counter() - started
+            progress(f"{processed} conversations this run ({processed / elapsed:.1f}/s), "
+                     f"{checkpoint['summarized']} summarized, {checkpoint['failed']} failed, "
+                     f"position {checkpoint['position']}")
+            if limit is not None and processed >= limit:
+                break
+
+    elapsed = time.perf_counter() - started
+    return dict(
+        checkpoint,
+        processed=processed,
+        elapsed_seconds=round(elapsed, 2),
+        per_second=round(processed / elapsed, 2) if elapsed else None
+    )
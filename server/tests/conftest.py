@@ -0,0 +1,44 @@
+# server/tests/conftest.py
+#
+# Run from the server directory:
+#   python -m pytest
+#
+# The app reads its configuration from the environment when it is imported, so
+# the test database and settings are set here first. DATABASE_URL is always
+# replaced: every test drops the tables it created.
+
+import os
+import sys
+import tempfile
+import pytest
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADMIN_TOKEN = "test-admin-token"
+ADMIN_HEADERS = {"Authorization": f"Bearer {ADMIN_TOKEN}"}
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='server-tests-'), 'test.db')}"
+os.environ["ADMIN_TOKEN"] = ADMIN_TOKEN
+os.environ["WARMUP_ENABLED"] = "false"
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost:3000")
+sys.path.insert(0, SERVER_DIR)
+
+from app import app as flask_app  # noqa: E402
+from database import db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    """The app inside an application context, on freshly created tables."""
+    with flask_app.app_context():
+        db.create_all()
+        try:
+            yield flask_app
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
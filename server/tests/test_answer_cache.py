@@ -0,0 +1,35 @@
+# server/tests/test_answer_cache.py
+
+import pytest
+from helpers.answer_cache_helpers import SemanticAnswerCache
+
+ANSWER = [{"role": "assistant", "content": "We have three Rogues under $30,000."}]
+
+
+@pytest.fixture
+def cache():
+    cache = SemanticAnswerCache(max_entries=10, ttl_seconds=60, threshold=0.8)
+    cache.set("Do you have any Rogues under 30k?", 1, ANSWER)
+    cache.set("any rogue sv awd", 1, ANSWER)
+    return cache
+
+
+def test_rephrased_question_hits(cache):
+    assert cache.get("do you have any rogue under 30k", 1) == ANSWER
+
+
+@pytest.mark.parametrize("message", [
+    "Do you have any Rogues under 20k?",
+    "Do you have any Rogues over 30k?",
+    "Do you have any Kicks under 30k?",
+    "any rogue sl awd",
+    "any rogue sv fwd",
+    "any rogue sv awd pro-4x",
+])
+def test_questions_differing_in_a_content_word_miss(cache, message):
+    assert cache.get(message, 1) is None
+
+
+def test_new_inventory_version_drops_entries(cache):
+    assert cache.get("any rogue sv awd", 2) is None
+    assert len(cache) == 0
@@ -0,0 +1,129 @@
+# server/tests/test_conversation_ids.py
+
+import json
+from types import SimpleNamespace
+from sqlalchemy import inspect, text
+from database import db
+from models.sql_models import AutoLeadInteractionDetails, ConversationSummary
+from helpers.llm_backend import normalize_request_body
+from helpers.llm_utils import ensure_conversation_id, resolve_conversation_id
+from services import chat_service
+from helpers.transcript_helpers import compress_transcript
+from services import summary_backfill_service
+from services.chat_service import process_chat
+
+
+def _first_turn(message):
+    return [
+        {"role": "system", "content": "Current time: 2026-10-19 10:00:00 EST"},
+        {"role": "user", "content": message},
+    ]
+
+
+def test_identical_first_turns_get_different_ids(app):
+    first, status = process_chat("hi", _first_turn("hi"))
+    second, _ = process_chat("hi", _first_turn("hi"))
+
+    assert status == 200
+    assert resolve_conversation_id(first["conversation_history"]) != resolve_conversation_id(second["conversation_history"])
+
+
+def test_id_stays_with_the_conversation(app):
+    result, _ = process_chat("hi", _first_turn("hi"))
+    history = result["conversation_history"]
+    conversation_id = resolve_conversation_id(history)
+
+    history.append({"role": "user", "content": "what are your hours"})
+    result, _ = process_chat("what are your hours", history)
+
+    ids = [json.loads(msg["content"])["conversation_id"] for msg in result["conversation_history"]
+           if msg["role"] == "system" and "conversation_id" in msg["content"]]
+    assert ids == [conversation_id]
+
+
+def test_id_is_not_sent_to_the_llm(app, monkeypatch):
+    sent = []
+
+    def create(**kwargs):
+        sent.append(kwargs["messages"])
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="We have plenty of SUVs.", tool_calls=None))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+        )
+
+    monkeypatch.setattr(chat_service, "client", SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    message = "tell me about owning an electric car in winter"
+    result, _ = process_chat(message, _first_turn(message))
+
+    assert resolve_conversation_id(result["conversation_history"]) is not None
+    assert sent and not any("conversation_id" in msg["content"] for msg in sent[0])
+
+
+def test_cassette_keys_ignore_the_conversation_id():
+    bodies = []
+    for _ in range(2):
+        history = _first_turn("hi")
+        ensure_conversation_id(history)
+        bodies.append({"model": "o3-mini-2025-01-31", "messages": history})
+
+    assert normalize_request_body(bodies[0]) == normalize_request_body(bodies[1])
+    assert normalize_request_body(bodies[0])["messages"] == normalize_request_body({"messages": _first_turn("hi")})["messages"]
+
+
+def test_ensure_conversation_id_keeps_an_existing_id():
+    history = _first_turn("hi")
+    conversation_id = ensure_conversation_id(history)
+
+    assert ensure_conversation_id(history) == conversation_id
+    assert len(history) == 3
+
+
+def test_conversations_without_an_id_resolve_the_same_way_every_turn():
+    history = _first_turn("do you have any rogues")
+
+    conversation_id = resolve_conversation_id(history)
+    history += [{"role": "assistant", "content": "Yes."}, {"role": "user", "content": "great"}]
+
+    assert resolve_conversation_id(history) == conversation_id
+
+
+def test_upgrade_schema_adds_summarized_messages(app):
+    ConversationSummary.__table__.drop(db.engine)
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE conversation_summaries (id INTEGER PRIMARY KEY, conversation_id VARCHAR(100) NOT NULL UNIQUE, "
+            "sentiment VARCHAR(20) NOT NULL, keywords JSON, summary TEXT NOT NULL, department VARCHAR(50) NOT NULL, "
+            "insights JSON, created_at DATETIME, updated_at DATETIME)"
+        ))
+        connection.execute(text(
+            "INSERT INTO conversation_summaries (conversation_id, sentiment, summary, department) "
+            "VALUES ('c1', 'neutral', 'Asked about Rogues', 'Sales')"
+        ))
+
+    result = app.test_cli_runner().invoke(args=["upgrade-schema"])
+
+    assert result.exit_code == 0, result.output
+    assert "summarized_messages" in {c["name"] for c in inspect(db.engine).get_columns("conversation_summaries")}
+    assert db.session.query(ConversationSummary).one().summarized_messages == 0
+
+
+def test_backfill_writes_derived_ids_back_to_the_interaction(app, monkeypatch):
+    transcript = compress_transcript([{"role": "user", "content": "do you service hybrids"},
+                                      {"role": "assistant", "content": "Yes, we do."}])
+    legacy = AutoLeadInteractionDetails(conversation_transcript=transcript)
+    recent = AutoLeadInteractionDetails(conversation_id="known-id", conversation_transcript=transcript)
+    db.session.add_all([legacy, recent])
+    db.session.commit()
+    summary = {"sentiment": "neutral", "keywords": ["hybrid"], "summary": "Asked about hybrid service.",
+               "department": "Service", "insights": {}}
+    usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+    monkeypatch.setattr(summary_backfill_service, "request_summary", lambda history: (summary, usage))
+
+    summary_backfill_service.run_summary_backfill(progress=lambda message: None)
+
+    db.session.refresh(legacy)
+    db.session.refresh(recent)
+    assert legacy.conversation_id is not None
+    assert recent.conversation_id == "known-id"
+    summary_ids = {row.conversation_id for row in db.session.query(ConversationSummary)}
+    assert summary_ids == {legacy.conversation_id, "known-id"}
@@ -0,0 +1,43 @@
+# server/tests/test_idempotency.py
+
+import pytest
+from helpers.idempotency_helpers import idempotency_cache
+
+# A greeting is answered from a template, so no LLM call is made
+BODY = {"message": "hi", "conversation_history": [{"role": "user", "content": "hi"}]}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    idempotency_cache._completed.clear()
+    yield
+    idempotency_cache._completed.clear()
+
+
+def _post(client, body, key="chat-1", user="user-a"):
+    return client.post("/api/chat", json=body, headers={"Idempotency-Key": key, "userUUID": user})
+
+
+def test_retry_with_the_same_key_and_body_is_replayed(app, client):
+    first = _post(client, BODY)
+    retry = _post(client, BODY)
+
+    assert first.headers["Idempotent-Replayed"] == "false"
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.get_json() == first.get_json()
+
+
+def test_key_reused_with_a_different_body_is_refused(app, client):
+    _post(client, BODY)
+
+    response = _post(client, {"message": "hello", "conversation_history": [{"role": "user", "content": "hello"}]})
+
+    assert response.status_code == 422
+
+
+def test_same_key_from_another_client_is_not_shared(app, client):
+    first = _post(client, BODY, user="user-a")
+    other = _post(client, BODY, user="user-b")
+
+    assert other.headers["Idempotent-Replayed"] == "false"
+    assert other.get_json()["conversation_history"] != first.get_json()["conversation_history"]
@@ -0,0 +1,41 @@
+# server/tests/test_intent_helpers.py
+
+from helpers.intent_helpers import FAQ_TEMPLATES, awaiting_reply, templated_answer
+
+SYSTEM = {"role": "system", "content": "You are Patricia"}
+
+
+def _history(*assistant_messages, user_message="no thanks"):
+    history = [SYSTEM, {"role": "user", "content": "do you have any rogues"}]
+    history += [{"role": "assistant", "content": content} for content in assistant_messages]
+    return history + [{"role": "user", "content": user_message}]
+
+
+def test_first_turn_is_answered_from_templates():
+    assert templated_answer("thanks", [SYSTEM, {"role": "user", "content": "thanks"}])[0] == "thanks"
+    assert templated_answer("what are your hours", None)[0] == "hours"
+
+
+def test_reply_to_an_assistant_question_goes_to_the_llm():
+    history = _history("We have three Rogues in stock. Would you like to book a test drive? 🙂")
+
+    assert awaiting_reply(history)
+    assert templated_answer("no thanks", history) is None
+
+
+def test_message_after_a_completed_answer_is_answered_from_templates():
+    history = _history("We have three Rogues in stock starting at $28,500.", user_message="thanks")
+
+    assert not awaiting_reply(history)
+    assert templated_answer("thanks", history)[0] == "thanks"
+
+
+def test_canned_answers_count_as_completed():
+    assert not awaiting_reply(_history(FAQ_TEMPLATES["greeting"], user_message="what are your hours"))
+
+
+def test_pending_tool_call_awaits_a_reply():
+    history = [SYSTEM, {"role": "user", "content": "any rogues"},
+               {"role": "assistant", "content": "", "tool_calls": [{"id": "1"}]}]
+
+    assert awaiting_reply(history + [{"role": "user", "content": "thanks"}])
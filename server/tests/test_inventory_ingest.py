@@ -0,0 +1,110 @@
+# server/tests/test_inventory_ingest.py
+
+import io
+import json
+from database import db
+from models.sql_models import CarInventory, InventoryVersion
+from services.inventory_ingest_service import ingest_inventory_feed
+from benchmarks.fixtures import generate_car_rows
+from tests.conftest import ADMIN_HEADERS
+
+FEED_HEADER = "stock_number,vin,make,model,year,price,mileage,color,description\n"
+
+
+def _stock(count):
+    rows = list(generate_car_rows(count))
+    ingest_inventory_feed(io.StringIO(json.dumps(rows, default=str)), "json")
+    return rows
+
+
+def _feed_line(row):
+    return ",".join(str(row[c] if row[c] is not None else "") for c in
+                    ("stock_number", "vin", "make", "model", "year", "price", "mileage", "color", "description")) + "\n"
+
+
+def _in_stock():
+    return db.session.query(CarInventory).filter(CarInventory.deleted_at.is_(None)).count()
+
+
+def test_feed_replaces_stock_and_deletes_missing_cars(app):
+    rows = _stock(20)
+    feed = FEED_HEADER + "".join(_feed_line(row) for row in rows[:19])
+
+    result, status = ingest_inventory_feed(io.StringIO(feed), "csv")
+
+    assert status == 200
+    assert result["deleted"] == 1
+    assert _in_stock() == 19
+
+
+def test_feed_with_wrong_headers_deletes_nothing(app, client):
+    _stock(50)
+
+    response = client.post(
+        "/api/inventory/ingest?format=csv",
+        data="Stock,Vehicle Identification\nA1,123\n",
+        headers=dict(ADMIN_HEADERS, **{"Content-Type": "text/csv"})
+    )
+
+    assert response.status_code == 422
+    assert response.get_json()["error_count"] == 1
+    assert _in_stock() == 50
+    assert db.session.query(InventoryVersion).count() == 1
+
+
+def test_empty_feed_deletes_nothing(app):
+    _stock(10)
+
+    result, status = ingest_inventory_feed(io.StringIO("[]"), "json")
+
+    assert status == 422
+    assert _in_stock() == 10
+
+
+def test_mostly_rejected_feed_deletes_nothing(app):
+    rows = _stock(10)
+    bad = "".join(f"BAD{i},VIN{i},Nissan,Rogue,not-a-year,100,,,\n" for i in range(5))
+    feed = FEED_HEADER + "".join(_feed_line(row) for row in rows[:5]) + bad
+
+    result, status = ingest_inventory_feed(io.StringIO(feed), "csv")
+
+    assert status == 422
+    assert result["error_count"] == 5
+    assert _in_stock() == 10
+
+
+def test_row_matching_two_cars_is_rejected(app):
+    rows = _stock(3)
+    # Stock number of the first car with the VIN of the second
+    crossed = dict(rows[0], vin=rows[1]["vin"], price=1)
+    feed = FEED_HEADER + _feed_line(crossed)
+
+    result, status = ingest_inventory_feed(io.StringIO(feed), "csv", delete_missing=False)
+
+    assert status == 200
+    assert result["errors"] == [{"record": 1, "error": "stock number and VIN belong to different cars"}]
+    first = db.session.query(CarInventory).filter_by(stock_number=rows[0]["stock_number"]).one()
+    assert first.vin == rows[0]["vin"] and float(first.price) == rows[0]["price"]
+
+
+def test_two_rows_matching_one_car_are_rejected(app):
+    rows = _stock(2)
+    # A new stock number carrying the first car's VIN, after a row that already matched it
+    feed = FEED_HEADER + _feed_line(rows[0]) + _feed_line(dict(rows[0], stock_number="NEW1", vin=rows[0]["vin"]))
+
+    result, status = ingest_inventory_feed(io.StringIO(feed), "csv", delete_missing=False)
+
+    assert status == 200
+    assert result["error_count"] == 1
+    assert result["inserted"] == 0
+
+
+def test_versions_increase_per_ingest(app):
+    rows = _stock(5)
+    feed = FEED_HEADER + "".join(_feed_line(dict(row, price=row["price"] + 1)) for row in rows)
+
+    result, status = ingest_inventory_feed(io.StringIO(feed), "csv")
+
+    assert status == 200
+    assert result["version"] == 2
+    assert result["updated"] == 5
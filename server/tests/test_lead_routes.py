@@ -0,0 +1,39 @@
+# server/tests/test_lead_routes.py
+
+from datetime import datetime, timedelta
+from database import db
+from models.sql_models import AutoLeadInteractionDetails
+from tests.conftest import ADMIN_HEADERS
+
+
+def _add_interactions(count):
+    start = datetime(2026, 1, 1)
+    for i in range(count):
+        db.session.add(AutoLeadInteractionDetails(
+            conversation_id=f"c{i}",
+            sentiment="positive" if i % 2 else "neutral",
+            priority_flag=i % 3 == 0,
+            created_at=start + timedelta(minutes=i)
+        ))
+    db.session.commit()
+
+
+def test_listing_requires_the_admin_token(client):
+    assert client.get("/api/leads/interactions").status_code == 401
+    assert client.get("/api/leads/interactions", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+
+def test_listing_pages_through_filtered_interactions(app, client):
+    _add_interactions(10)
+    seen, cursor = [], None
+    while True:
+        query = {"priority": "high", "limit": 2, "fields": "conversation_id"}
+        if cursor:
+            query["cursor"] = cursor
+        page = client.get("/api/leads/interactions", query_string=query, headers=ADMIN_HEADERS).get_json()
+        seen += [row["conversation_id"] for row in page["interactions"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == ["c9", "c6", "c3", "c0"]
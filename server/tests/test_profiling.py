@@ -0,0 +1,53 @@
+# server/tests/test_profiling.py
+
+import time
+from types import SimpleNamespace
+import pytest
+from config import Config
+from helpers.profiling_helpers import _should_profile, pstats_to_folded
+
+
+def _layered_stats(layers, width):
+    """
+    Stats for a call graph where every function calls every function of the next layer.
+
+    It has width ** layers paths, far too many to enumerate.
+    """
+    stats = {}
+    for layer in range(layers):
+        for index in range(width):
+            func = (f"layer{layer}.py", index, f"f{layer}_{index}")
+            callers = {}
+            if layer:
+                callers = {(f"layer{layer - 1}.py", i, f"f{layer - 1}_{i}"): (1, 1, 0.001, 1.0 / width) for i in range(width)}
+            stats[func] = (1, 1, 0.001, 1.0, callers)
+    return SimpleNamespace(stats=stats)
+
+
+def test_folded_conversion_is_bounded_on_dense_call_graphs():
+    stats = _layered_stats(layers=30, width=6)
+
+    started = time.perf_counter()
+    lines = pstats_to_folded(stats, max_paths=2000, min_fraction=0)
+
+    assert time.perf_counter() - started < 5
+    assert 0 < len(lines) <= 2000
+
+
+def test_folded_lines_are_weighted_stacks():
+    lines = pstats_to_folded(_layered_stats(layers=2, width=1))
+
+    assert lines == ["f0_0 (layer0.py:0) 1000", "f0_0 (layer0.py:0);f1_0 (layer1.py:0) 1000"]
+
+
+@pytest.mark.parametrize("admin_token, header, expected", [
+    (None, "anything", False),
+    ("secret", "wrong", False),
+    ("secret", "secret", True),
+])
+def test_forcing_a_profile_takes_the_admin_token(app, monkeypatch, admin_token, header, expected):
+    monkeypatch.setattr(Config, "ADMIN_TOKEN", admin_token)
+    monkeypatch.setattr(Config, "PROFILE_SAMPLE_RATE", 0)
+
+    with app.test_request_context("/api/chat", headers={Config.PROFILE_HEADER: header}):
+        assert _should_profile() is expected
@@ -0,0 +1,76 @@
+# server/tests/test_routing.py
+
+import joblib
+import pytest
+from config import Config
+from database import db
+from models.sql_models import ConversationSummary
+from helpers import routing_helpers
+from helpers.routing_helpers import confident_routing, seed_examples, train_routing_model
+from services.chat_service import get_summary
+
+HISTORY = [{"role": "user", "content": "my check engine light is on and the car is making a noise"}]
+
+
+@pytest.fixture
+def trained_model(tmp_path, monkeypatch):
+    path = tmp_path / "routing.joblib"
+    joblib.dump(train_routing_model(seed_examples()), path)
+    monkeypatch.setattr(Config, "ROUTING_MODEL_PATH", str(path))
+    monkeypatch.setattr(Config, "ROUTING_CLASSIFIER_ENABLED", True)
+    monkeypatch.setattr(routing_helpers, "_model", None)
+    return path
+
+
+def test_disabled_classifier_routes_nothing(trained_model, monkeypatch):
+    monkeypatch.setattr(Config, "ROUTING_CLASSIFIER_ENABLED", False)
+
+    assert confident_routing(HISTORY) is None
+
+
+def test_classifier_needs_a_trained_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "ROUTING_CLASSIFIER_ENABLED", True)
+    monkeypatch.setattr(Config, "ROUTING_MODEL_PATH", str(tmp_path / "missing.joblib"))
+
+    assert confident_routing(HISTORY) is None
+
+
+def test_confident_prediction_is_used(trained_model, monkeypatch):
+    monkeypatch.setattr(Config, "ROUTING_MIN_CONFIDENCE", 0.0)
+
+    routing = confident_routing(HISTORY)
+
+    assert routing["department"] == "Service"
+    assert set(routing["confidence"]) == {"sentiment", "urgency", "department"}
+
+
+def test_unsure_prediction_falls_back_to_the_llm(trained_model, monkeypatch):
+    monkeypatch.setattr(Config, "ROUTING_MIN_CONFIDENCE", 1.0)
+
+    assert confident_routing(HISTORY) is None
+
+
+def test_summary_endpoint_flags_a_pending_summary(app):
+    db.session.add(ConversationSummary(conversation_id="c1", sentiment="negative", summary="", department="Service"))
+    db.session.commit()
+
+    result, status = get_summary("c1")
+
+    assert status == 200
+    assert result["summary_pending"]
+
+
+def test_poll_sees_a_summary_finished_by_another_worker(app):
+    db.session.add(ConversationSummary(conversation_id="c2", sentiment="negative", summary="", department="Service"))
+    db.session.commit()
+    assert get_summary("c2")[0]["summary_pending"]
+
+    # The background write lands without touching this process's cache
+    db.session.query(ConversationSummary).filter_by(conversation_id="c2").update({"summary": "Engine light is on."})
+    db.session.commit()
+
+    result, status = get_summary("c2")
+
+    assert status == 200
+    assert not result["summary_pending"]
+    assert result["summary"]["summary"] == "Engine light is on."
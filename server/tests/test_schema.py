@@ -0,0 +1,104 @@
+# server/tests/test_schema.py
+
+from sqlalchemy import inspect, text
+from database import db
+from models.sql_models import AutoLeadInteractionDetails, CarInventory
+
+# car_inventory as it was created before inventory delta sync
+OLD_CAR_INVENTORY = """
+CREATE TABLE car_inventory (
+    id INTEGER PRIMARY KEY,
+    stock_number VARCHAR(50) NOT NULL UNIQUE,
+    vin VARCHAR(50) NOT NULL UNIQUE,
+    make VARCHAR(50) NOT NULL,
+    model VARCHAR(50) NOT NULL,
+    year INTEGER NOT NULL,
+    price NUMERIC(10, 2) NOT NULL,
+    mileage INTEGER,
+    color VARCHAR(50),
+    description TEXT,
+    created_at DATETIME
+)
+"""
+
+
+def _replace_table(model, ddl):
+    model.__table__.drop(db.engine)
+    with db.engine.begin() as connection:
+        connection.execute(text(ddl))
+
+
+def test_upgrade_schema_adds_missing_columns(app):
+    _replace_table(CarInventory, OLD_CAR_INVENTORY)
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO car_inventory (stock_number, vin, make, model, year, price, created_at) "
+            "VALUES ('S1', 'V1', 'Nissan', 'Rogue', 2024, 30000, '2024-01-01 00:00:00')"
+        ))
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=["upgrade-schema"])
+
+    assert result.exit_code == 0, result.output
+    assert "add column car_inventory.change_version" in result.output
+    inspector = inspect(db.engine)
+    assert {"updated_at", "deleted_at", "change_version"} <= {c["name"] for c in inspector.get_columns("car_inventory")}
+    assert "ix_car_inventory_change_version" in {i["name"] for i in inspector.get_indexes("car_inventory")}
+    car = db.session.query(CarInventory).one()
+    assert car.change_version == 0 and car.updated_at is not None
+
+    assert "Schema is up to date" in runner.invoke(args=["upgrade-schema"]).output
+
+
+def test_upgrade_schema_creates_missing_tables(app):
+    db.drop_all()
+
+    result = app.test_cli_runner().invoke(args=["upgrade-schema", "--dry-run"])
+    assert "create table car_inventory" in result.output
+    assert not inspect(db.engine).has_table("car_inventory")
+
+    app.test_cli_runner().invoke(args=["upgrade-schema"])
+    assert inspect(db.engine).has_table("car_inventory")
+
+
+def _make_conversation_index_non_unique():
+    with db.engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_auto_leads_interaction_details_conversation_id"))
+        connection.execute(text(
+            "CREATE INDEX ix_auto_leads_interaction_details_conversation_id "
+            "ON auto_leads_interaction_details (conversation_id)"
+        ))
+
+
+def test_upgrade_schema_makes_conversation_id_unique(app):
+    _make_conversation_index_non_unique()
+
+    result = app.test_cli_runner().invoke(args=["upgrade-schema"])
+
+    assert result.exit_code == 0, result.output
+    indexes = {i["name"]: i for i in inspect(db.engine).get_indexes("auto_leads_interaction_details")}
+    assert indexes["ix_auto_leads_interaction_details_conversation_id"]["unique"]
+
+
+def test_upgrade_schema_reports_duplicate_conversations(app):
+    _make_conversation_index_non_unique()
+    with db.engine.begin() as connection:
+        for _ in range(2):
+            connection.execute(text("INSERT INTO auto_leads_interaction_details (conversation_id) VALUES ('dup')"))
+
+    result = app.test_cli_runner().invoke(args=["upgrade-schema"])
+
+    assert result.exit_code != 0
+    assert "create unique index ix_auto_leads_interaction_details_conversation_id failed" in result.output
+
+
+def test_upgrade_schema_creates_lead_interaction_indexes(app):
+    declared = {index.name for index in AutoLeadInteractionDetails.__table__.indexes}
+    with db.engine.begin() as connection:
+        for name in declared:
+            connection.execute(text(f"DROP INDEX {name}"))
+
+    result = app.test_cli_runner().invoke(args=["upgrade-schema"])
+
+    assert result.exit_code == 0, result.output
+    assert declared <= {i["name"] for i in inspect(db.engine).get_indexes("auto_leads_interaction_details")}
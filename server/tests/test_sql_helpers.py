@@ -0,0 +1,58 @@
+# server/tests/test_sql_helpers.py
+
+import pytest
+from database import db
+from helpers import sql_helpers
+from helpers.sql_helpers import bulk_upsert, insert_if_absent, upsert
+from helpers.llm_utils import save_summary_to_db
+from models.sql_models import AutoLeadInteractionDetails, ConversationSummary
+
+
+@pytest.fixture(params=["on_conflict", "fallback"])
+def dialect(request, monkeypatch):
+    """Run a test with ON CONFLICT statements and with the select-then-insert/update fallback."""
+    if request.param == "fallback":
+        monkeypatch.setattr(sql_helpers, "_ON_CONFLICT_INSERTS", {})
+    return request.param
+
+
+def _summary(conversation_id, summary):
+    return {"conversation_id": conversation_id, "sentiment": "neutral", "summary": summary, "department": "Sales"}
+
+
+def test_insert_if_absent(app, dialect):
+    assert insert_if_absent(db.session, ConversationSummary, _summary("c1", "first"), "conversation_id")
+    assert not insert_if_absent(db.session, ConversationSummary, _summary("c1", "second"), "conversation_id")
+    db.session.commit()
+
+    assert [row.summary for row in db.session.query(ConversationSummary)] == ["first"]
+
+
+def test_upsert(app, dialect):
+    upsert(db.session, ConversationSummary, _summary("c1", "first"), "conversation_id")
+    upsert(db.session, ConversationSummary, _summary("c1", "second"), "conversation_id")
+    db.session.commit()
+
+    assert [row.summary for row in db.session.query(ConversationSummary)] == ["second"]
+
+
+def test_bulk_upsert(app, dialect):
+    upsert(db.session, ConversationSummary, _summary("c1", "first"), "conversation_id")
+    bulk_upsert(db.session, ConversationSummary, [_summary("c1", "updated"), _summary("c2", "new")], "conversation_id")
+    db.session.commit()
+
+    rows = db.session.query(ConversationSummary).order_by(ConversationSummary.conversation_id)
+    assert [(row.conversation_id, row.summary) for row in rows] == [("c1", "updated"), ("c2", "new")]
+
+
+def test_summary_saves_keep_one_interaction_per_conversation(app, dialect):
+    history = [{"role": "user", "content": "any rogues?"}, {"role": "assistant", "content": "Yes, three."}]
+    summary = dict(_summary("c1", "Asked about Rogues"), keywords=["rogue"], insights={"urgency": "high"})
+
+    assert save_summary_to_db(summary, history)
+    assert save_summary_to_db(dict(summary, summary="Booked a test drive"), history)
+
+    interaction = db.session.query(AutoLeadInteractionDetails).one()
+    assert interaction.conversation_summary == "Booked a test drive"
+    assert interaction.priority_flag
+    assert interaction.conversation_transcript is not None
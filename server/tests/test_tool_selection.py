@@ -0,0 +1,43 @@
+# server/tests/test_tool_selection.py
+
+import pytest
+from config import Config
+from helpers.tool_helpers import select_tools, tool_names
+import services.chat_service  # noqa: F401  (registers the tools)
+
+
+def _select(message, history=()):
+    return select_tools(list(history) + [{"role": "user", "content": message}], message)
+
+
+@pytest.mark.parametrize("message", ["hi", "Any Pathfinders on the lot?", "what are your hours"])
+def test_fetch_cars_is_always_offered(app, message):
+    assert "fetch_cars" in _select(message)
+
+
+@pytest.mark.parametrize("message", [
+    "what do people say about the murano",
+    "is the rogue worth it",
+    "rogue vs rav4",
+    "can I watch a video of the kicks",
+])
+def test_review_questions_get_the_review_tool(app, message):
+    assert "find_car_review_videos" in _select(message)
+
+
+def test_review_tool_is_not_offered_for_other_messages(app):
+    assert "find_car_review_videos" not in _select("Any Pathfinders on the lot?")
+
+
+def test_review_tool_stays_offered_once_called(app):
+    history = [{"role": "assistant", "content": "", "tool_calls": [
+        {"id": "1", "type": "function", "function": {"name": "find_car_review_videos", "arguments": "{}"}}
+    ]}]
+
+    assert "find_car_review_videos" in _select("thanks", history)
+
+
+def test_every_tool_is_offered_with_selection_off(app, monkeypatch):
+    monkeypatch.setattr(Config, "TOOL_SELECTION_ENABLED", False)
+
+    assert _select("hi") == tool_names()
@@ -0,0 +1,97 @@
+# server/tests/test_transcripts.py
+
+import json
+import zlib
+from sqlalchemy import text
+from database import db
+from models.sql_models import AutoLeadInteractionDetails
+from helpers.transcript_helpers import compress_transcript, decompress_transcript, iter_decompressed
+from tests.conftest import ADMIN_HEADERS
+
+HISTORY = [
+    {"role": "system", "content": "You are a dealership assistant."},
+    {"role": "user", "content": "Do you have any Rogues under 30k?"},
+    {"role": "assistant", "content": "We have three Rogues in stock under $30,000. " * 200},
+]
+MESSAGES = HISTORY[1:]
+
+
+def _add_interaction(history=HISTORY):
+    interaction = AutoLeadInteractionDetails(conversation_id="c1", conversation_transcript=compress_transcript(history))
+    db.session.add(interaction)
+    db.session.commit()
+    return interaction.interaction_id
+
+
+def test_compressed_transcript_round_trips_without_system_messages():
+    blob = compress_transcript(HISTORY)
+
+    assert decompress_transcript(blob) == MESSAGES
+    assert b"".join(iter_decompressed(blob, chunk_size=64)) == zlib.decompress(blob)
+    assert len(blob) < len(json.dumps(MESSAGES))
+
+
+def test_transcript_requires_the_admin_token(app, client):
+    interaction_id = _add_interaction()
+
+    assert client.get(f"/api/leads/interactions/{interaction_id}/transcript").status_code == 401
+
+
+def test_transcript_is_sent_deflated_when_accepted(app, client):
+    interaction_id = _add_interaction()
+
+    response = client.get(
+        f"/api/leads/interactions/{interaction_id}/transcript",
+        headers=dict(ADMIN_HEADERS, **{"Accept-Encoding": "deflate"})
+    )
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "deflate"
+    assert json.loads(zlib.decompress(response.data)) == MESSAGES
+
+
+def test_transcript_is_inflated_for_other_clients(app, client):
+    interaction_id = _add_interaction()
+
+    response = client.get(f"/api/leads/interactions/{interaction_id}/transcript", headers=ADMIN_HEADERS)
+
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == MESSAGES
+
+
+def test_missing_transcript_is_404(app, client):
+    assert client.get("/api/leads/interactions/999/transcript", headers=ADMIN_HEADERS).status_code == 404
+
+
+def test_transcript_column_is_deferred(app):
+    _add_interaction()
+
+    interaction = db.session.query(AutoLeadInteractionDetails).one()
+
+    assert "conversation_transcript" not in interaction.__dict__
+
+
+def test_upgrade_schema_compresses_text_transcripts(app, client):
+    AutoLeadInteractionDetails.__table__.drop(db.engine)
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE auto_leads_interaction_details ("
+            "interaction_id INTEGER PRIMARY KEY, lead_id INTEGER, conversation_transcript TEXT, "
+            "conversation_summary TEXT, sentiment VARCHAR(20), product_keywords JSON, priority_flag BOOLEAN, "
+            "next_steps_recommendation TEXT, created_at DATETIME)"
+        ))
+        connection.execute(
+            text("INSERT INTO auto_leads_interaction_details (interaction_id, conversation_transcript) VALUES (:id, :t)"),
+            [{"id": 1, "t": json.dumps(HISTORY)}, {"id": 2, "t": "plain text notes"}, {"id": 3, "t": None}]
+        )
+
+    result = app.test_cli_runner().invoke(args=["upgrade-schema"])
+
+    assert result.exit_code == 0, result.output
+    assert "compress auto_leads_interaction_details.conversation_transcript" in result.output
+    db.session.remove()
+    assert client.get("/api/leads/interactions/1/transcript", headers=ADMIN_HEADERS).get_json() == MESSAGES
+    assert client.get("/api/leads/interactions/2/transcript", headers=ADMIN_HEADERS).get_json() == [
+        {"role": "transcript", "content": "plain text notes"}
+    ]
+    assert client.get("/api/leads/interactions/3/transcript", headers=ADMIN_HEADERS).status_code == 404